@@ -0,0 +1,242 @@
+"""
+Shared helpers for the benchmark scripts: isolated storage setup, per-stage
+timing with peak RSS sampling, and in-memory stand-ins for Neo4jStorage and
+AsyncNeo4jQuery.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import config
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc, else the lifetime peak)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageRecorder:
+    """Collect wall time, item counts and peak RSS for named stages."""
+
+    def __init__(self, sample_interval: float = 0.01):
+        """Initialize an empty report."""
+        self.sample_interval = sample_interval
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, unit: str):
+        """Time a stage; the body sets ``counter['items']`` to the work done."""
+        counter = {"items": 0}
+        peak = [current_rss_bytes()]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(self.sample_interval):
+                peak[0] = max(peak[0], current_rss_bytes())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            sampler.join()
+            peak[0] = max(peak[0], current_rss_bytes())
+
+            stats = self.stages.setdefault(name, {"items": 0, "seconds": 0.0, "peak_rss_mb": 0.0})
+            stats["items"] += counter["items"]
+            stats["seconds"] += elapsed
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], round(peak[0] / 1024 / 1024, 1))
+            stats[f"{unit}_per_second"] = round(stats["items"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage results with rounded timings."""
+        return {name: {**stats, "seconds": round(stats["seconds"], 4)} for name, stats in self.stages.items()}
+
+
+def isolate_storage(workdir: Optional[str] = None) -> str:
+    """Point ChromaDB and the embedding cache at a scratch directory.
+
+    Must run before any storage manager is created.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="kg_bench_")
+    config.CHROMADB_PATH = os.path.join(workdir, "chroma_db")
+    config.CHROMADB_COLLECTION = "benchmark"
+    config.EMBEDDING_CACHE_PATH = os.path.join(workdir, "embedding_cache")
+    return workdir
+
+
+def environment_info() -> Dict[str, Any]:
+    """Release and host details so results can be compared across runs."""
+    try:
+        revision = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(__file__), capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "embedding_model": config.EMBEDDING_MODEL,
+        "embedding_backend": config.EMBEDDING_BACKEND,
+        "embedding_batch_size": config.EMBEDDING_BATCH_SIZE,
+        "embedding_token_budget": config.EMBEDDING_TOKEN_BUDGET
+    }
+
+
+class InMemoryGraphStorage:
+    """Stand-in for Neo4jStorage when no Neo4j server is reachable.
+
+    Mirrors the store_entities return shape so the benchmark exercises the
+    same call path; it measures client-side overhead only.
+    """
+
+    def __init__(self):
+        """Initialize empty node and edge maps."""
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.entities: Dict[str, Dict[str, Any]] = {}
+        self.mentions: set = set()
+        self.relationships: Dict[tuple, Dict[str, Any]] = {}
+
+    def store_entities(self, entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]], document_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Store entities and relationships with document provenance."""
+        doc_id = document_info.get("id")
+        self.documents[doc_id] = dict(document_info)
+
+        for entity in entities:
+            self.entities.setdefault(entity["id"], {}).update(entity)
+            self.mentions.add((entity["id"], doc_id))
+
+        relationships_created = 0
+        for rel in relationships:
+            if rel.get("source") in self.entities and rel.get("target") in self.entities:
+                key = (rel["source"], rel["target"], rel.get("type", "RELATED"))
+                self.relationships[key] = {"confidence": rel.get("confidence", 1.0), "context": rel.get("context", "")}
+            relationships_created += 1
+
+        return {
+            "entities_created": len(entities),
+            "relationships_created": relationships_created,
+            "document_id": doc_id
+        }
+
+    def close(self):
+        """Nothing to release."""
+
+
+class InMemoryGraphQuery:
+    """Stand-in for AsyncNeo4jQuery reading an InMemoryGraphStorage."""
+
+    def __init__(self, graph: InMemoryGraphStorage):
+        """Wrap the graph written during corpus loading."""
+        self.graph = graph
+
+    async def query_entities(self, query: str, limit: int = 10, entity_type: Optional[str] = None, fuzzy: bool = False) -> List[Dict[str, Any]]:
+        """Query entities by name or type (Neo4jQuery's substring fallback; fuzzy is ignored)."""
+        needle = query.lower()
+        matches = [
+            e for e in self.graph.entities.values()
+            if (needle in e.get("name", "").lower() or needle in e.get("type", "").lower())
+            and (entity_type is None or e.get("type", "").lower() == entity_type.lower())
+        ]
+        matches.sort(key=lambda e: e.get("confidence", 1.0), reverse=True)
+        return [
+            {
+                "id": e["id"], "name": e["name"], "type": e["type"],
+                "properties": None, "confidence": e.get("confidence", 1.0), "score": None,
+                "documents": [self.graph.documents[d]["title"] for (eid, d) in self.graph.mentions if eid == e["id"]]
+            }
+            for e in matches[:limit]
+        ]
+
+    async def get_entity_relationships(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Get relationships for a specific entity (both directions)."""
+        results = []
+        for (source, target, rel_type), rel in self.graph.relationships.items():
+            if entity_id not in (source, target):
+                continue
+            other = self.graph.entities[target if source == entity_id else source]
+            results.append({
+                "id": other["id"], "name": other["name"], "type": other["type"],
+                "relationship_type": rel_type, "confidence": rel["confidence"], "context": rel["context"]
+            })
+        results.sort(key=lambda r: r["confidence"], reverse=True)
+        return results
+
+    async def search_entities_with_relationships(self, query: str, limit: int = 10, expand_top: Optional[int] = None,
+                                                 relationships_per_entity: Optional[int] = None, **kwargs) -> List[Dict[str, Any]]:
+        """Matched entities with capped relationships for the top matches."""
+        expand_top = config.NEO4J_EXPAND_TOP_ENTITIES if expand_top is None else expand_top
+        cap = config.NEO4J_RELATIONSHIPS_PER_ENTITY if relationships_per_entity is None else relationships_per_entity
+        entities = await self.query_entities(query, limit, **kwargs)
+        for entity in entities[:expand_top]:
+            entity["relationships"] = (await self.get_entity_relationships(entity["id"]))[:cap]
+        return entities
+
+    async def batch_search_entities_with_relationships(self, queries: List[str], limit: int = 10, **kwargs) -> List[List[Dict[str, Any]]]:
+        """One search_entities_with_relationships result per query."""
+        return [await self.search_entities_with_relationships(query, limit, **kwargs) for query in queries]
+
+    def close(self):
+        """Nothing to release."""
+
+
+def open_graph_storage(mode: str):
+    """Return (storage, backend name) for --graph auto|neo4j|memory."""
+    if mode == "memory":
+        return InMemoryGraphStorage(), "memory"
+
+    try:
+        from storage.neo4j import Neo4jStorage
+        storage = Neo4jStorage()
+        storage.driver.verify_connectivity()
+        return storage, "neo4j"
+    except Exception as e:
+        if mode == "neo4j":
+            raise
+        print(f"⚠️ Neo4j not reachable ({e}); using in-memory graph stand-in", file=sys.stderr)
+        return InMemoryGraphStorage(), "memory"
+
+
+def remove_benchmark_nodes(graph_storage, graph_backend: str, run_prefix: str):
+    """Delete Document and Entity nodes written by a benchmark run from Neo4j."""
+    if graph_backend != "neo4j":
+        return
+    with graph_storage.driver.session() as session:
+        session.run(
+            "MATCH (n) WHERE (n:Document OR n:Entity) AND n.id STARTS WITH $prefix DETACH DELETE n",
+            prefix=run_prefix
+        )
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]):
+    """Write the JSON report to a file, or stdout when no file is given."""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+        print(f"📊 Report written to {output}", file=sys.stderr)
+    else:
+        print(text)
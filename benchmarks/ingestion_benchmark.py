@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark
+Generates a synthetic corpus and drives it through the real ingestion path:
+chunk_paper_for_complete_coverage -> EmbeddingService -> ChromaDBStorage ->
+Neo4jStorage (or an in-memory stand-in). Reports throughput and peak RSS per
+stage as JSON.
+
+ChromaDB and the embedding cache live in a scratch directory. When a real
+Neo4j is used, benchmark nodes are tagged with a run prefix and removed at the
+end, but point NEO4J_URI at a scratch database to be safe.
+"""
+
+import argparse
+import contextlib
+import shutil
+import sys
+import time
+from typing import Any, Dict, List
+
+from common import (
+    StageRecorder,
+    environment_info,
+    isolate_storage,
+    open_graph_storage,
+    remove_benchmark_nodes,
+    write_report,
+)
+from synthetic_corpus import generate_corpus
+
+
+def chunk_metadata(chunk: Dict[str, Any], document_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Flat Chroma metadata for a chunk, as the store_vectors tool builds it."""
+    metadata = {
+        "document_id": document_info["id"],
+        "document_title": document_info["title"],
+        "document_type": document_info["type"],
+        "vector_type": chunk["type"],
+        "vector_id": chunk["id"],
+        "year": document_info["year"]
+    }
+    for key, value in chunk.get("properties", {}).items():
+        if isinstance(value, (str, int, float, bool)):
+            metadata[key] = value
+    return metadata
+
+
+def run_pipeline(corpus, recorder, chromadb_storage, graph_storage, totals: Dict[str, int]) -> Dict[str, Any]:
+    """Chunk, embed and store every paper through IngestionPipeline, then store the graph.
+
+    Returns the pipeline's per-stage throughput and queue depth.
+    """
+    from storage.chroma import IngestionPipeline
+
+    papers = list(corpus)
+    pipeline = IngestionPipeline(storage=chromadb_storage)
+    with recorder.stage("vector_pipeline", "chunks") as counter:
+        result = pipeline.run({"text": paper["text"], "document_info": paper["document_info"]} for paper in papers)
+        counter["items"] = sum(doc["chunks"] for doc in result["documents"].values())
+
+    errors = {doc_id: doc["error"] for doc_id, doc in result["documents"].items() if "error" in doc}
+    if errors:
+        raise RuntimeError(f"Pipeline failed for {len(errors)} document(s): {errors}")
+
+    for paper in papers:
+        with recorder.stage("graph_store", "writes") as counter:
+            graph_storage.store_entities(paper["entities"], paper["relationships"], paper["document_info"])
+            counter["items"] = len(paper["entities"]) + len(paper["relationships"])
+        totals["papers"] += 1
+        totals["entities"] += len(paper["entities"])
+        totals["relationships"] += len(paper["relationships"])
+    totals["chunks"] = sum(doc["chunks"] for doc in result["documents"].values())
+    return {key: value for key, value in result.items() if key != "documents"}
+
+
+def run(args) -> Dict[str, Any]:
+    """Run all ingestion stages and return the report."""
+    workdir = isolate_storage(args.workdir)
+
+    # Imported after isolate_storage so managers pick up the scratch paths
+    from utils.text_chunking import chunk_paper_for_complete_coverage
+    from storage.embedding import EmbeddingService, get_shared_embedding_cache, warmup_embedding_model
+    from storage.chroma import ChromaDBStorage
+
+    run_prefix = f"bench{int(time.time())}"
+    recorder = StageRecorder()
+    graph_storage, graph_backend = open_graph_storage(args.graph)
+
+    # Model load time is not part of embedding throughput
+    with recorder.stage("model_load", "models") as counter:
+        warmup_embedding_model()
+        counter["items"] = 1
+
+    embedding_service = EmbeddingService(cache=get_shared_embedding_cache())
+    chromadb_storage = ChromaDBStorage()
+    totals = {"papers": 0, "chunks": 0, "entities": 0, "relationships": 0}
+
+    try:
+        corpus = generate_corpus(args.papers, args.words, args.entities, seed=args.seed, id_prefix=run_prefix)
+        if args.pipeline:
+            pipeline_stats = run_pipeline(corpus, recorder, chromadb_storage, graph_storage, totals)
+        else:
+            for paper in corpus:
+                document_info = paper["document_info"]
+
+                with recorder.stage("chunk", "chunks") as counter:
+                    chunks = chunk_paper_for_complete_coverage(paper["text"], document_info["title"])
+                    counter["items"] = len(chunks)
+
+                contents = [chunk["content"] for chunk in chunks]
+
+                # Fresh cache, so this is a full model pass; it also warms the
+                # cache so the next stage measures storage rather than the model
+                with recorder.stage("embed", "embeddings") as counter:
+                    embedding_service.encode_texts(contents)
+                    counter["items"] = len(contents)
+
+                with recorder.stage("vector_store", "writes") as counter:
+                    chromadb_storage.store_vectors(
+                        contents,
+                        [chunk["id"] for chunk in chunks],
+                        [chunk_metadata(chunk, document_info) for chunk in chunks]
+                    )
+                    counter["items"] = len(contents)
+
+                with recorder.stage("graph_store", "writes") as counter:
+                    graph_storage.store_entities(paper["entities"], paper["relationships"], document_info)
+                    counter["items"] = len(paper["entities"]) + len(paper["relationships"])
+
+                totals["papers"] += 1
+                totals["chunks"] += len(chunks)
+                totals["entities"] += len(paper["entities"])
+                totals["relationships"] += len(paper["relationships"])
+    finally:
+        remove_benchmark_nodes(graph_storage, graph_backend, run_prefix)
+        graph_storage.close()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "ingestion",
+        "environment": environment_info(),
+        "parameters": {
+            "papers": args.papers,
+            "words_per_paper": args.words,
+            "entities_per_paper": args.entities,
+            "seed": args.seed,
+            "graph_backend": graph_backend,
+            "pipeline": args.pipeline
+        },
+        "totals": totals,
+        "stages": recorder.report(),
+        "embedding_cache": get_shared_embedding_cache().get_stats() if get_shared_embedding_cache() else None
+    }
+    if args.pipeline:
+        report["pipeline"] = pipeline_stats
+    return report
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=20, help="Number of synthetic papers")
+    parser.add_argument("--words", type=int, default=5000, help="Approximate words per paper")
+    parser.add_argument("--entities", type=int, default=50, help="Entities per paper (relationships = 2x)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Run chunk/embed/vector store concurrently through IngestionPipeline")
+    parser.add_argument("--graph", choices=["auto", "neo4j", "memory"], default="auto",
+                        help="Graph backend: Neo4j if reachable (auto), required (neo4j), or in-memory")
+    parser.add_argument("--workdir", help="Keep ChromaDB and cache files in this directory")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the scratch directory")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Storage managers log to stdout; keep it clean for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
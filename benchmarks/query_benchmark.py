@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Query Benchmark
+Loads a fixed synthetic corpus, then replays a query workload against the
+query_knowledge_graph and generate_literature_review tool handlers. Reports
+p50/p95/p99 latency for the whole call and for each internal stage
+(neo4j_entity_match, embedding, chroma_search, formatting) as JSON.
+
+Queries run with a configurable concurrency so micro-batching and thread
+offloading behave as they do under load in HTTP mode.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import shutil
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from common import (
+    environment_info,
+    isolate_storage,
+    open_graph_storage,
+    remove_benchmark_nodes,
+    write_report,
+    InMemoryGraphQuery,
+)
+from ingestion_benchmark import chunk_metadata
+from synthetic_corpus import generate_corpus, generate_queries
+
+TOOLS = ["query_knowledge_graph", "generate_literature_review"]
+
+
+class ToolCollector:
+    """Minimal FastMCP stand-in whose tool() decorator keeps the raw handlers."""
+
+    def __init__(self):
+        """Initialize an empty tool map."""
+        self.tools: Dict[str, Callable] = {}
+
+    def tool(self, *args, **kwargs):
+        """Register a handler under its function name."""
+        def decorator(func):
+            self.tools[func.__name__] = func
+            return func
+        return decorator
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+def load_corpus(args, run_prefix: str, graph_storage) -> Dict[str, int]:
+    """Chunk, embed and store the fixed corpus in Chroma and the graph."""
+    from utils.text_chunking import chunk_paper_for_complete_coverage
+    from storage.chroma import ChromaDBStorage
+
+    chromadb_storage = ChromaDBStorage()
+    totals = {"papers": 0, "chunks": 0, "entities": 0}
+    for paper in generate_corpus(args.papers, args.words, args.entities, seed=args.seed, id_prefix=run_prefix):
+        document_info = paper["document_info"]
+        chunks = chunk_paper_for_complete_coverage(paper["text"], document_info["title"])
+        chromadb_storage.store_vectors(
+            [chunk["content"] for chunk in chunks],
+            [chunk["id"] for chunk in chunks],
+            [chunk_metadata(chunk, document_info) for chunk in chunks]
+        )
+        graph_storage.store_entities(paper["entities"], paper["relationships"], document_info)
+        totals["papers"] += 1
+        totals["chunks"] += len(chunks)
+        totals["entities"] += len(paper["entities"])
+    return totals
+
+
+async def replay(tools: Dict[str, Callable], queries: List[str], concurrency: int, limit: int) -> Dict[str, Any]:
+    """Run every query against every tool, at most `concurrency` calls in flight."""
+    from utils.stage_timing import record_stages
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = {name: {"total": [], "stages": {}, "errors": 0, "cached": 0} for name in TOOLS}
+
+    async def call(name: str, query: str):
+        async with semaphore:
+            with record_stages() as stages:
+                start = time.perf_counter()
+                if name == "query_knowledge_graph":
+                    result = await tools[name](query=query, limit=limit)
+                else:
+                    result = await tools[name](topic=query, max_sources=limit)
+                elapsed = time.perf_counter() - start
+
+        tool_samples = samples[name]
+        if not result.get("success"):
+            tool_samples["errors"] += 1
+            return
+        tool_samples["total"].append(elapsed)
+        if result.get("cached"):
+            tool_samples["cached"] += 1
+        for stage_name, durations in stages.items():
+            tool_samples["stages"].setdefault(stage_name, []).append(sum(durations))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(name, query) for query in queries for name in TOOLS))
+    wall_seconds = time.perf_counter() - start
+
+    calls = len(queries) * len(TOOLS)
+    return {
+        "wall_seconds": round(wall_seconds, 4),
+        "calls_per_second": round(calls / wall_seconds, 2) if wall_seconds else 0.0,
+        "tools": {
+            name: {
+                "errors": tool_samples["errors"],
+                "cached": tool_samples["cached"],
+                "total": percentiles(tool_samples["total"]),
+                "stages": {stage_name: percentiles(values) for stage_name, values in tool_samples["stages"].items()}
+            }
+            for name, tool_samples in samples.items()
+        }
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    """Load the corpus, replay the workload and return the report."""
+    workdir = isolate_storage(args.workdir)
+    import config
+    # Cached answers skip every stage, so the cache is off unless asked for
+    config.RESULT_CACHE_ENABLED = args.result_cache
+
+    # Imported after isolate_storage so managers pick up the scratch paths
+    from storage.chroma import ChromaDBQuery
+    from storage.embedding import warmup_embedding_model
+    from tools.query.knowledge_search import register_search_tools
+    from tools.query.literature_generation import register_literature_tools
+    from utils.result_cache import get_shared_result_cache
+
+    run_prefix = f"bench{int(time.time())}"
+    graph_storage, graph_backend = open_graph_storage(args.graph)
+
+    try:
+        warmup_embedding_model()
+        totals = load_corpus(args, run_prefix, graph_storage)
+
+        if graph_backend == "neo4j":
+            from storage.neo4j import AsyncNeo4jQuery
+            graph_query = AsyncNeo4jQuery()
+        else:
+            graph_query = InMemoryGraphQuery(graph_storage)
+
+        chromadb_query = ChromaDBQuery()
+        collector = ToolCollector()
+        register_search_tools(collector, graph_query, chromadb_query)
+        register_literature_tools(collector, graph_query, chromadb_query)
+
+        async def replay_workload():
+            # One event loop for both runs: the async Neo4j driver is bound to it
+            from storage.neo4j import close_shared_async_neo4j_driver
+            try:
+                # Warm-up calls settle thread pools and lazy state; excluded from results
+                await replay(collector.tools, generate_queries(args.warmup, seed=args.seed + 1000), args.concurrency, args.limit)
+                return await replay(collector.tools, generate_queries(args.queries, seed=args.seed + 1), args.concurrency, args.limit)
+            finally:
+                await close_shared_async_neo4j_driver()
+
+        workload = asyncio.run(replay_workload())
+        query_cache = chromadb_query.get_query_embedding_cache_stats()
+        result_cache = get_shared_result_cache()
+        result_cache_stats = result_cache.get_stats() if result_cache else {"enabled": False}
+        graph_query.close()
+    finally:
+        remove_benchmark_nodes(graph_storage, graph_backend, run_prefix)
+        graph_storage.close()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "query",
+        "environment": environment_info(),
+        "parameters": {
+            "papers": args.papers,
+            "words_per_paper": args.words,
+            "entities_per_paper": args.entities,
+            "queries": args.queries,
+            "concurrency": args.concurrency,
+            "limit": args.limit,
+            "seed": args.seed,
+            "result_cache": args.result_cache,
+            "graph_backend": graph_backend
+        },
+        "corpus": totals,
+        **workload,
+        "query_embedding_cache": query_cache,
+        "result_cache": result_cache_stats
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=20, help="Number of synthetic papers to load")
+    parser.add_argument("--words", type=int, default=3000, help="Approximate words per paper")
+    parser.add_argument("--entities", type=int, default=50, help="Entities per paper (relationships = 2x)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries replayed against each tool")
+    parser.add_argument("--warmup", type=int, default=10, help="Warm-up queries excluded from the report")
+    parser.add_argument("--concurrency", type=int, default=1, help="Maximum tool calls in flight")
+    parser.add_argument("--limit", type=int, default=10, help="limit / max_sources passed to the tools")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--result-cache", action="store_true",
+                        help="Enable the query result cache (repeated queries are answered from memory)")
+    parser.add_argument("--graph", choices=["auto", "neo4j", "memory"], default="auto",
+                        help="Graph backend: Neo4j if reachable (auto), required (neo4j), or in-memory")
+    parser.add_argument("--workdir", help="Keep ChromaDB and cache files in this directory")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the scratch directory")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Tools and storage managers log to stdout; keep it clean for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
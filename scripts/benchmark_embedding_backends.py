@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Embedding Backend Benchmark
+Compares torch, ONNX and int8 ONNX embedding backends for throughput and
+cosine similarity against the torch reference output.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import contextlib
+import json
+import random
+import time
+
+import numpy as np
+from storage.embedding.registry import get_shared_embedding_model
+
+# Minimum per-text cosine similarity to the torch output (documented in PREREQUISITES.md)
+TOLERANCES = {
+    "onnx": 0.999,
+    "onnx-int8": 0.98,
+}
+
+VOCABULARY = (
+    "graph neural network transformer attention embedding molecule protein catalyst "
+    "reaction synthesis yield spectroscopy dataset benchmark accuracy baseline model "
+    "training inference latency experiment results methods analysis significant improvement"
+).split()
+
+
+def make_texts(count, seed=0):
+    """Generate chunk-like texts of varied length."""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(10, 300)))
+        for _ in range(count)
+    ]
+
+
+def run_backend(model_name, backend, texts, batch_size, repeats):
+    """Encode texts with one backend and return embeddings and best throughput."""
+    model = get_shared_embedding_model(model_name, device="cpu", precision="float32", backend=backend)
+    model.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)  # warm up
+
+    best_seconds = None
+    embeddings = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+        elapsed = time.perf_counter() - start
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+
+    return np.asarray(embeddings, dtype=np.float32), len(texts) / best_seconds
+
+
+def cosine_rows(a, b):
+    """Row-wise cosine similarity."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if "torch" not in backends:
+        backends.insert(0, "torch")  # Reference for accuracy and speedup
+
+    results = {}
+    outputs = {}
+    # Keep model loading chatter out of stdout when emitting JSON
+    log_target = sys.stderr if args.json else sys.stdout
+    with contextlib.redirect_stdout(log_target):
+        for backend in backends:
+            embeddings, throughput = run_backend(args.model, backend, texts, args.batch_size, args.repeats)
+            outputs[backend] = (embeddings, throughput)
+            results[backend] = {"texts_per_second": round(throughput, 1)}
+
+    reference = outputs["torch"]
+    ok = True
+    for backend in backends:
+        if backend == "torch":
+            continue
+        cosines = cosine_rows(reference[0], outputs[backend][0])
+        tolerance = TOLERANCES.get(backend)
+        within = tolerance is None or float(cosines.min()) >= tolerance
+        ok = ok and within
+        results[backend].update({
+            "speedup_vs_torch": round(results[backend]["texts_per_second"] / reference[1], 2),
+            "cosine_min": round(float(cosines.min()), 5),
+            "cosine_mean": round(float(cosines.mean()), 5),
+            "tolerance": tolerance,
+            "within_tolerance": within
+        })
+
+    report = {"model": args.model, "texts": args.texts, "batch_size": args.batch_size, "backends": results}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"⚡ Embedding backend benchmark: {args.model} ({args.texts} texts, batch {args.batch_size})")
+        print("=" * 50)
+        for backend, stats in results.items():
+            line = f"   {backend:<10} {stats['texts_per_second']:>8.1f} texts/s"
+            if backend != "torch":
+                status = "✅" if stats["within_tolerance"] else "❌"
+                line += (f"  x{stats['speedup_vs_torch']:.2f}  "
+                         f"cosine min {stats['cosine_min']:.4f} / mean {stats['cosine_mean']:.4f} {status}")
+            print(line)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Graph Centrality
+Computes degree and PageRank over the Neo4j entity graph and writes them back
+as node properties used to rank entity search results. Schedule it (cron,
+after bulk imports) or run it on demand; the server also recomputes in the
+background after store_entities calls.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import json
+
+from storage.neo4j import Neo4jStorage, close_shared_neo4j_driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute from scratch even if no documents were stored since the last run")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    storage = Neo4jStorage()
+    try:
+        result = storage.update_centrality(full=args.full)
+    finally:
+        storage.close()
+        close_shared_neo4j_driver()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"📈 {result['message']}")
+
+
+if __name__ == "__main__":
+    main()
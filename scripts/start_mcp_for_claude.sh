@@ -6,4 +6,4 @@ cd "/Users/aimiegarces/Agents"
 
 # Set up Python path and run server using full path to UV
 export PYTHONPATH="/Users/aimiegarces/Agents/src"
-/Users/aimiegarces/.local/bin/uv run python -c "import sys; sys.path.insert(0, 'src'); from server.main import mcp; mcp.run()"
\ No newline at end of file
+/Users/aimiegarces/.local/bin/uv run python -c "import sys; sys.path.insert(0, 'src'); import asyncio; from server.main import serve; asyncio.run(serve())"
\ No newline at end of file
@@ -3,8 +3,24 @@ from .settings import *
 
 # Re-export all settings for clean imports
 __all__ = [
-    "NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD",
-    "CHROMADB_PATH", "CHROMADB_COLLECTION", 
-    "EMBEDDING_MODEL", "EMBEDDING_BATCH_SIZE",
+    "NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD", "NEO4J_WRITE_BATCH_SIZE",
+    "NEO4J_DELETE_BATCH_SIZE",
+    "NEO4J_MAX_CONNECTION_POOL_SIZE", "NEO4J_CONNECTION_ACQUISITION_TIMEOUT",
+    "NEO4J_MAX_CONNECTION_LIFETIME", "NEO4J_MAX_TRANSACTION_RETRY_TIME",
+    "NEO4J_ENSURE_SCHEMA", "NEO4J_EXPAND_TOP_ENTITIES", "NEO4J_RELATIONSHIPS_PER_ENTITY",
+    "NEO4J_SUBGRAPH_MAX_DEPTH", "NEO4J_SUBGRAPH_MAX_FANOUT",
+    "NEO4J_SUBGRAPH_MAX_NODES", "NEO4J_SUBGRAPH_MAX_EDGES",
+    "NEO4J_CENTRALITY_WEIGHT", "NEO4J_CENTRALITY_AUTO_UPDATE", "NEO4J_CENTRALITY_UPDATE_DELAY",
+    "CHROMADB_PATH", "CHROMADB_COLLECTION", "CHROMADB_WRITE_BATCH_SIZE",
+    "INGESTION_BATCH_SIZE", "INGESTION_QUEUE_SIZE",
+    "EMBEDDING_MODEL", "EMBEDDING_BATCH_SIZE", "EMBEDDING_TOKEN_BUDGET",
+    "EMBEDDING_DEVICE", "EMBEDDING_PRECISION", "EMBEDDING_WARMUP",
+    "EMBEDDING_BACKEND", "EMBEDDING_ONNX_CACHE_PATH", "EMBEDDING_ONNX_QUANTIZATION",
+    "EMBEDDING_CACHE_ENABLED", "EMBEDDING_CACHE_PATH",
+    "EMBEDDING_CACHE_MEMORY_ITEMS", "EMBEDDING_CACHE_DISK_ITEMS",
+    "EMBEDDING_POOL_WORKERS", "EMBEDDING_POOL_MIN_TEXTS",
+    "QUERY_EMBEDDING_CACHE_SIZE",
+    "EMBEDDING_BATCH_MAX_ITEMS",
+    "RESULT_CACHE_ENABLED", "RESULT_CACHE_SIZE", "RESULT_CACHE_TTL",
     "CITATION_STYLES"
 ]
\ No newline at end of file
@@ -8,16 +8,75 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+# Shared driver connection pool (seconds for timeouts and lifetimes)
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "50"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+# How long managed transactions retry transient errors (deadlocks, leader changes)
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "15"))
+# Rows per UNWIND statement when writing entities and relationships
+NEO4J_WRITE_BATCH_SIZE = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+# Nodes or relationships removed per transaction when clearing the graph or deleting a document
+NEO4J_DELETE_BATCH_SIZE = int(os.getenv("NEO4J_DELETE_BATCH_SIZE", "10000"))
+# Create missing constraints and indexes when the server starts
+NEO4J_ENSURE_SCHEMA = os.getenv("NEO4J_ENSURE_SCHEMA", "true").lower() == "true"
+# Entity search: how many top matches get relationships, and at most how many each
+NEO4J_EXPAND_TOP_ENTITIES = int(os.getenv("NEO4J_EXPAND_TOP_ENTITIES", "3"))
+NEO4J_RELATIONSHIPS_PER_ENTITY = int(os.getenv("NEO4J_RELATIONSHIPS_PER_ENTITY", "25"))
+# k-hop neighbourhood budgets (defaults per request; depth is a hard ceiling)
+NEO4J_SUBGRAPH_MAX_DEPTH = int(os.getenv("NEO4J_SUBGRAPH_MAX_DEPTH", "3"))
+NEO4J_SUBGRAPH_MAX_FANOUT = int(os.getenv("NEO4J_SUBGRAPH_MAX_FANOUT", "10"))
+NEO4J_SUBGRAPH_MAX_NODES = int(os.getenv("NEO4J_SUBGRAPH_MAX_NODES", "100"))
+NEO4J_SUBGRAPH_MAX_EDGES = int(os.getenv("NEO4J_SUBGRAPH_MAX_EDGES", "200"))
+# Entity search ranks by text score * (1 + weight * centrality); 0 disables the blend
+NEO4J_CENTRALITY_WEIGHT = float(os.getenv("NEO4J_CENTRALITY_WEIGHT", "0.5"))
+# Recompute centrality in the background this many seconds after the last store_entities call
+NEO4J_CENTRALITY_AUTO_UPDATE = os.getenv("NEO4J_CENTRALITY_AUTO_UPDATE", "true").lower() == "true"
+NEO4J_CENTRALITY_UPDATE_DELAY = float(os.getenv("NEO4J_CENTRALITY_UPDATE_DELAY", "60"))
 
 # ChromaDB Configuration  
 # Use absolute path relative to project root to avoid working directory issues
 _project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CHROMADB_PATH = os.getenv("CHROMADB_PATH", os.path.join(_project_root, "chroma_db"))
 CHROMADB_COLLECTION = os.getenv("CHROMADB_COLLECTION", "knowledge_graph")
+# Vectors per upsert call in store_vectors (capped at the client's maximum batch size)
+CHROMADB_WRITE_BATCH_SIZE = int(os.getenv("CHROMADB_WRITE_BATCH_SIZE", "1000"))
+# Bulk ingestion pipeline: chunks per batch and batches buffered between stages
+INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "256"))
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "4"))
 
 # Embedding Configuration
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Padded tokens per batch for length-bucketed batching (0 = fixed EMBEDDING_BATCH_SIZE batches)
+EMBEDDING_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "8192"))
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "auto")  # auto, cpu, cuda, mps
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "float32")  # float32, float16
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "false").lower() == "true"
+
+# Embedding Backend (torch, onnx, onnx-int8); ONNX exports are cached on disk
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_CACHE_PATH = os.getenv("EMBEDDING_ONNX_CACHE_PATH", os.path.join(_project_root, "onnx_models"))
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")  # arm64, avx2, avx512, avx512_vnni
+
+# Embedding Cache (reuses vectors for re-ingested chunks)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(_project_root, "embedding_cache"))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000"))
+EMBEDDING_CACHE_DISK_ITEMS = int(os.getenv("EMBEDDING_CACHE_DISK_ITEMS", "1000000"))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+# Multi-process encoding pool for bulk ingestion (0 disables it)
+EMBEDDING_POOL_WORKERS = int(os.getenv("EMBEDDING_POOL_WORKERS", "0"))
+EMBEDDING_POOL_MIN_TEXTS = int(os.getenv("EMBEDDING_POOL_MIN_TEXTS", "256"))
+
+# Micro-batching of concurrent query encodes (HTTP mode)
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "32"))
+
+# Query tool result cache (cleared after every write; entries also expire after TTL seconds)
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
 
 # Citation Styles
 CITATION_STYLES = ["APA", "IEEE", "Nature", "MLA"]
\ No newline at end of file
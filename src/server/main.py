@@ -15,11 +15,20 @@ The server initializes storage managers and registers all tools from their
 respective modules, providing a clean separation of concerns.
 """
 
+import asyncio
+
 from fastmcp import FastMCP
 
 # Import our storage managers
-from storage.neo4j import Neo4jStorage, Neo4jQuery
+from storage.neo4j import (
+    Neo4jStorage,
+    AsyncNeo4jStorage,
+    AsyncNeo4jQuery,
+    close_shared_neo4j_driver,
+    close_shared_async_neo4j_driver,
+)
 from storage.chroma import ChromaDBStorage, ChromaDBQuery
+from storage.embedding import warmup_embedding_model, shutdown_encoding_pool
 import config
 
 # Import tool registration functions
@@ -34,13 +43,29 @@ from tools.processing.text_processing import register_text_processing_tools
 mcp = FastMCP("Knowledge Graph Research Assistant")
 
 # Initialize storage managers
+# Tool handlers await the async Neo4j managers; schema and maintenance
+# operations use the sync storage manager
 neo4j_storage = Neo4jStorage()
-neo4j_query = Neo4jQuery()
+async_neo4j_storage = AsyncNeo4jStorage()
+neo4j_query = AsyncNeo4jQuery()
 chromadb_storage = ChromaDBStorage()
 chromadb_query = ChromaDBQuery()
 
+# Both ChromaDB managers share one lazily loaded embedding model;
+# optionally load it now so the first request doesn't pay for it
+if config.EMBEDDING_WARMUP:
+    warmup_embedding_model()
+
+# Constraints and indexes keep MERGE/MATCH on ids from scanning every node;
+# a server started before Neo4j is up can create them later via the tool
+if config.NEO4J_ENSURE_SCHEMA:
+    try:
+        neo4j_storage.ensure_schema()
+    except Exception as e:
+        print(f"⚠️ Could not ensure Neo4j schema: {e}")
+
 # Register all tools from separate modules
-register_entity_tools(mcp, neo4j_storage)
+register_entity_tools(mcp, async_neo4j_storage)
 register_text_tools(mcp, chromadb_storage)
 register_management_tools(mcp, neo4j_storage, chromadb_storage)
 register_search_tools(mcp, neo4j_query, chromadb_query)
@@ -48,19 +73,32 @@ register_literature_tools(mcp, neo4j_query, chromadb_query)
 register_text_processing_tools(mcp)
 
 
+async def serve(**transport_kwargs):
+    """Run the server, then close the async Neo4j driver on the event loop that used it."""
+    try:
+        await mcp.run_async(**transport_kwargs)
+    finally:
+        await close_shared_async_neo4j_driver()
+
+
 if __name__ == "__main__":
     import sys
-    if "--http" in sys.argv:
-        # Run as HTTP server for easy GUI setup
-        print("🌐 Starting HTTP MCP server at http://localhost:3001")
-        print("   Add this URL in Claude Desktop connector settings")
-        print("   Try both: http://localhost:3001 and http://localhost:3001/mcp")
-        mcp.run(
-            transport="http", 
-            host="0.0.0.0",  # Accept connections from any interface
-            port=3001,
-            log_level="debug"
-        )
-    else:
-        # Run as STDIO for advanced JSON config
-        mcp.run()
\ No newline at end of file
+    try:
+        if "--http" in sys.argv:
+            # Run as HTTP server for easy GUI setup
+            print("🌐 Starting HTTP MCP server at http://localhost:3001")
+            print("   Add this URL in Claude Desktop connector settings")
+            print("   Try both: http://localhost:3001 and http://localhost:3001/mcp")
+            asyncio.run(serve(
+                transport="http", 
+                host="0.0.0.0",  # Accept connections from any interface
+                port=3001,
+                log_level="debug"
+            ))
+        else:
+            # Run as STDIO for advanced JSON config
+            asyncio.run(serve())
+    finally:
+        # Stop embedding worker processes, if any were started
+        shutdown_encoding_pool()
+        close_shared_neo4j_driver()
\ No newline at end of file
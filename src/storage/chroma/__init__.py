@@ -1,5 +1,6 @@
 """ChromaDB storage and query components."""
 from .storage import ChromaDBStorage
-from .query import ChromaDBQuery
+from .query import ChromaDBQuery, metadata_filter
+from .ingestion import IngestionPipeline
 
-__all__ = ["ChromaDBStorage", "ChromaDBQuery"]
\ No newline at end of file
+__all__ = ["ChromaDBStorage", "ChromaDBQuery", "IngestionPipeline", "metadata_filter"]
\ No newline at end of file
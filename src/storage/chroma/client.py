@@ -1,4 +1,5 @@
 """Shared ChromaDB client to ensure single database instance."""
+import json
 import chromadb
 from chromadb.config import Settings
 import config
@@ -8,6 +9,41 @@ import os
 _shared_client = None
 _shared_collection = None
 
+# Records which ChromaDB collection currently serves each configured
+# collection name; projection rebuilds build a new collection and switch
+# this pointer before dropping the old one
+ACTIVE_COLLECTIONS_FILE = "active_collections.json"
+
+def _active_collections_path() -> str:
+    return os.path.join(config.CHROMADB_PATH, ACTIVE_COLLECTIONS_FILE)
+
+def _read_active_collections() -> dict:
+    try:
+        with open(_active_collections_path()) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def get_active_collection_name() -> str:
+    """Name of the collection currently serving CHROMADB_COLLECTION."""
+    return _read_active_collections().get(config.CHROMADB_COLLECTION, config.CHROMADB_COLLECTION)
+
+def set_active_collection_name(collection_name: str):
+    """Point CHROMADB_COLLECTION at collection_name (atomically replaces the pointer file)."""
+    active = _read_active_collections()
+    if collection_name == config.CHROMADB_COLLECTION:
+        active.pop(config.CHROMADB_COLLECTION, None)
+    else:
+        active[config.CHROMADB_COLLECTION] = collection_name
+    
+    os.makedirs(config.CHROMADB_PATH, exist_ok=True)
+    path = _active_collections_path()
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(active, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
 def get_shared_chromadb_client():
     """Get a shared ChromaDB client instance with robust error handling and UUID prevention."""
     global _shared_client, _shared_collection
@@ -34,7 +70,7 @@ def get_shared_chromadb_client():
             
             # Always use get_or_create_collection for consistent collection reference
             _shared_collection = _shared_client.get_or_create_collection(
-                name=config.CHROMADB_COLLECTION
+                name=get_active_collection_name()
             )
             
             # Get document count (don't fail if this has issues)
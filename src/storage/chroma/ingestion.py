@@ -0,0 +1,246 @@
+"""Streaming chunk -> embed -> store ingestion for many documents."""
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import config
+from utils.document_ids import document_id_for
+from utils.text_chunking import PaperChunker
+from .storage import ChromaDBStorage, vector_metadata
+
+# Sentinel passed down the queues when the input is exhausted
+_DONE = object()
+
+
+class _DocumentEnd(NamedTuple):
+    """Queued after a document's last batch; the store stage then deletes its stale vectors."""
+    document_id: str
+    vector_ids: List[str]
+
+STAGES = ("chunk", "embed", "store")
+
+
+class IngestionPipeline:
+    """Chunk, embed and store documents with the three stages running concurrently.
+
+    Chunking runs in the calling thread as it consumes the document iterator;
+    embedding and Chroma writes run in their own threads. The stages are
+    connected by queues of at most INGESTION_QUEUE_SIZE batches, so a slow
+    stage makes the ones before it wait instead of buffering the corpus in
+    memory. Each batch holds at most INGESTION_BATCH_SIZE chunks of one
+    document (and no more than one upsert takes) and goes through the same
+    content-hash skip and upsert as ChromaDBStorage.store_vectors. Once all
+    of a document's batches are stored, its previously stored vectors that
+    are no longer among its chunks are deleted.
+
+    Documents are dicts with "text" and "document_info" (as accepted by
+    store_vectors). A failing document is reported in the results and the
+    rest of the run continues.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[ChromaDBStorage] = None,
+        chunker: Optional[PaperChunker] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """Use the given storage manager and chunker, or defaults."""
+        self.storage = storage or ChromaDBStorage()
+        self.chunker = chunker or PaperChunker()
+        self.queue_size = max(1, queue_size or config.INGESTION_QUEUE_SIZE)
+        self.batch_size = max(1, batch_size or config.INGESTION_BATCH_SIZE)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Clear counters before a run."""
+        with self._lock:
+            self._started = None
+            self._finished = None
+            self._stages = {
+                name: {"batches": 0, "vectors": 0, "busy_seconds": 0.0, "waiting_seconds": 0.0}
+                for name in STAGES
+            }
+            self._queues: Dict[str, queue.Queue] = {}
+            self._max_depth = {"embed": 0, "store": 0}
+            self._documents: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ingest every document; returns per-document results and pipeline stats."""
+        self._reset()
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        store_queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._queues = {"embed": embed_queue, "store": store_queue}
+            self._started = time.perf_counter()
+
+        workers = [
+            threading.Thread(target=self._embed_stage, args=(embed_queue, store_queue), name="ingest-embed", daemon=True),
+            threading.Thread(target=self._store_stage, args=(store_queue,), name="ingest-store", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            self._chunk_stage(documents, embed_queue)
+        finally:
+            # Also reached when the input iterator raises; workers drain and exit
+            self._put(embed_queue, "embed", _DONE, "chunk")
+            for worker in workers:
+                worker.join()
+            with self._lock:
+                self._finished = time.perf_counter()
+
+        return {"documents": dict(self._documents), **self.stats()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage throughput and queue depth; safe to call while a run is in progress.
+
+        waiting_seconds is time a stage spent blocked on a queue: idle for
+        input or held back by a full output queue.
+        """
+        with self._lock:
+            end = self._finished or time.perf_counter()
+            elapsed = end - self._started if self._started else 0.0
+            stages = {}
+            for name, stage in self._stages.items():
+                stages[name] = {
+                    **stage,
+                    "busy_seconds": round(stage["busy_seconds"], 4),
+                    "waiting_seconds": round(stage["waiting_seconds"], 4),
+                    "vectors_per_second": (
+                        round(stage["vectors"] / stage["busy_seconds"], 1) if stage["busy_seconds"] else 0.0
+                    ),
+                    "utilization": round(stage["busy_seconds"] / elapsed, 3) if elapsed else 0.0
+                }
+            queues = {
+                name: {"depth": q.qsize(), "max_depth": self._max_depth[name], "capacity": self.queue_size}
+                for name, q in self._queues.items()
+            }
+            return {
+                "elapsed_seconds": round(elapsed, 4),
+                "vectors_stored": sum(doc["stored"] for doc in self._documents.values()),
+                "vectors_skipped": sum(doc["skipped"] for doc in self._documents.values()),
+                "vectors_deleted": sum(doc["deleted"] for doc in self._documents.values()),
+                "stages": stages,
+                "queues": queues
+            }
+
+    def _record(self, stage: str, busy: float, batches: int = 0, vectors: int = 0):
+        with self._lock:
+            stats = self._stages[stage]
+            stats["busy_seconds"] += busy
+            stats["batches"] += batches
+            stats["vectors"] += vectors
+
+    def _document_result(self, document_id: str, **updates):
+        """Accumulate counts (or set an error) for one document."""
+        with self._lock:
+            result = self._documents.setdefault(document_id, {"chunks": 0, "stored": 0, "skipped": 0, "deleted": 0})
+            for key, value in updates.items():
+                if key == "error":
+                    result["error"] = value
+                else:
+                    result[key] += value
+
+    def _put(self, target: queue.Queue, name: str, item: Any, stage: str):
+        """Blocking put; time spent blocked is the producing stage's backpressure wait."""
+        start = time.perf_counter()
+        target.put(item)
+        with self._lock:
+            self._stages[stage]["waiting_seconds"] += time.perf_counter() - start
+            self._max_depth[name] = max(self._max_depth[name], target.qsize())
+
+    def _get(self, source: queue.Queue, stage: str) -> Any:
+        """Blocking get; time spent blocked is the consuming stage's idle wait."""
+        start = time.perf_counter()
+        item = source.get()
+        with self._lock:
+            self._stages[stage]["waiting_seconds"] += time.perf_counter() - start
+        return item
+
+    def _chunk_stage(self, documents: Iterable[Dict[str, Any]], embed_queue: queue.Queue):
+        """Chunk each document and queue its prepared vectors in batches."""
+        # Each batch is written with a single upsert
+        batch_size = min(self.batch_size, self.storage._write_batch_size())
+        for document in documents:
+            start = time.perf_counter()
+            document_info = document.get("document_info", {})
+            document_id = document_id_for(document_info)
+            try:
+                chunks = self.chunker.chunk_complete_paper(document["text"], document_info.get("title", "Unknown"))
+                items = self.storage._prepare_vectors(
+                    [chunk["content"] for chunk in chunks],
+                    [chunk["id"] for chunk in chunks],
+                    [vector_metadata(chunk, document_info, document_id) for chunk in chunks]
+                )
+            except Exception as e:
+                self._document_result(document_id, error=f"chunk: {e}")
+                continue
+            ids = list(items)
+            batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+            self._document_result(document_id, chunks=len(ids))
+            self._record("chunk", time.perf_counter() - start, batches=len(batches), vectors=len(ids))
+
+            for batch_ids in batches:
+                self._put(embed_queue, "embed", (document_id, batch_ids, items), "chunk")
+            self._put(embed_queue, "embed", _DocumentEnd(document_id, ids), "chunk")
+
+    def _embed_stage(self, embed_queue: queue.Queue, store_queue: queue.Queue):
+        """Skip unchanged vectors and encode the rest."""
+        while True:
+            work = self._get(embed_queue, "embed")
+            if work is _DONE:
+                self._put(store_queue, "store", _DONE, "embed")
+                return
+            if isinstance(work, _DocumentEnd):
+                self._put(store_queue, "store", work, "embed")
+                continue
+            document_id, batch_ids, items = work
+            start = time.perf_counter()
+            try:
+                changed = self.storage._changed_ids(batch_ids, items)
+                embeddings = self.storage._encode_vectors(changed, items) if changed else None
+            except Exception as e:
+                self._document_result(document_id, error=f"embed: {e}")
+                continue
+            self._document_result(document_id, skipped=len(batch_ids) - len(changed))
+            self._record("embed", time.perf_counter() - start, batches=1, vectors=len(changed))
+            if changed:
+                self._put(store_queue, "store", (document_id, changed, items, embeddings), "embed")
+
+    def _store_stage(self, store_queue: queue.Queue):
+        """Upsert encoded batches."""
+        while True:
+            work = self._get(store_queue, "store")
+            if work is _DONE:
+                return
+            if isinstance(work, _DocumentEnd):
+                self._delete_stale(work)
+                continue
+            document_id, ids, items, embeddings = work
+            start = time.perf_counter()
+            try:
+                self.storage._upsert_vectors(ids, items, embeddings)
+            except Exception as e:
+                self._document_result(document_id, error=f"store: {e}")
+                continue
+            self._document_result(document_id, stored=len(ids))
+            self._record("store", time.perf_counter() - start, batches=1, vectors=len(ids))
+
+    def _delete_stale(self, end: _DocumentEnd):
+        """Delete a fully stored document's vectors that are no longer among its chunks."""
+        with self._lock:
+            failed = "error" in self._documents.get(end.document_id, {})
+        # After a failed batch the document is incomplete; keep its old vectors
+        if failed:
+            return
+        start = time.perf_counter()
+        try:
+            deleted = self.storage.delete_stale_vectors(end.document_id, end.vector_ids)
+        except Exception as e:
+            self._document_result(end.document_id, error=f"store: {e}")
+            return
+        self._document_result(end.document_id, deleted=deleted)
+        self._record("store", time.perf_counter() - start)
@@ -0,0 +1,159 @@
+"""Corpus-fitted PCA projection for stored vectors."""
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import config
+
+# Collection metadata key recording the active projection version
+PROJECTION_METADATA_KEY = "projection_version"
+
+
+class VectorProjection:
+    """PCA projection fitted on a sample of corpus embeddings.
+
+    Projected vectors are ``(x - mean) @ components.T``. Centering does not
+    change L2 distances, so Chroma's default distance stays meaningful.
+    """
+
+    def __init__(self, version: str, mean: np.ndarray, components: np.ndarray, explained_variance: float):
+        """Wrap fitted PCA parameters."""
+        self.version = version
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+        self.explained_variance = explained_variance
+
+    @property
+    def source_dim(self) -> int:
+        """Embedding dimension the projection was fitted on."""
+        return self.components.shape[1]
+
+    @property
+    def target_dim(self) -> int:
+        """Dimension of projected vectors."""
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, target_dim: int, version: Optional[str] = None) -> "VectorProjection":
+        """Fit PCA on a sample of full-dimension vectors."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if target_dim >= vectors.shape[1]:
+            raise ValueError(f"target_dim {target_dim} must be below the embedding dimension {vectors.shape[1]}")
+        if vectors.shape[0] < target_dim:
+            raise ValueError(f"Need at least {target_dim} sample vectors to fit {target_dim} components, got {vectors.shape[0]}")
+
+        mean = vectors.mean(axis=0)
+        _, singular_values, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        variance = singular_values ** 2
+        explained = float(variance[:target_dim].sum() / variance.sum()) if variance.sum() else 1.0
+
+        # The random suffix keeps versions fitted within the same second apart
+        version = version or f"pca{target_dim}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        return cls(version, mean, vt[:target_dim], explained)
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Project full-dimension vectors (a single vector or a 2-D batch)."""
+        return (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components.T
+
+    def save(self, directory: str) -> str:
+        """Write this projection as <version>.npz under directory."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.version}.npz")
+        np.savez(path, mean=self.mean, components=self.components,
+                 explained_variance=np.float32(self.explained_variance))
+        return path
+
+    @classmethod
+    def load(cls, directory: str, version: str) -> "VectorProjection":
+        """Load a saved projection version."""
+        data = np.load(os.path.join(directory, f"{version}.npz"))
+        return cls(version, data["mean"], data["components"], float(data["explained_variance"]))
+
+
+def projection_directory() -> str:
+    """Directory holding projection versions for CHROMADB_COLLECTION.
+
+    Keyed by the configured name rather than the collection's own name,
+    which changes with every rebuild.
+    """
+    return os.path.join(config.CHROMADB_PATH, "projections", config.CHROMADB_COLLECTION)
+
+
+_loaded_projections: Dict[str, VectorProjection] = {}
+_loaded_lock = threading.Lock()
+
+def get_active_projection(collection) -> Optional[VectorProjection]:
+    """Projection recorded in the collection's metadata, or None for full-dimension vectors."""
+    version = (collection.metadata or {}).get(PROJECTION_METADATA_KEY)
+    if not version:
+        return None
+
+    directory = projection_directory()
+    key = f"{directory}/{version}"
+    with _loaded_lock:
+        if key not in _loaded_projections:
+            _loaded_projections[key] = VectorProjection.load(directory, version)
+        return _loaded_projections[key]
+
+
+def _top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k nearest corpus rows (L2) for each query."""
+    distances = (
+        np.sum(queries ** 2, axis=1, keepdims=True)
+        - 2 * queries @ corpus.T
+        + np.sum(corpus ** 2, axis=1)
+    )
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+def split_holdout(vectors: np.ndarray, holdout_fraction: float = 0.25, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Shuffle vectors and split them into (fit, held_out) parts."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    order = np.random.default_rng(seed).permutation(len(vectors))
+    num_held_out = max(2, int(round(len(vectors) * holdout_fraction)))
+    return vectors[order[num_held_out:]], vectors[order[:num_held_out]]
+
+
+def evaluate_projection_recall(
+    fit_vectors: np.ndarray,
+    eval_vectors: np.ndarray,
+    target_dims: List[int],
+    k: int = 10,
+    num_queries: int = 100
+) -> List[Dict[str, Any]]:
+    """Recall@k of PCA-projected search against full-dimension search.
+
+    PCA is fitted on fit_vectors only and recall is measured on eval_vectors,
+    which the projection has not seen (as with chunks stored after it was
+    applied). The first num_queries eval vectors are used as queries against
+    all eval vectors; each query's own row is removed from both result lists.
+    """
+    fit_vectors = np.asarray(fit_vectors, dtype=np.float32)
+    eval_vectors = np.asarray(eval_vectors, dtype=np.float32)
+    num_queries = min(num_queries, len(eval_vectors))
+    k = min(k, len(eval_vectors) - 1)
+    if k < 1:
+        raise ValueError("Need at least two held-out vectors to measure recall")
+
+    query_ids = np.arange(num_queries)
+
+    def neighbours(space: np.ndarray) -> List[set]:
+        top = _top_k(space[query_ids], space, k + 1)
+        return [set(row[row != q][:k].tolist()) for q, row in zip(query_ids, top)]
+
+    reference = neighbours(eval_vectors)
+    report = []
+    for target_dim in target_dims:
+        projection = VectorProjection.fit(fit_vectors, target_dim)
+        projected = neighbours(projection.transform(eval_vectors))
+        recall = np.mean([len(a & b) / k for a, b in zip(reference, projected)])
+        report.append({
+            "target_dim": target_dim,
+            f"recall_at_{k}": round(float(recall), 4),
+            "explained_variance": round(projection.explained_variance, 4),
+            "size_ratio": round(target_dim / fit_vectors.shape[1], 4)
+        })
+    return report
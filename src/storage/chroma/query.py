@@ -1,7 +1,45 @@
 """ChromaDB query manager for semantic search and retrieval."""
-from typing import List, Dict, Any
-from storage.embedding import EmbeddingService
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Set, Tuple
+import numpy as np
+from storage.embedding import EmbeddingService, EmbeddingBatcher
+from storage.embedding.cache import normalize_text
 from .client import get_shared_chromadb_client
+from .projection import get_active_projection
+import config
+
+def metadata_filter(
+    where: Optional[Dict[str, Any]] = None,
+    document_id: Optional[str] = None,
+    section: Optional[str] = None,
+    content_type: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Chroma where clause combining a raw filter with the common scoping fields.
+    
+    Returns None when nothing is filtered, so the whole collection is searched.
+    """
+    conditions = [where] if where else []
+    if document_id:
+        conditions.append({"document_id": document_id})
+    if section:
+        conditions.append({"section": section})
+    if content_type:
+        conditions.append({"content_type": content_type})
+    if year_from is not None:
+        conditions.append({"year": {"$gte": int(year_from)}})
+    if year_to is not None:
+        conditions.append({"year": {"$lte": int(year_to)}})
+    
+    if not conditions:
+        return None
+    # Chroma requires at least two operands for $and
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
 
 class ChromaDBQuery:
     """Handle query operations in ChromaDB with semantic search."""
@@ -10,55 +48,264 @@ class ChromaDBQuery:
         """Initialize ChromaDB using shared client and embedding service."""
         self.client, self.collection = get_shared_chromadb_client()
         self.embedding_service = EmbeddingService()
+        # Coalesces concurrent query encodes from async tool handlers
+        self.embedding_batcher = EmbeddingBatcher(self.embedding_service)
+        
+        # Bounded LRU of recent query embeddings so each distinct query is encoded once;
+        # queries being encoded right now are in _pending_queries so concurrent
+        # callers wait for that encode instead of starting their own
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending_queries: Dict[str, Future] = {}
+        self._query_embeddings_lock = threading.Lock()
+        self._encode_tasks: Set[asyncio.Task] = set()
+        self.query_embedding_hits = 0
+        self.query_embedding_misses = 0
+        self.query_embedding_shared = 0
+        
         print(f"🔍 ChromaDBQuery initialized with collection ID: {self.collection.id}")
     
+    def _claim_query(self, key: str) -> Tuple[Optional[np.ndarray], Optional[Future], bool]:
+        """Look up a normalized query: (cached embedding, None, False), the
+        pending encode to wait for (None, future, False), or a new future the
+        caller must resolve via _finish_query (None, future, True)."""
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(key)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(key)
+                self.query_embedding_hits += 1
+                return embedding, None, False
+            
+            future = self._pending_queries.get(key)
+            if future is not None:
+                self.query_embedding_shared += 1
+                return None, future, False
+            
+            future = Future()
+            self._pending_queries[key] = future
+            return None, future, True
+    
+    def _finish_query(self, key: str, future: Future, embedding: Optional[np.ndarray] = None, error: Optional[BaseException] = None):
+        """Publish a claimed query's embedding (or error) to the LRU and any waiters."""
+        with self._query_embeddings_lock:
+            del self._pending_queries[key]
+            if error is None:
+                self.query_embedding_misses += 1
+                self._query_embeddings[key] = embedding
+                self._query_embeddings.move_to_end(key)
+                while len(self._query_embeddings) > config.QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_embeddings.popitem(last=False)
+        if error is None:
+            future.set_result(embedding)
+        else:
+            future.set_exception(error)
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Get the embedding for a query string, reusing recently computed ones."""
+        key = normalize_text(query)
+        embedding, future, owner = self._claim_query(key)
+        if embedding is not None:
+            return embedding
+        if not owner:
+            return future.result()
+        
+        try:
+            embedding = self.embedding_service.encode_text(key)
+        except Exception as e:
+            self._finish_query(key, future, error=e)
+            raise
+        self._finish_query(key, future, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeddings for several queries; uncached ones are encoded in one model batch."""
+        keys = [normalize_text(query) for query in queries]
+        found: Dict[str, np.ndarray] = {}
+        owned: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        for key in dict.fromkeys(keys):
+            embedding, future, owner = self._claim_query(key)
+            if embedding is not None:
+                found[key] = embedding
+            elif owner:
+                owned[key] = future
+            else:
+                waiting[key] = future
+        
+        if owned:
+            try:
+                computed = self.embedding_service.encode_texts(list(owned))
+            except Exception as e:
+                for key, future in owned.items():
+                    self._finish_query(key, future, error=e)
+                raise
+            for (key, future), embedding in zip(owned.items(), computed):
+                self._finish_query(key, future, embedding)
+                found[key] = embedding
+        for key, future in waiting.items():
+            found[key] = future.result()
+        return np.vstack([found[key] for key in keys])
+    
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """Async embed_query; concurrent callers share one model batch, and
+        callers asking for a query already being encoded share that encode."""
+        key = normalize_text(query)
+        embedding, future, owner = self._claim_query(key)
+        if embedding is not None:
+            return embedding
+        if owner:
+            # A task, so a cancelled first caller does not abandon the waiters
+            task = asyncio.ensure_future(self._encode_claimed(key, future))
+            self._encode_tasks.add(task)
+            task.add_done_callback(self._encode_tasks.discard)
+        return await asyncio.shield(asyncio.wrap_future(future))
+    
+    async def _encode_claimed(self, key: str, future: Future):
+        """Encode a claimed query through the batcher and publish the result."""
+        try:
+            embedding = await self.embedding_batcher.encode(key)
+        except BaseException as e:
+            self._finish_query(key, future, error=e)
+            return
+        self._finish_query(key, future, embedding)
+    
+    def get_query_embedding_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the query embedding LRU.
+        
+        shared counts lookups that joined an encode already in progress.
+        """
+        lookups = self.query_embedding_hits + self.query_embedding_misses + self.query_embedding_shared
+        return {
+            "size": len(self._query_embeddings),
+            "max_size": config.QUERY_EMBEDDING_CACHE_SIZE,
+            "hits": self.query_embedding_hits,
+            "shared": self.query_embedding_shared,
+            "misses": self.query_embedding_misses,
+            "hit_rate": round((self.query_embedding_hits + self.query_embedding_shared) / lookups, 4) if lookups else 0.0,
+            "batcher": self.embedding_batcher.get_stats()
+        }
+    
     def query_similar_text(
         self, 
         query: str, 
         n_results: int = 5,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        query_embedding: Optional[np.ndarray] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Query similar text using semantic search."""
+        """Query similar text using semantic search.
+        
+        Pass query_embedding to skip encoding when the caller already has it.
+        where filters on metadata (e.g. {"document_id": "..."} or one built by
+        metadata_filter) and where_document on the text ({"$contains": "..."});
+        Chroma applies them before the nearest-neighbour search, so only
+        matching vectors are considered.
+        """
         # Get fresh collection reference to avoid stale cache
         _, collection = get_shared_chromadb_client()
         
         # Generate query embedding
-        query_embedding = self.embedding_service.encode_text(query)
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        
+        # Apply the same projection the stored vectors went through
+        projection = get_active_projection(collection)
+        if projection is not None:
+            query_embedding = projection.transform(query_embedding)
         
         # Search ChromaDB
         results = collection.query(
-            query_embeddings=[query_embedding.tolist()],
+            query_embeddings=[np.asarray(query_embedding).tolist()],
             n_results=n_results,
+            where=where or None,
+            where_document=where_document or None,
             include=["documents", "metadatas", "distances"] if include_metadata else ["documents"]
         )
+        return self._format_results(results, 0, include_metadata)
+    
+    def batch_query_similar_text(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        include_metadata: bool = True,
+        query_embeddings: Optional[np.ndarray] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """query_similar_text for several queries with one collection.query call.
         
-        # Format results
+        Returns one result list per query, in order. Pass query_embeddings
+        (one row per query, e.g. from embed_queries) to skip encoding.
+        """
+        if not queries:
+            return []
+        _, collection = get_shared_chromadb_client()
+        
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        projection = get_active_projection(collection)
+        if projection is not None:
+            query_embeddings = projection.transform(query_embeddings)
+        
+        results = collection.query(
+            query_embeddings=np.asarray(query_embeddings).tolist(),
+            n_results=n_results,
+            where=where or None,
+            where_document=where_document or None,
+            include=["documents", "metadatas", "distances"] if include_metadata else ["documents"]
+        )
+        return [self._format_results(results, i, include_metadata) for i in range(len(queries))]
+    
+    @staticmethod
+    def _format_results(results: Dict[str, Any], index: int, include_metadata: bool) -> List[Dict[str, Any]]:
+        """Result dicts for the index-th query of a collection.query response."""
         formatted_results = []
-        for i in range(len(results["documents"][0])):
+        for i in range(len(results["documents"][index])):
             result = {
-                "text": results["documents"][0][i],
-                "distance": results["distances"][0][i],
+                "text": results["documents"][index][i],
+                "distance": results["distances"][index][i] if results.get("distances") else None,
             }
             if include_metadata and results["metadatas"]:
-                result["metadata"] = results["metadatas"][0][i]
+                result["metadata"] = results["metadatas"][index][i]
             formatted_results.append(result)
         
         return formatted_results
     
-    def get_citations_for_topic(self, topic: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get citations related to a specific topic."""
-        results = self.query_similar_text(topic, n_results=limit)
+    def get_citations_for_topic(
+        self,
+        topic: str,
+        limit: int = 10,
+        results: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get citations related to a specific topic.
+        
+        Pass results from a previous query_similar_text call for the same topic
+        to reuse that search instead of running it again.
+        """
+        if results is None:
+            results = self.query_similar_text(topic, n_results=limit)
         
         citations = []
+        seen = []
         for result in results:
             metadata = result.get("metadata", {})
             result_citations = metadata.get("citations", [])
+            # flatten_metadata stores list values as JSON strings
+            if isinstance(result_citations, str):
+                try:
+                    result_citations = json.loads(result_citations)
+                except ValueError:
+                    continue
+            if not isinstance(result_citations, list):
+                continue
             for citation in result_citations:
-                if citation not in citations:  # Avoid duplicates
-                    citations.append({
-                        **citation,
-                        "relevance_score": 1 - result["distance"],  # Convert distance to relevance
-                        "context": result["text"][:200] + "..."
-                    })
-        
-        return citations[:limit]
\ No newline at end of file
+                if not isinstance(citation, dict) or citation in seen:  # Avoid duplicates
+                    continue
+                seen.append(citation)
+                citations.append({
+                    **citation,
+                    "relevance_score": 1 - result["distance"],  # Convert distance to relevance
+                    "context": result["text"][:200] + "..."
+                })
+        
+        return citations[:limit]
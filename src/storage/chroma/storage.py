@@ -1,7 +1,68 @@
 """ChromaDB storage manager for text and citations."""
-from typing import List, Dict, Any
-from storage.embedding import EmbeddingService
+import json
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import config
+from storage.embedding import EmbeddingService, get_shared_embedding_cache
+from storage.embedding.cache import text_hash
+from utils.result_cache import bump_result_generation
 from .client import get_shared_chromadb_client
+from .projection import (
+    PROJECTION_METADATA_KEY,
+    VectorProjection,
+    evaluate_projection_recall,
+    get_active_projection,
+    projection_directory,
+    split_holdout,
+)
+
+# Metadata key holding the hash of the embedded content, the embedding model
+# and the vector's other metadata; a vector is rewritten when any of them change
+CONTENT_HASH_KEY = "content_hash"
+
+# Metadata that changes on every store and does not make a vector stale
+_UNHASHED_METADATA = {"stored_at", CONTENT_HASH_KEY}
+
+def document_vector_id(document_id: Optional[str], vector_id: str) -> str:
+    """Deterministic collection ID of a document's vector."""
+    return f"{document_id}_{vector_id}" if document_id else vector_id
+
+def flatten_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Chroma only stores scalar metadata; nested values become JSON strings
+    and None values are dropped."""
+    flattened = {}
+    for key, value in metadata.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            flattened[key] = value
+        else:
+            flattened[key] = json.dumps(value, default=str)
+    return flattened
+
+def vector_metadata(vector: Dict[str, Any], document_info: Dict[str, Any], document_id: str) -> Dict[str, Any]:
+    """Provenance and citation metadata stored with a document's vector."""
+    metadata = {
+        "document_id": document_id,
+        "document_title": document_info.get("title", "Untitled Document"),
+        "document_type": document_info.get("type", "document"),
+        "vector_type": vector.get("type", "unknown"),
+        "vector_id": vector["id"],
+        "stored_at": datetime.now().isoformat(),
+        **vector.get("properties", {})
+    }
+    
+    # Add citation metadata if available
+    for field in ["doi", "journal", "year", "citation_preview"]:
+        if document_info.get(field) is not None:
+            metadata[field] = document_info[field]
+    
+    # Year-range filters compare numbers, so "2017" is stored as 2017
+    if isinstance(metadata.get("year"), str) and metadata["year"].strip().isdigit():
+        metadata["year"] = int(metadata["year"])
+    return metadata
 
 class ChromaDBStorage:
     """Handle text storage operations in ChromaDB with embeddings."""
@@ -9,7 +70,9 @@ class ChromaDBStorage:
     def __init__(self):
         """Initialize ChromaDB using shared client and embedding service."""
         self.client, self.collection = get_shared_chromadb_client()
-        self.embedding_service = EmbeddingService()
+        # Ingestion re-encodes the same chunks after failed runs and rebuilds,
+        # so storage goes through the persistent content-hash cache
+        self.embedding_service = EmbeddingService(cache=get_shared_embedding_cache())
         print(f"📝 ChromaDBStorage initialized with collection ID: {self.collection.id}")
     
     
@@ -17,39 +80,239 @@ class ChromaDBStorage:
         self,
         contents: List[str],
         vector_ids: List[str], 
-        metadatas: List[Dict[str, Any]]
+        metadatas: List[Dict[str, Any]],
+        replace: bool = True
     ) -> Dict[str, Any]:
-        """Store any type of content as vectors in ChromaDB."""
+        """Upsert any type of content as vectors in ChromaDB.
+        
+        vector_ids are scoped to each metadata's document_id (see
+        document_vector_id), so chunk IDs such as page3_chunk7_methods never
+        collide across documents and re-storing a document overwrites its
+        vectors. Writes go in batches no larger than Chroma accepts; vectors
+        whose content and metadata are unchanged are skipped without
+        re-embedding. With replace, the given vectors are each document's
+        complete set and its previously stored vectors not among them are
+        deleted.
+        """
         if not contents:
-            return {"vectors_stored": 0}
+            return {"vectors_stored": 0, "vectors_skipped": 0, "vectors_deleted": 0, "batches": []}
         
-        # Generate embeddings for all content
-        embeddings = self.embedding_service.encode_texts(contents)
+        items = self._prepare_vectors(contents, vector_ids, metadatas)
+        batches = []
+        for batch_ids in self._write_batches(list(items)):
+            changed = self._changed_ids(batch_ids, items)
+            if changed:
+                self._upsert_vectors(changed, items, self._encode_vectors(changed, items))
+            batches.append({"vectors": len(batch_ids), "stored": len(changed), "skipped": len(batch_ids) - len(changed)})
         
-        # Store in ChromaDB
-        self.collection.add(
-            documents=contents,
-            embeddings=embeddings.tolist(),
-            metadatas=metadatas,
-            ids=vector_ids
-        )
+        deleted = 0
+        if replace:
+            by_document: Dict[str, List[str]] = {}
+            for vector_id, (_, metadata) in items.items():
+                if metadata.get("document_id"):
+                    by_document.setdefault(metadata["document_id"], []).append(vector_id)
+            for document_id, keep_ids in by_document.items():
+                deleted += self.delete_stale_vectors(document_id, keep_ids)
         
         return {
-            "vectors_stored": len(contents),
+            "vectors_stored": sum(batch["stored"] for batch in batches),
+            "vectors_skipped": sum(batch["skipped"] for batch in batches),
+            "vectors_deleted": deleted,
+            "batches": batches,
             "document_id": metadatas[0].get("document_id") if metadatas else None
         }
     
+    # store_vectors phases, also run as separate stages by IngestionPipeline
+    
+    def _prepare_vectors(
+        self,
+        contents: List[str],
+        vector_ids: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Scoped ID -> (content, flat metadata with content hash), in input order.
+        
+        The last occurrence of a repeated ID wins, as a sequence of upserts would.
+        """
+        items = {}
+        for content, vector_id, metadata in zip(contents, vector_ids, metadatas):
+            scoped_id = document_vector_id(metadata.get("document_id"), vector_id)
+            metadata = flatten_metadata(metadata)
+            hashed_metadata = json.dumps(
+                {key: value for key, value in metadata.items() if key not in _UNHASHED_METADATA}, sort_keys=True
+            )
+            metadata[CONTENT_HASH_KEY] = text_hash(self.embedding_service.cache_namespace, f"{content}\0{hashed_metadata}")
+            items.pop(scoped_id, None)
+            items[scoped_id] = (content, metadata)
+        return items
+    
+    def _write_batch_size(self) -> int:
+        """Vectors per upsert, never more than Chroma accepts."""
+        return max(1, min(config.CHROMADB_WRITE_BATCH_SIZE, self.client.get_max_batch_size()))
+    
+    def _write_batches(self, ids: List[str]) -> List[List[str]]:
+        """Split IDs into upsert batches."""
+        batch_size = self._write_batch_size()
+        return [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+    
+    def _changed_ids(self, ids: List[str], items: Dict[str, Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """IDs that are new or whose stored content or metadata differs."""
+        stored = self.collection.get(ids=ids, include=["metadatas"])
+        stored_hashes = {
+            vector_id: (metadata or {}).get(CONTENT_HASH_KEY)
+            for vector_id, metadata in zip(stored["ids"], stored["metadatas"])
+        }
+        return [vector_id for vector_id in ids if stored_hashes.get(vector_id) != items[vector_id][1][CONTENT_HASH_KEY]]
+    
+    def _encode_vectors(self, ids: List[str], items: Dict[str, Tuple[str, Dict[str, Any]]]) -> np.ndarray:
+        """Embeddings of the given items at the collection's dimension."""
+        embeddings = self.embedding_service.encode_texts([items[vector_id][0] for vector_id in ids])
+        # Reduce to the collection's projected dimension, if one is active
+        projection = get_active_projection(self.collection)
+        if projection is not None:
+            embeddings = projection.transform(embeddings)
+        return embeddings
+    
+    def _upsert_vectors(self, ids: List[str], items: Dict[str, Tuple[str, Dict[str, Any]]], embeddings: np.ndarray):
+        """Write one batch of encoded items."""
+        self.collection.upsert(
+            ids=ids,
+            documents=[items[vector_id][0] for vector_id in ids],
+            embeddings=embeddings.tolist(),
+            metadatas=[items[vector_id][1] for vector_id in ids]
+        )
+        bump_result_generation()
+    
+    def delete_stale_vectors(self, document_id: str, keep_ids: List[str]) -> int:
+        """Delete a document's stored vectors that are not in keep_ids; returns how many."""
+        keep = set(keep_ids)
+        stored_ids = self.collection.get(where={"document_id": document_id}, include=[])["ids"]
+        stale = [vector_id for vector_id in stored_ids if vector_id not in keep]
+        for batch in self._write_batches(stale):
+            self.collection.delete(ids=batch)
+        if stale:
+            bump_result_generation()
+        return len(stale)
+    
+    def delete_document(self, document_id: str) -> int:
+        """Delete every vector stored for one document; returns how many."""
+        vector_ids = self.collection.get(where={"document_id": document_id}, include=[])["ids"]
+        if vector_ids:
+            self.collection.delete(ids=vector_ids)
+            bump_result_generation()
+        return len(vector_ids)
+    
     def clear_collection(self):
         """Clear all data from the collection."""
-        import config
-        from .client import reset_shared_client
+        from .client import reset_shared_client, set_active_collection_name
         
-        # Delete the collection
-        self.client.delete_collection(config.CHROMADB_COLLECTION)
+        # Delete the active collection and point back at CHROMADB_COLLECTION
+        self.client.delete_collection(self.collection.name)
+        set_active_collection_name(config.CHROMADB_COLLECTION)
+        bump_result_generation()
         
         # Reset the shared client to force recreation
         reset_shared_client()
         
         # Get fresh client and collection
         from .client import get_shared_chromadb_client
-        self.client, self.collection = get_shared_chromadb_client()
\ No newline at end of file
+        self.client, self.collection = get_shared_chromadb_client()
+    
+    def sample_embeddings(self, sample_size: int) -> np.ndarray:
+        """Full-dimension embeddings for up to sample_size stored documents."""
+        page = self.collection.get(limit=sample_size, include=["documents"])
+        return self.embedding_service.encode_texts(page["documents"])
+    
+    def evaluate_projection(self, target_dims: List[int], sample_size: int = 2000, k: int = 10) -> Dict[str, Any]:
+        """Report recall@k of candidate projection dimensions on a corpus sample.
+        
+        PCA is fitted on part of the sample and recall is measured on the held-out rest.
+        """
+        vectors = self.sample_embeddings(sample_size)
+        if len(vectors) < 4:
+            raise ValueError("Not enough stored vectors to evaluate a projection")
+        
+        fit_vectors, eval_vectors = split_holdout(vectors)
+        return {
+            "sample_size": len(vectors),
+            "fit_size": len(fit_vectors),
+            "held_out_size": len(eval_vectors),
+            "full_dim": vectors.shape[1],
+            "k": min(k, len(eval_vectors) - 1),
+            "candidates": evaluate_projection_recall(
+                fit_vectors, eval_vectors,
+                [d for d in target_dims if d < min(vectors.shape[1], len(fit_vectors))], k=k
+            )
+        }
+    
+    def apply_projection(self, target_dim: Optional[int], sample_size: int = 5000) -> Dict[str, Any]:
+        """Fit a new projection version and rebuild the collection with it.
+        
+        target_dim=None removes the projection and restores full-dimension vectors.
+        """
+        projection = None
+        if target_dim is not None:
+            projection = VectorProjection.fit(self.sample_embeddings(sample_size), target_dim)
+            projection.save(projection_directory())
+        
+        try:
+            vectors_rebuilt = self._rebuild_collection(projection)
+        finally:
+            bump_result_generation()
+        return {
+            "projection_version": projection.version if projection else None,
+            "target_dim": projection.target_dim if projection else None,
+            "explained_variance": round(projection.explained_variance, 4) if projection else None,
+            "vectors_rebuilt": vectors_rebuilt
+        }
+    
+    def _rebuild_collection(self, projection: Optional[VectorProjection]) -> int:
+        """Re-embed every stored document into a fresh collection and swap it in.
+        
+        The HNSW index dimension is fixed per collection, so changing the
+        projection means building a new collection (embeddings come from the
+        embedding cache). The old collection keeps serving queries until the
+        new one is complete; then the active collection pointer is switched
+        and the old collection is dropped.
+        """
+        from .client import reset_shared_client, set_active_collection_name
+        
+        old_name = self.collection.name
+        new_name = f"{config.CHROMADB_COLLECTION}_{uuid.uuid4().hex[:8]}"
+        
+        metadata = {k: v for k, v in (self.collection.metadata or {}).items() if k != PROJECTION_METADATA_KEY}
+        if projection is not None:
+            metadata[PROJECTION_METADATA_KEY] = projection.version
+        rebuilt = self.client.create_collection(new_name, metadata=metadata or None)
+        
+        batch_size = self.client.get_max_batch_size()
+        total = self.collection.count()
+        try:
+            for offset in range(0, total, batch_size):
+                page = self.collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+                if not page["ids"]:
+                    break
+                embeddings = self.embedding_service.encode_texts(page["documents"])
+                if projection is not None:
+                    embeddings = projection.transform(embeddings)
+                rebuilt.add(
+                    ids=page["ids"],
+                    documents=page["documents"],
+                    metadatas=page["metadatas"],
+                    embeddings=embeddings.tolist()
+                )
+            set_active_collection_name(new_name)
+        except Exception:
+            # The old collection is still active; discard the partial copy
+            self.client.delete_collection(new_name)
+            raise
+        
+        # Every manager picks up the rebuilt collection through the shared client
+        reset_shared_client()
+        self.client, self.collection = get_shared_chromadb_client()
+        
+        try:
+            self.client.delete_collection(old_name)
+        except Exception as e:
+            print(f"⚠️ Could not drop previous collection {old_name}: {e}")
+        return total
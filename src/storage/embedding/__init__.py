@@ -1,4 +1,22 @@
 """Embedding service components."""
-from .service import EmbeddingService
+from .service import EmbeddingService, get_encoding_throughput_stats
+from .cache import EmbeddingCache, get_shared_embedding_cache
+from .pool import shutdown_encoding_pool
+from .batcher import EmbeddingBatcher
+from .registry import (
+    get_shared_embedding_model,
+    warmup_embedding_model,
+    get_embedding_registry_stats,
+)
 
-__all__ = ["EmbeddingService"]
\ No newline at end of file
+__all__ = [
+    "EmbeddingService",
+    "get_encoding_throughput_stats",
+    "EmbeddingBatcher",
+    "EmbeddingCache",
+    "get_shared_embedding_cache",
+    "get_shared_embedding_model",
+    "warmup_embedding_model",
+    "get_embedding_registry_stats",
+    "shutdown_encoding_pool",
+]
@@ -0,0 +1,87 @@
+"""Asyncio micro-batching front end for concurrent single-text encodes."""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import config
+from .service import EmbeddingService
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent ``encode`` calls into one model batch.
+
+    A request that arrives while no batch is being encoded is dispatched
+    immediately, so a lone request pays no extra latency. Requests arriving
+    while an encode is running queue up and are sent together, up to
+    ``max_items`` at a time, as soon as it finishes. Only one batch is encoded
+    at a time since the model and its tokenizer are shared. Each batch is one
+    ``encode_texts`` call on a worker thread, and each caller's future is
+    resolved with its own row.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_items: Optional[int] = None
+    ):
+        """Initialize batcher around an embedding service."""
+        self.embedding_service = embedding_service
+        self.max_items = max_items or config.EMBEDDING_BATCH_MAX_ITEMS
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._encoding = False
+        # Running batch tasks; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encode one text, sharing a model batch with concurrent callers."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+
+        if not self._encoding:
+            self._flush()
+
+        return await future
+
+    def _flush(self):
+        """Hand up to max_items queued texts to a worker thread as one batch."""
+        batch, self._pending = self._pending[:self.max_items], self._pending[self.max_items:]
+        if batch:
+            self._encoding = True
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Encode a batch off the event loop and resolve each caller's future."""
+        # Identical texts in one batch are encoded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await asyncio.to_thread(self.embedding_service.encode_texts, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            # Send whatever queued up during this encode
+            self._encoding = False
+            self._flush()
+
+        self.batches += 1
+        self.items += len(batch)
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(by_text[text])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch counts and average coalesced batch size."""
+        return {
+            "max_items": self.max_items,
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
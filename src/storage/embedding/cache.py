@@ -0,0 +1,251 @@
+"""Persistent content-hash cache for embeddings."""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import config
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted chunks share a cache entry."""
+    return " ".join(text.split())
+
+
+def text_hash(model_name: str, text: str) -> str:
+    """Cache key for a (model name, normalized text) pair."""
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# The vector file grows by at least this many rows at a time (doubling up to capacity)
+_MIN_GROWTH_ROWS = 4096
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-memory LRU over a size-bounded disk store.
+
+    The disk tier keeps vectors in a memory-mapped float32 array used as a ring
+    buffer of ``max_disk_items`` rows, with a SQLite index mapping content hash
+    to row. When the ring wraps, the oldest rows are overwritten. The file
+    grows in chunks as rows are used rather than being allocated at full
+    capacity.
+
+    Several processes (the server and ingestion scripts) may share one cache
+    directory: every disk-tier read and write runs inside a SQLite
+    ``BEGIN IMMEDIATE`` transaction, which other processes wait for, so ring
+    slots are never allocated twice or read while being overwritten.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_items: Optional[int] = None,
+        max_disk_items: Optional[int] = None
+    ):
+        """Open (or create) the cache directory."""
+        self.path = os.path.abspath(path or config.EMBEDDING_CACHE_PATH)
+        self.max_memory_items = max_memory_items or config.EMBEDDING_CACHE_MEMORY_ITEMS
+        self.max_disk_items = max_disk_items or config.EMBEDDING_CACHE_DISK_ITEMS
+
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+
+        # Autocommit mode; transactions are opened explicitly by _disk_transaction
+        self._db = sqlite3.connect(
+            os.path.join(self.path, "index.sqlite"), check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, row INTEGER UNIQUE)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # An existing vector file keeps the capacity it was created with
+        self.max_disk_items = self._get_meta("capacity") or self.max_disk_items
+        self._dim = self._get_meta("dim")
+        if self._dim is not None:
+            self._open_vectors(self._dim)
+
+    def _get_meta(self, name: str) -> Optional[int]:
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: int):
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    @contextmanager
+    def _disk_transaction(self):
+        """Hold the index's write lock, excluding other processes' disk-tier access."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _mapped_rows(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _open_vectors(self, dim: int, min_rows: int = 0):
+        """Map the vector file, first growing it to at least min_rows rows.
+
+        Also called to pick up rows added by another process.
+        """
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = min(size // row_bytes, self.max_disk_items)
+        if rows < min_rows:
+            rows = min(self.max_disk_items, max(min_rows, 2 * rows, _MIN_GROWTH_ROWS))
+            # Extending with truncate leaves the new rows sparse until written
+            with open(self._vectors_path, "r+b" if size else "w+b") as f:
+                f.truncate(rows * row_bytes)
+
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, dim)
+        ) if rows else None
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the in-memory LRU tier, evicting the least recently used."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors; missing entries come back as None."""
+        keys = [text_hash(model_name, text) for text in texts]
+        found: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        with self._lock:
+            disk_lookups = []
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_lookups.append(i)
+
+            if disk_lookups:
+                with self._disk_transaction():
+                    # Another process may have created the vector file since we opened
+                    self._dim = self._dim or self._get_meta("dim")
+                    rows = {}
+                    lookup_keys = list({keys[i] for i in disk_lookups}) if self._dim else []
+                    # Stay well under SQLite's bound-parameter limit
+                    for start in range(0, len(lookup_keys), 500):
+                        batch = lookup_keys[start:start + 500]
+                        placeholders = ",".join("?" * len(batch))
+                        rows.update(self._db.execute(
+                            f"SELECT key, row FROM entries WHERE key IN ({placeholders})", batch
+                        ).fetchall())
+
+                    if rows and max(rows.values()) >= self._mapped_rows():
+                        self._open_vectors(self._dim)
+                    for i in disk_lookups:
+                        row = rows.get(keys[i])
+                        if row is not None:
+                            vector = np.array(self._vectors[row])
+                            found[i] = vector
+                            self._remember(keys[i], vector)
+                            self.disk_hits += 1
+
+            self.misses += sum(1 for vector in found if vector is None)
+
+        return found
+
+    def put_many(self, model_name: str, texts: List[str], vectors: np.ndarray):
+        """Store freshly computed vectors in both tiers."""
+        if len(texts) == 0:
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._disk_transaction():
+            dim = self._dim or self._get_meta("dim")
+            if dim is None:
+                dim = vectors.shape[1]
+                self._set_meta("dim", dim)
+                self._set_meta("capacity", self.max_disk_items)
+            elif dim != vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match cache dimension "
+                    f"{dim}; use a separate EMBEDDING_CACHE_PATH per model size"
+                )
+            self._dim = dim
+
+            # Read inside the transaction so concurrent writers never share a slot
+            next_row = self._get_meta("next_row") or 0
+            for text, vector in zip(texts, vectors):
+                key = text_hash(model_name, text)
+                self._remember(key, vector)
+                if self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                    continue
+
+                row = next_row % self.max_disk_items
+                if row >= self._mapped_rows():
+                    self._open_vectors(dim, row + 1)
+                self._db.execute("DELETE FROM entries WHERE row = ?", (row,))
+                self._db.execute("INSERT INTO entries (key, row) VALUES (?, ?)", (key, row))
+                self._vectors[row] = vector
+                next_row += 1
+
+            self._set_meta("next_row", next_row)
+            if self._vectors is not None:
+                self._vectors.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            disk_items = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "path": self.path,
+                "memory_items": len(self._memory),
+                "disk_items": disk_items,
+                "max_memory_items": self.max_memory_items,
+                "max_disk_items": self.max_disk_items,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
+
+    def close(self):
+        """Flush vectors and close the index."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._db.close()
+
+
+# Global shared cache instance
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache, or None when caching is disabled."""
+    global _shared_cache
+
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache()
+            print(f"💾 Embedding cache opened: {_shared_cache.path}")
+
+    return _shared_cache
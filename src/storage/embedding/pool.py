@@ -0,0 +1,71 @@
+"""Multi-process encoding pool for bulk embedding."""
+import atexit
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+import config
+
+# Global shared pool; workers are started once and reused between calls
+_shared_pool: Optional[Dict[str, Any]] = None
+_shared_pool_model: Optional[SentenceTransformer] = None
+_pool_lock = threading.Lock()
+
+
+def pool_enabled_for(num_texts: int) -> bool:
+    """Whether an encode of this size should be sharded across worker processes."""
+    return config.EMBEDDING_POOL_WORKERS > 0 and num_texts >= config.EMBEDDING_POOL_MIN_TEXTS
+
+
+def get_shared_encoding_pool(model: SentenceTransformer) -> Dict[str, Any]:
+    """Get the worker pool for a model, starting it on first use."""
+    global _shared_pool, _shared_pool_model
+
+    with _pool_lock:
+        if _shared_pool is not None and _shared_pool_model is not model:
+            # The configured model changed; workers hold the old one
+            model.stop_multi_process_pool(_shared_pool)
+            _shared_pool = None
+
+        if _shared_pool is None:
+            workers = config.EMBEDDING_POOL_WORKERS
+            _shared_pool = model.start_multi_process_pool(target_devices=["cpu"] * workers)
+            _shared_pool_model = model
+            # Workers load the model on their first task; do it now rather than in a timed encode
+            model.encode(["warmup"] * workers, pool=_shared_pool, chunk_size=1, show_progress_bar=False)
+            print(f"🧵 Embedding pool started with {workers} worker processes")
+
+    return _shared_pool
+
+
+def pool_chunk_size(num_texts: int, batch_size: int) -> int:
+    """Texts per chunk handed to a worker: enough chunks per worker to balance uneven lengths."""
+    return max(batch_size, num_texts // (config.EMBEDDING_POOL_WORKERS * 4) + 1)
+
+
+def encode_with_pool(model: SentenceTransformer, texts: List[str], batch_size: int) -> np.ndarray:
+    """Shard texts across the worker pool; output order matches input order."""
+    pool = get_shared_encoding_pool(model)
+    return model.encode(
+        texts,
+        pool=pool,
+        batch_size=batch_size,
+        chunk_size=pool_chunk_size(len(texts), batch_size),
+        show_progress_bar=False
+    )
+
+
+def shutdown_encoding_pool():
+    """Stop worker processes (called on server shutdown and at interpreter exit)."""
+    global _shared_pool, _shared_pool_model
+
+    with _pool_lock:
+        if _shared_pool is not None:
+            SentenceTransformer.stop_multi_process_pool(_shared_pool)
+            _shared_pool = None
+            _shared_pool_model = None
+            print("🧵 Embedding pool stopped")
+
+
+atexit.register(shutdown_encoding_pool)
@@ -0,0 +1,195 @@
+"""Process-wide registry of loaded embedding models."""
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sentence_transformers import SentenceTransformer
+import config
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Global shared model instances keyed by (model name, device, precision, backend)
+_shared_models: Dict[Tuple[str, str, str, str], SentenceTransformer] = {}
+_registry_lock = threading.Lock()
+
+
+def _resolve_key(
+    model_name: Optional[str] = None,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    backend: Optional[str] = None
+) -> Tuple[str, str, str, str]:
+    """Fill in configured defaults for a registry key."""
+    return (
+        model_name or config.EMBEDDING_MODEL,
+        device or config.EMBEDDING_DEVICE,
+        precision or config.EMBEDDING_PRECISION,
+        backend or config.EMBEDDING_BACKEND
+    )
+
+
+def _onnx_export_dir(model_name: str) -> str:
+    """Directory holding the cached ONNX export of a model."""
+    safe_name = model_name.replace("/", "__")
+    return os.path.join(config.EMBEDDING_ONNX_CACHE_PATH, safe_name)
+
+
+def _quantized_file_name(export_dir: str) -> Optional[str]:
+    """Relative path of the cached dynamic int8 export, if it exists.
+
+    sentence-transformers names it model_qint8_<config>.onnx, or
+    model_quint8_<config>.onnx for targets quantized to unsigned int8 (avx2).
+    """
+    for prefix in ("qint8", "quint8"):
+        file_name = f"onnx/model_{prefix}_{config.EMBEDDING_ONNX_QUANTIZATION}.onnx"
+        if os.path.exists(os.path.join(export_dir, file_name)):
+            return file_name
+    return None
+
+
+def _load_onnx_model(model_name: str, device: Optional[str], quantized: bool) -> SentenceTransformer:
+    """Load an ONNX model, exporting and caching the graph on first use."""
+    export_dir = _onnx_export_dir(model_name)
+
+    if not os.path.exists(os.path.join(export_dir, "onnx", "model.onnx")):
+        # sentence-transformers exports the graph when no ONNX file is shipped with the model
+        print(f"📦 Exporting {model_name} to ONNX at {export_dir}")
+        model = SentenceTransformer(model_name, device=device, backend="onnx")
+        model.save_pretrained(export_dir)
+
+    if not quantized:
+        # Name the file explicitly; the directory may also hold the int8 export
+        return SentenceTransformer(
+            export_dir, device=device, backend="onnx",
+            model_kwargs={"file_name": "onnx/model.onnx"}
+        )
+
+    file_name = _quantized_file_name(export_dir)
+    if file_name is None:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        print(f"📦 Quantizing {model_name} to int8 ({config.EMBEDDING_ONNX_QUANTIZATION})")
+        model = SentenceTransformer(
+            export_dir, device=device, backend="onnx",
+            model_kwargs={"file_name": "onnx/model.onnx"}
+        )
+        export_dynamic_quantized_onnx_model(
+            model,
+            quantization_config=config.EMBEDDING_ONNX_QUANTIZATION,
+            model_name_or_path=export_dir
+        )
+        file_name = _quantized_file_name(export_dir)
+        if file_name is None:
+            raise FileNotFoundError(
+                f"int8 quantization of {model_name} did not produce "
+                f"{export_dir}/onnx/model_q(u)int8_{config.EMBEDDING_ONNX_QUANTIZATION}.onnx; "
+                f"check EMBEDDING_ONNX_QUANTIZATION (arm64, avx2, avx512, avx512_vnni)"
+            )
+
+    return SentenceTransformer(
+        export_dir, device=device, backend="onnx",
+        model_kwargs={"file_name": file_name}
+    )
+
+
+def _load_model(model_name: str, device: str, precision: str, backend: str) -> SentenceTransformer:
+    """Load a SentenceTransformer model with the requested device, precision and backend."""
+    # "auto" lets sentence-transformers pick CUDA/MPS/CPU itself
+    device = None if device == "auto" else device
+
+    if backend in ("onnx", "onnx-int8"):
+        if precision != "float32":
+            raise ValueError(f"Precision {precision} is not supported with the {backend} backend")
+        return _load_onnx_model(model_name, device, quantized=backend == "onnx-int8")
+    if backend != "torch":
+        raise ValueError(f"Unsupported embedding backend: {backend} (expected one of {BACKENDS})")
+
+    model = SentenceTransformer(model_name, device=device)
+    if precision == "float16":
+        model = model.half()
+    elif precision != "float32":
+        raise ValueError(f"Unsupported embedding precision: {precision}")
+    return model
+
+
+def get_shared_embedding_model(
+    model_name: Optional[str] = None,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    backend: Optional[str] = None
+) -> SentenceTransformer:
+    """Get the shared model for a key, loading it on first use."""
+    key = _resolve_key(model_name, device, precision, backend)
+
+    model = _shared_models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        # Another thread may have loaded it while we waited
+        model = _shared_models.get(key)
+        if model is None:
+            model = _load_model(*key)
+            _shared_models[key] = model
+            print(f"🧠 Embedding model loaded: {key[0]} ({key[1]}, {key[2]}, {key[3]}), "
+                  f"{_model_memory_bytes(key, model) / 1024 / 1024:.1f} MB")
+
+    return model
+
+
+def warmup_embedding_model(
+    model_name: Optional[str] = None,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    backend: Optional[str] = None
+) -> SentenceTransformer:
+    """Load a model ahead of the first request and run one dummy encode."""
+    model = get_shared_embedding_model(model_name, device, precision, backend)
+    model.encode(["warmup"], show_progress_bar=False)
+    return model
+
+
+def _model_memory_bytes(key: Tuple[str, str, str, str], model: SentenceTransformer) -> int:
+    """Estimate memory held by a model.
+
+    Torch models are measured by their parameters and buffers; ONNX sessions
+    hold roughly the size of the graph file they were loaded from.
+    """
+    model_name, _, _, backend = key
+    if backend in ("onnx", "onnx-int8"):
+        export_dir = _onnx_export_dir(model_name)
+        # The int8 file may have been removed since loading; the float graph is an upper bound
+        file_name = _quantized_file_name(export_dir) if backend == "onnx-int8" else None
+        path = os.path.join(export_dir, file_name or os.path.join("onnx", "model.onnx"))
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def get_embedding_registry_stats() -> Dict[str, Any]:
+    """Report loaded models and the memory they hold."""
+    models = []
+    for key, model in list(_shared_models.items()):
+        model_name, device, precision, backend = key
+        models.append({
+            "model_name": model_name,
+            "device": device,
+            "precision": precision,
+            "backend": backend,
+            "memory_bytes": _model_memory_bytes(key, model)
+        })
+
+    return {
+        "models_loaded": len(models),
+        "total_memory_bytes": sum(m["memory_bytes"] for m in models),
+        "models": models
+    }
+
+
+def reset_embedding_registry():
+    """Drop all shared models (used for testing or reloading)."""
+    with _registry_lock:
+        _shared_models.clear()
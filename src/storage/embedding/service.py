@@ -1,28 +1,176 @@
 """Local embedding service using sentence-transformers."""
-from typing import List
+import threading
+import time
+from typing import Any, Dict, List, Optional
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import config
+from .registry import get_shared_embedding_model
+from .cache import EmbeddingCache
+from .pool import pool_enabled_for, encode_with_pool, get_shared_encoding_pool
+
+# Process-wide encode throughput counters, split by batching mode
+_throughput_stats: Dict[str, Dict[str, float]] = {}
+_throughput_lock = threading.Lock()
+
+
+def _record_throughput(mode: str, texts: int, seconds: float, tokens: int = 0, padded_tokens: int = 0):
+    """Accumulate encode counters for one batching mode.
+
+    Token counts are only known in token_budget mode, which tokenizes to plan
+    its batches; the other modes are not tokenized just for statistics.
+    """
+    with _throughput_lock:
+        stats = _throughput_stats.setdefault(
+            mode, {"texts": 0, "tokens": 0, "padded_tokens": 0, "seconds": 0.0}
+        )
+        stats["texts"] += texts
+        stats["tokens"] += tokens
+        stats["padded_tokens"] += padded_tokens
+        stats["seconds"] += seconds
+
+
+def get_encoding_throughput_stats() -> Dict[str, Any]:
+    """Texts per second per batching mode (fixed_batch, token_budget, pool), plus
+    tokens per second and padding overhead where tokens were counted."""
+    with _throughput_lock:
+        report = {}
+        for mode, stats in _throughput_stats.items():
+            report[mode] = {
+                "texts": stats["texts"],
+                "seconds": round(stats["seconds"], 3),
+                "texts_per_second": round(stats["texts"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+            }
+            if stats["padded_tokens"]:
+                report[mode].update({
+                    "tokens": stats["tokens"],
+                    "padded_tokens": stats["padded_tokens"],
+                    "tokens_per_second": round(stats["tokens"] / stats["seconds"], 1) if stats["seconds"] else 0.0,
+                    "padding_ratio": round(1 - stats["tokens"] / stats["padded_tokens"], 4)
+                })
+        return report
+
+
+def plan_token_batches(lengths: List[int], token_budget: int) -> List[List[int]]:
+    """Group indices into batches of similar length whose padded size fits the budget.
+    
+    Indices are sorted by length (longest first) so each batch pads to a close
+    maximum; a batch's padded cost is its longest item times its item count.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+    for i in order:
+        batch_max = max(current_max, lengths[i])
+        if current and batch_max * (len(current) + 1) > token_budget:
+            batches.append(current)
+            current, batch_max = [], lengths[i]
+        current.append(i)
+        current_max = batch_max
+    if current:
+        batches.append(current)
+    return batches
+
 
 class EmbeddingService:
     """Generate embeddings locally without API calls."""
     
-    def __init__(self):
-        """Initialize embedding model."""
-        self.model = SentenceTransformer(config.EMBEDDING_MODEL)
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        device: Optional[str] = None,
+        precision: Optional[str] = None,
+        backend: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        """Initialize embedding service; the model itself is loaded lazily and shared."""
+        self.model_name = model_name or config.EMBEDDING_MODEL
+        self.device = device or config.EMBEDDING_DEVICE
+        self.precision = precision or config.EMBEDDING_PRECISION
+        self.backend = backend or config.EMBEDDING_BACKEND
+        self.cache = cache
+    
+    @property
+    def model(self) -> SentenceTransformer:
+        """Shared model instance for this service's (model, device, precision, backend) key."""
+        return get_shared_embedding_model(self.model_name, self.device, self.precision, self.backend)
+    
+    @property
+    def cache_namespace(self) -> str:
+        """Cache key prefix; vectors from different models, precisions or backends never mix."""
+        return f"{self.model_name}:{self.precision}:{self.backend}"
     
     def encode_texts(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings for multiple texts."""
+        """Generate embeddings for multiple texts, reusing cached vectors when available."""
         if not texts:
             return np.array([])
         
-        embeddings = self.model.encode(
-            texts, 
-            batch_size=config.EMBEDDING_BATCH_SIZE,
-            show_progress_bar=False
-        )
+        if self.cache is None:
+            return self._encode(texts)
+        
+        cached = self.cache.get_many(self.cache_namespace, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            # Encode each distinct missing text once, even if repeated in the input
+            missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+            computed = self._encode(missing_texts)
+            self.cache.put_many(self.cache_namespace, missing_texts, computed)
+            computed_by_text = dict(zip(missing_texts, computed))
+            for i in missing:
+                cached[i] = computed_by_text[texts[i]]
+        
+        return np.vstack(cached).astype(np.float32)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the model on texts, sharding large inputs across the worker pool."""
+        model = self.model
+        use_pool = pool_enabled_for(len(texts))
+        if use_pool:
+            # Worker startup is not counted as encode time
+            get_shared_encoding_pool(model)
+        start = time.perf_counter()
+        
+        if use_pool:
+            embeddings = encode_with_pool(model, texts, config.EMBEDDING_BATCH_SIZE)
+            _record_throughput("pool", len(texts), time.perf_counter() - start)
+        elif config.EMBEDDING_TOKEN_BUDGET <= 0 or len(texts) == 1:
+            # A single text (e.g. a query) has nothing to plan
+            embeddings = model.encode(
+                texts, 
+                batch_size=config.EMBEDDING_BATCH_SIZE,
+                show_progress_bar=False
+            )
+            _record_throughput("fixed_batch", len(texts), time.perf_counter() - start)
+        else:
+            lengths = self._token_lengths(model, texts)
+            batches = plan_token_batches(lengths, config.EMBEDDING_TOKEN_BUDGET)
+            embeddings = None
+            for batch in batches:
+                batch_embeddings = model.encode(
+                    [texts[i] for i in batch],
+                    batch_size=len(batch),
+                    show_progress_bar=False
+                )
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=batch_embeddings.dtype)
+                # Scatter back into input order
+                embeddings[batch] = batch_embeddings
+            padded_tokens = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches)
+            _record_throughput("token_budget", len(texts), time.perf_counter() - start, sum(lengths), padded_tokens)
         return embeddings
     
+    @staticmethod
+    def _token_lengths(model: SentenceTransformer, texts: List[str]) -> List[int]:
+        """Tokenized length of each text, capped at the model's max sequence length."""
+        encoded = model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=model.max_seq_length
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+    
     def encode_text(self, text: str) -> np.ndarray:
         """Generate embedding for single text."""
-        return self.encode_texts([text])[0]
\ No newline at end of file
+        return self.encode_texts([text])[0]
@@ -1,5 +1,17 @@
 """Neo4j storage and query components."""
 from .storage import Neo4jStorage
 from .query import Neo4jQuery
+from .async_storage import AsyncNeo4jStorage
+from .async_query import AsyncNeo4jQuery
+from .driver import (
+    get_shared_neo4j_driver,
+    close_shared_neo4j_driver,
+    get_shared_async_neo4j_driver,
+    close_shared_async_neo4j_driver,
+)
 
-__all__ = ["Neo4jStorage", "Neo4jQuery"]
\ No newline at end of file
+__all__ = [
+    "Neo4jStorage", "Neo4jQuery", "AsyncNeo4jStorage", "AsyncNeo4jQuery",
+    "get_shared_neo4j_driver", "close_shared_neo4j_driver",
+    "get_shared_async_neo4j_driver", "close_shared_async_neo4j_driver"
+]
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""Async Neo4j query manager for non-blocking tool handlers."""
+from typing import List, Dict, Any, Optional
+from neo4j.exceptions import ClientError
+from .driver import get_shared_async_neo4j_driver, async_read_records
+from .subgraph import async_collect_subgraph
+from .query import (
+    EntitySearchPlanner,
+    _ENTITY_RETURN,
+    _EXPANDED_ENTITY_RETURN,
+    _BATCH_EXPANDED_ENTITY_RETURN,
+    _ENTITY_RELATIONSHIPS,
+)
+
+class AsyncNeo4jQuery(EntitySearchPlanner):
+    """Async counterpart of Neo4jQuery with the same methods and results."""
+    
+    def __init__(self):
+        """Initialize using the shared async driver (connects on first use)."""
+        super().__init__()
+        self.driver = get_shared_async_neo4j_driver()
+    
+    async def _run_entity_search(self, query: str, fuzzy: bool, tail: str, **params) -> List[Dict[str, Any]]:
+        """Match entities (full-text index or CONTAINS fallback) and run tail on them."""
+        fulltext, scan = self._search_statements(query, fuzzy, tail, **params)
+        if fulltext:
+            try:
+                return await async_read_records(self.driver, fulltext[0], **fulltext[1])
+            except ClientError as e:
+                self._fulltext_failed(e)
+        return await async_read_records(self.driver, scan[0], **scan[1])
+    
+    async def query_entities(self, query: str, limit: int = 10, entity_type: Optional[str] = None, fuzzy: bool = False) -> List[Dict[str, Any]]:
+        """Query entities by name, type and indexed properties, best matches first."""
+        return await self._run_entity_search(query, fuzzy, _ENTITY_RETURN, limit=limit, entity_type=entity_type)
+    
+    async def search_entities_with_relationships(
+        self,
+        query: str,
+        limit: int = 10,
+        expand_top: Optional[int] = None,
+        relationships_per_entity: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        fuzzy: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Matched entities with their documents and strongest relationships, in one query."""
+        entities = await self._run_entity_search(
+            query, fuzzy, _EXPANDED_ENTITY_RETURN, limit=limit, entity_type=entity_type,
+            **self._expansion_params(expand_top, relationships_per_entity)
+        )
+        return self._drop_unexpanded(entities)
+    
+    async def batch_search_entities_with_relationships(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        expand_top: Optional[int] = None,
+        relationships_per_entity: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        fuzzy: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """One entity list per query, from a single UNWIND query."""
+        if not queries:
+            return []
+        params = {"limit": limit, "entity_type": entity_type, **self._expansion_params(expand_top, relationships_per_entity)}
+        fulltext, scan = self._batch_search_statements(queries, fuzzy, _BATCH_EXPANDED_ENTITY_RETURN, **params)
+        records = None
+        if fulltext:
+            try:
+                records = await async_read_records(self.driver, fulltext[0], **fulltext[1])
+            except ClientError as e:
+                self._fulltext_failed(e)
+        if records is None:
+            records = await async_read_records(self.driver, scan[0], **scan[1])
+        return self._group_by_query(records, len(queries))
+    
+    async def get_entity_relationships(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Get relationships for a specific entity."""
+        return await async_read_records(self.driver, _ENTITY_RELATIONSHIPS, entity_id=entity_id)
+    
+    async def get_subgraph(
+        self,
+        seed_ids: List[str],
+        depth: int = 2,
+        max_fanout: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        min_confidence: float = 0.0,
+        include_context: bool = False
+    ) -> Dict[str, Any]:
+        """Bounded k-hop neighbourhood of the seed entities (see Neo4jQuery.get_subgraph)."""
+        options = self._subgraph_options(seed_ids, depth, max_fanout, max_nodes, max_edges, min_confidence, include_context)
+        async with self.driver.session() as session:
+            return await session.execute_read(async_collect_subgraph, options)
+    
+    def close(self):
+        """Release this manager; the shared driver is closed by close_shared_async_neo4j_driver()."""
+        self.driver = None
@@ -0,0 +1,36 @@
+"""Async Neo4j storage manager for non-blocking tool handlers."""
+from typing import Any, Dict, List, Tuple
+from utils.result_cache import bump_result_generation
+from .driver import get_shared_async_neo4j_driver
+from .storage import Neo4jStorage
+
+class AsyncNeo4jStorage:
+    """Async counterpart of Neo4jStorage.store_entities.
+    
+    Builds the same UNWIND statements as the sync manager and runs them in one
+    managed write transaction on the async driver. Schema and maintenance
+    operations stay on the sync Neo4jStorage.
+    """
+    
+    def __init__(self):
+        """Initialize using the shared async driver (connects on first use)."""
+        self.driver = get_shared_async_neo4j_driver()
+    
+    async def store_entities(self, entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]], document_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Store entities and relationships with document provenance."""
+        statements = Neo4jStorage._write_statements(entities, relationships, document_info)
+        async with self.driver.session() as session:
+            await session.execute_write(self._run_statements, statements)
+        bump_result_generation()
+        return Neo4jStorage._write_summary(entities, relationships, document_info)
+    
+    @staticmethod
+    async def _run_statements(tx, statements: List[Tuple[str, Dict[str, Any]]]):
+        """Transaction function for store_entities (may be retried by the driver)."""
+        for query, params in statements:
+            result = await tx.run(query, params)
+            await result.consume()
+    
+    def close(self):
+        """Release this manager; the shared driver is closed by close_shared_async_neo4j_driver()."""
+        self.driver = None
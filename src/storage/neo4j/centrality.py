@@ -0,0 +1,196 @@
+"""Degree and PageRank centrality over the entity/document graph.
+
+Scores are computed client-side with numpy (no Graph Data Science plugin
+needed) and written back as node properties, prefixed so they never
+overwrite properties extracted for an entity:
+
+- ``centrality_degree``: number of RELATED and MENTIONED_IN relationships
+- ``centrality_pagerank``: PageRank over those relationships treated as undirected
+- ``centrality_score``: pagerank scaled to 0-1 by the graph maximum, used to
+  blend into entity search ranking
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import config
+from utils.result_cache import bump_result_generation
+from .driver import read_records, write_records
+
+_METADATA_ID = "centrality"
+
+_NODES = """
+    MATCH (n)
+    WHERE n:Entity OR n:Document
+    RETURN CASE WHEN n:Entity THEN 'Entity' ELSE 'Document' END AS label, n.id AS id, n.centrality_pagerank AS pagerank
+"""
+
+_EDGES = """
+    MATCH (a:Entity)-[r:RELATED|MENTIONED_IN]->(b)
+    WHERE b:Entity OR b:Document
+    RETURN a.id AS source, CASE WHEN b:Entity THEN 'Entity' ELSE 'Document' END AS target_label, b.id AS target
+"""
+
+_CHANGED_DOCUMENTS = """
+    OPTIONAL MATCH (m:GraphMetadata {id: $metadata_id})
+    OPTIONAL MATCH (d:Document)
+    WHERE m IS NULL OR d.created > m.computed_at OR d.centrality_score IS NULL
+    RETURN m IS NOT NULL AS has_previous_run, count(d) AS changed
+"""
+
+# One statement per label so the id lookups use the uniqueness constraints
+_WRITE_SCORES = {
+    label: f"""
+    UNWIND $rows AS row
+    MATCH (n:{label} {{id: row.id}})
+    SET n.centrality_degree = row.degree, n.centrality_pagerank = row.pagerank,
+        n.centrality_score = row.centrality
+"""
+    for label in ("Entity", "Document")
+}
+
+_WRITE_METADATA = """
+    MERGE (m:GraphMetadata {id: $metadata_id})
+    SET m.computed_at = datetime({epochMillis: $started_at}), m.nodes = $nodes, m.edges = $edges,
+        m.iterations = $iterations, m.seconds = $seconds
+"""
+
+
+def pagerank(
+    num_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    damping: float = 0.85,
+    max_iterations: int = 100,
+    tolerance: float = 1e-6,
+    initial: Optional[np.ndarray] = None
+):
+    """Undirected PageRank by power iteration; returns (scores, iterations).
+
+    initial warm-starts the iteration (e.g. from the previous run's scores),
+    which converges in a few iterations after small graph changes.
+    """
+    if num_nodes == 0:
+        return np.zeros(0), 0
+
+    # Each undirected edge contributes in both directions
+    src = np.concatenate([sources, targets])
+    dst = np.concatenate([targets, sources])
+    out_degree = np.bincount(src, minlength=num_nodes).astype(np.float64)
+    dangling = out_degree == 0
+
+    scores = np.full(num_nodes, 1.0 / num_nodes)
+    if initial is not None and initial.sum() > 0:
+        scores = initial / initial.sum()
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        contributions = scores[src] / out_degree[src]
+        updated = np.bincount(dst, weights=contributions, minlength=num_nodes)
+        updated = (1 - damping) / num_nodes + damping * (updated + scores[dangling].sum() / num_nodes)
+        delta = np.abs(updated - scores).sum()
+        scores = updated
+        if delta < tolerance:
+            break
+    return scores, iterations
+
+
+def update_centrality(driver, full: bool = False) -> Dict[str, Any]:
+    """Recompute degree and PageRank and write them back.
+
+    Incremental by default: skipped when no document was stored since the
+    last run, and PageRank is warm-started from the stored scores. full=True
+    always recomputes from a uniform start.
+    """
+    if not full:
+        changes = read_records(driver, _CHANGED_DOCUMENTS, metadata_id=_METADATA_ID)[0]
+        if changes["has_previous_run"] and changes["changed"] == 0:
+            return {"updated": False, "message": "Centrality is up to date"}
+
+    # Documents stored while this run reads the graph are picked up by the next run
+    started_at = int(time.time() * 1000)
+    start = time.perf_counter()
+    nodes = read_records(driver, _NODES)
+    index = {(node["label"], node["id"]): i for i, node in enumerate(nodes)}
+
+    sources, targets = [], []
+    for edge in read_records(driver, _EDGES):
+        target = index.get((edge["target_label"], edge["target"]))
+        source = index.get(("Entity", edge["source"]))
+        if source is not None and target is not None:
+            sources.append(source)
+            targets.append(target)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+
+    initial = None
+    if not full:
+        initial = np.asarray([node["pagerank"] or 0.0 for node in nodes], dtype=np.float64)
+    scores, iterations = pagerank(len(nodes), sources, targets, initial=initial)
+    degree = np.bincount(np.concatenate([sources, targets]), minlength=len(nodes))
+    max_score = scores.max() if len(scores) else 0.0
+
+    by_label: Dict[str, List[Dict[str, Any]]] = {"Entity": [], "Document": []}
+    for i, node in enumerate(nodes):
+        by_label[node["label"]].append({
+            "id": node["id"],
+            "degree": int(degree[i]),
+            "pagerank": float(scores[i]),
+            "centrality": float(scores[i] / max_score) if max_score else 0.0
+        })
+
+    # Separate transactions per batch keep memory bounded on large graphs
+    batch_size = max(1, config.NEO4J_WRITE_BATCH_SIZE)
+    try:
+        for label, rows in by_label.items():
+            for i in range(0, len(rows), batch_size):
+                write_records(driver, _WRITE_SCORES[label], rows=rows[i:i + batch_size])
+    finally:
+        # New scores change entity ranking
+        bump_result_generation()
+
+    seconds = round(time.perf_counter() - start, 3)
+    write_records(
+        driver, _WRITE_METADATA, metadata_id=_METADATA_ID, started_at=started_at,
+        nodes=len(nodes), edges=len(sources), iterations=iterations, seconds=seconds
+    )
+    return {
+        "updated": True,
+        "mode": "full" if full else "incremental",
+        "entities": len(by_label["Entity"]),
+        "documents": len(by_label["Document"]),
+        "edges": len(sources),
+        "pagerank_iterations": iterations,
+        "seconds": seconds,
+        "message": f"Centrality computed for {len(nodes)} nodes and {len(sources)} edges in {seconds}s"
+    }
+
+
+def invalidate_centrality(driver):
+    """Force the next incremental update to recompute (e.g. after deletions)."""
+    write_records(driver, "MATCH (m:GraphMetadata {id: $metadata_id}) DETACH DELETE m", metadata_id=_METADATA_ID)
+
+
+_scheduled_update: Optional[threading.Timer] = None
+_schedule_lock = threading.Lock()
+
+def schedule_centrality_update(driver):
+    """Run an incremental update NEO4J_CENTRALITY_UPDATE_DELAY seconds after the
+    last call, so a burst of ingestion triggers one recompute."""
+    global _scheduled_update
+
+    def run():
+        try:
+            result = update_centrality(driver)
+            if result["updated"]:
+                print(f"📈 {result['message']}")
+        except Exception as e:
+            print(f"⚠️ Background centrality update failed: {e}")
+
+    with _schedule_lock:
+        if _scheduled_update is not None:
+            _scheduled_update.cancel()
+        _scheduled_update = threading.Timer(config.NEO4J_CENTRALITY_UPDATE_DELAY, run)
+        _scheduled_update.daemon = True
+        _scheduled_update.start()
@@ -0,0 +1,98 @@
+"""Shared Neo4j drivers so storage and query managers use one connection pool.
+
+The sync driver serves scripts and management tools; the async driver serves
+the async tool handlers and belongs to the event loop that first used it.
+"""
+import atexit
+import threading
+from typing import Any, Dict, List
+
+from neo4j import AsyncGraphDatabase, GraphDatabase
+import config
+
+# Global shared driver instances
+_shared_driver = None
+_shared_async_driver = None
+_shared_driver_lock = threading.Lock()
+
+def _driver_settings() -> Dict[str, Any]:
+    """Connection pool and retry settings shared by both drivers."""
+    return {
+        "auth": (config.NEO4J_USERNAME, config.NEO4J_PASSWORD),
+        "max_connection_pool_size": config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout": config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": config.NEO4J_MAX_CONNECTION_LIFETIME,
+        "max_transaction_retry_time": config.NEO4J_MAX_TRANSACTION_RETRY_TIME
+    }
+
+def get_shared_neo4j_driver():
+    """Get the shared Neo4j driver, creating it with the configured pool settings."""
+    global _shared_driver
+
+    with _shared_driver_lock:
+        if _shared_driver is None:
+            _shared_driver = GraphDatabase.driver(config.NEO4J_URI, **_driver_settings())
+            print(f"🔧 Neo4j shared driver created: {config.NEO4J_URI} "
+                  f"(pool size {config.NEO4J_MAX_CONNECTION_POOL_SIZE})")
+        return _shared_driver
+
+def close_shared_neo4j_driver():
+    """Close the shared driver and its connection pool (server shutdown, tests)."""
+    global _shared_driver
+
+    with _shared_driver_lock:
+        if _shared_driver is not None:
+            _shared_driver.close()
+            _shared_driver = None
+
+atexit.register(close_shared_neo4j_driver)
+
+def get_shared_async_neo4j_driver():
+    """Get the shared async Neo4j driver (created lazily; no I/O until first use)."""
+    global _shared_async_driver
+
+    with _shared_driver_lock:
+        if _shared_async_driver is None:
+            _shared_async_driver = AsyncGraphDatabase.driver(config.NEO4J_URI, **_driver_settings())
+            print(f"🔧 Neo4j shared async driver created: {config.NEO4J_URI} "
+                  f"(pool size {config.NEO4J_MAX_CONNECTION_POOL_SIZE})")
+        return _shared_async_driver
+
+async def close_shared_async_neo4j_driver():
+    """Close the shared async driver; call from the event loop that used it."""
+    global _shared_async_driver
+
+    with _shared_driver_lock:
+        driver, _shared_async_driver = _shared_async_driver, None
+    if driver is not None:
+        await driver.close()
+
+def _collect_records(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transaction function returning all records as dicts."""
+    return [dict(record) for record in tx.run(query, params)]
+
+def read_records(driver, query: str, **params) -> List[Dict[str, Any]]:
+    """Run a read query in a managed transaction (retried on transient errors,
+    routed to a reader in a cluster)."""
+    with driver.session() as session:
+        return session.execute_read(_collect_records, query, params)
+
+def write_records(driver, query: str, **params) -> List[Dict[str, Any]]:
+    """Run a write query in a managed transaction (retried on transient errors)."""
+    with driver.session() as session:
+        return session.execute_write(_collect_records, query, params)
+
+async def _async_collect_records(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Async transaction function returning all records as dicts."""
+    result = await tx.run(query, params)
+    return [dict(record) async for record in result]
+
+async def async_read_records(driver, query: str, **params) -> List[Dict[str, Any]]:
+    """Async counterpart of read_records."""
+    async with driver.session() as session:
+        return await session.execute_read(_async_collect_records, query, params)
+
+async def async_write_records(driver, query: str, **params) -> List[Dict[str, Any]]:
+    """Async counterpart of write_records."""
+    async with driver.session() as session:
+        return await session.execute_write(_async_collect_records, query, params)
@@ -1,49 +1,339 @@
 """Neo4j query manager for entity and relationship retrieval."""
-from typing import List, Dict, Any
-from neo4j import GraphDatabase
+import re
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from neo4j.exceptions import ClientError
 import config
+from .driver import get_shared_neo4j_driver, read_records
+from .schema import ENTITY_FULLTEXT_INDEX
+from .subgraph import collect_subgraph
 
-class Neo4jQuery:
+# Seconds before retrying the full-text index after it was found missing
+FULLTEXT_RETRY_SECONDS = 60
+
+def build_fulltext_query(text: str, fuzzy: bool = False) -> str:
+    """Lucene query matching any word of text, exactly (boosted) or as a prefix.
+    
+    Words are split like the index analyzer splits them, which also keeps
+    Lucene operators and special characters out of the query.
+    """
+    clauses = []
+    for term in re.findall(r"\w+", text.lower()):
+        options = [f"{term}^2", f"{term}*"]
+        if fuzzy:
+            options.append(f"{term}~")
+        clauses.append(f"({' OR '.join(options)})")
+    return " OR ".join(clauses)
+
+# Entity matching shared by the search methods; binds e and score. Text
+# relevance is blended with precomputed graph centrality (see centrality.py)
+_FULLTEXT_MATCH = """
+    CALL db.index.fulltext.queryNodes($index_name, $lucene_query) YIELD node AS e, score
+    WHERE $entity_type IS NULL OR toLower(e.type) = toLower($entity_type)
+    WITH e, score * (1 + $centrality_weight * coalesce(e.centrality_score, 0.0)) AS score
+    ORDER BY score DESC, e.confidence DESC
+    LIMIT $limit
+"""
+
+_SCAN_MATCH = """
+    MATCH (e:Entity)
+    WHERE (toLower(e.name) CONTAINS toLower($search_query)
+           OR toLower(e.type) CONTAINS toLower($search_query))
+      AND ($entity_type IS NULL OR toLower(e.type) = toLower($entity_type))
+    WITH e, null AS score
+    ORDER BY $centrality_weight * coalesce(e.centrality_score, 0.0) DESC, e.confidence DESC
+    LIMIT $limit
+"""
+
+_ENTITY_RETURN = """
+    OPTIONAL MATCH (e)-[:MENTIONED_IN]->(d:Document)
+    RETURN e.id as id, e.name as name, e.type as type,
+           e.properties as properties, e.confidence as confidence,
+           e.centrality_score as centrality, collect(d.title) as documents, score
+    ORDER BY score DESC, $centrality_weight * coalesce(centrality, 0.0) DESC, confidence DESC
+"""
+
+# Documents of every matched entity and the strongest relationships of the
+# first $expand_top; expects e and its rank among the query's matches
+_EXPANSION = """
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)-[:MENTIONED_IN]->(d:Document)
+        RETURN collect(d.title) AS documents
+    }
+    CALL {
+        WITH e, rank
+        OPTIONAL MATCH (e)-[r:RELATED]-(other:Entity)
+        WHERE rank < $expand_top
+        WITH r, other
+        ORDER BY r.confidence DESC
+        LIMIT $relationships_per_entity
+        RETURN collect(CASE WHEN other IS NULL THEN null ELSE {
+            id: other.id, name: other.name, type: other.type,
+            relationship_type: r.type, confidence: r.confidence, context: r.context
+        } END) AS relationships
+    }
+"""
+
+_EXPANDED_COLUMNS = """e.id as id, e.name as name, e.type as type,
+           e.properties as properties, e.confidence as confidence,
+           e.centrality_score as centrality, documents, score,
+           CASE WHEN rank < $expand_top THEN relationships ELSE null END AS relationships"""
+
+_EXPANDED_ENTITY_RETURN = """
+    WITH collect([e, score]) AS matches
+    UNWIND range(0, size(matches) - 1) AS rank
+    WITH matches[rank][0] AS e, matches[rank][1] AS score, rank""" + _EXPANSION + """    RETURN """ + _EXPANDED_COLUMNS + """
+    ORDER BY rank
+"""
+
+# Batched counterparts: every query in $lucene_queries / $search_queries is
+# matched in its own subquery (so $limit applies per query) and rows carry
+# the query's position as query_index
+_BATCH_FULLTEXT_MATCH = """
+    UNWIND range(0, size($lucene_queries) - 1) AS query_index
+    CALL {
+        WITH query_index
+        CALL db.index.fulltext.queryNodes($index_name, $lucene_queries[query_index]) YIELD node AS e, score
+        WHERE $entity_type IS NULL OR toLower(e.type) = toLower($entity_type)
+        WITH e, score * (1 + $centrality_weight * coalesce(e.centrality_score, 0.0)) AS score
+        ORDER BY score DESC, e.confidence DESC
+        LIMIT $limit
+        RETURN e, score
+    }
+"""
+
+_BATCH_SCAN_MATCH = """
+    UNWIND range(0, size($search_queries) - 1) AS query_index
+    CALL {
+        WITH query_index
+        MATCH (e:Entity)
+        WHERE (toLower(e.name) CONTAINS toLower($search_queries[query_index])
+               OR toLower(e.type) CONTAINS toLower($search_queries[query_index]))
+          AND ($entity_type IS NULL OR toLower(e.type) = toLower($entity_type))
+        WITH e, null AS score
+        ORDER BY $centrality_weight * coalesce(e.centrality_score, 0.0) DESC, e.confidence DESC
+        LIMIT $limit
+        RETURN e, score
+    }
+"""
+
+_BATCH_EXPANDED_ENTITY_RETURN = """
+    WITH query_index, collect([e, score]) AS matches
+    UNWIND range(0, size(matches) - 1) AS rank
+    WITH query_index, matches[rank][0] AS e, matches[rank][1] AS score, rank""" + _EXPANSION + """    RETURN query_index, """ + _EXPANDED_COLUMNS + """
+    ORDER BY query_index, rank
+"""
+
+_ENTITY_RELATIONSHIPS = """
+    MATCH (e:Entity {id: $entity_id})-[r:RELATED]-(other:Entity)
+    RETURN other.id as id, other.name as name, other.type as type,
+           r.type as relationship_type, r.confidence as confidence,
+           r.context as context
+    ORDER BY r.confidence DESC
+"""
+
+class EntitySearchPlanner:
+    """Chooses between the full-text index and the CONTAINS scan.
+    
+    Shared by Neo4jQuery and AsyncNeo4jQuery, which only differ in how they
+    run the resulting statements.
+    """
+    
+    def __init__(self):
+        """Start by trying the full-text index."""
+        self._fulltext_retry_at = 0.0
+    
+    def _search_statements(self, query: str, fuzzy: bool, tail: str, **params) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], Tuple[str, Dict[str, Any]]]:
+        """(full-text statement or None, scan statement) matching entities and running tail.
+        
+        The match binds e and score, best matches first, at most $limit rows.
+        """
+        params["centrality_weight"] = config.NEO4J_CENTRALITY_WEIGHT
+        scan = (_SCAN_MATCH + tail, {**params, "search_query": query})
+        lucene_query = build_fulltext_query(query, fuzzy)
+        if not lucene_query or time.monotonic() < self._fulltext_retry_at:
+            return None, scan
+        fulltext = (_FULLTEXT_MATCH + tail, {**params, "index_name": ENTITY_FULLTEXT_INDEX, "lucene_query": lucene_query})
+        return fulltext, scan
+    
+    def _batch_search_statements(self, queries: List[str], fuzzy: bool, tail: str, **params) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], Tuple[str, Dict[str, Any]]]:
+        """_search_statements for several queries in one statement (rows carry query_index).
+        
+        The full-text statement is only offered when every query has
+        searchable words; otherwise the whole batch uses the scan.
+        """
+        params["centrality_weight"] = config.NEO4J_CENTRALITY_WEIGHT
+        scan = (_BATCH_SCAN_MATCH + tail, {**params, "search_queries": queries})
+        lucene_queries = [build_fulltext_query(query, fuzzy) for query in queries]
+        if not all(lucene_queries) or time.monotonic() < self._fulltext_retry_at:
+            return None, scan
+        fulltext = (_BATCH_FULLTEXT_MATCH + tail, {**params, "index_name": ENTITY_FULLTEXT_INDEX, "lucene_queries": lucene_queries})
+        return fulltext, scan
+    
+    @classmethod
+    def _group_by_query(cls, records: List[Dict[str, Any]], count: int) -> List[List[Dict[str, Any]]]:
+        """Split batched rows into one entity list per query, in query order."""
+        grouped: List[List[Dict[str, Any]]] = [[] for _ in range(count)]
+        for record in records:
+            grouped[record.pop("query_index")].append(record)
+        return [cls._drop_unexpanded(entities) for entities in grouped]
+    
+    def _fulltext_failed(self, error: ClientError):
+        """Fall back to the scan; retry the index after a while."""
+        # Index not created (or not online) yet
+        print(f"⚠️ Entity full-text index unavailable, using CONTAINS scan: {error.message}")
+        self._fulltext_retry_at = time.monotonic() + FULLTEXT_RETRY_SECONDS
+    
+    @staticmethod
+    def _expansion_params(expand_top: Optional[int], relationships_per_entity: Optional[int]) -> Dict[str, int]:
+        """Relationship expansion limits, defaulting to the configured caps."""
+        return {
+            "expand_top": config.NEO4J_EXPAND_TOP_ENTITIES if expand_top is None else expand_top,
+            "relationships_per_entity": (
+                config.NEO4J_RELATIONSHIPS_PER_ENTITY if relationships_per_entity is None else relationships_per_entity
+            )
+        }
+    
+    @staticmethod
+    def _subgraph_options(
+        seed_ids: List[str],
+        depth: int,
+        max_fanout: Optional[int],
+        max_nodes: Optional[int],
+        max_edges: Optional[int],
+        min_confidence: float,
+        include_context: bool
+    ) -> Dict[str, Any]:
+        """SubgraphBuilder arguments with configured defaults and the depth ceiling applied."""
+        return {
+            "seed_ids": seed_ids,
+            "depth": min(depth, config.NEO4J_SUBGRAPH_MAX_DEPTH),
+            "max_fanout": config.NEO4J_SUBGRAPH_MAX_FANOUT if max_fanout is None else max_fanout,
+            "max_nodes": config.NEO4J_SUBGRAPH_MAX_NODES if max_nodes is None else max_nodes,
+            "max_edges": config.NEO4J_SUBGRAPH_MAX_EDGES if max_edges is None else max_edges,
+            "min_confidence": min_confidence,
+            "include_context": include_context
+        }
+    
+    @staticmethod
+    def _drop_unexpanded(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Only expanded entities carry a relationships key, as before."""
+        for entity in entities:
+            if entity["relationships"] is None:
+                del entity["relationships"]
+        return entities
+
+class Neo4jQuery(EntitySearchPlanner):
     """Handle entity and relationship query operations in Neo4j."""
     
     def __init__(self):
-        """Initialize Neo4j connection."""
-        self.driver = GraphDatabase.driver(
-            config.NEO4J_URI,
-            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD)
+        """Initialize Neo4j connection using the shared driver."""
+        super().__init__()
+        self.driver = get_shared_neo4j_driver()
+    
+    def _run_entity_search(self, query: str, fuzzy: bool, tail: str, **params) -> List[Dict[str, Any]]:
+        """Match entities (full-text index or CONTAINS fallback) and run tail on them."""
+        fulltext, scan = self._search_statements(query, fuzzy, tail, **params)
+        if fulltext:
+            try:
+                return read_records(self.driver, fulltext[0], **fulltext[1])
+            except ClientError as e:
+                self._fulltext_failed(e)
+        return read_records(self.driver, scan[0], **scan[1])
+    
+    def query_entities(self, query: str, limit: int = 10, entity_type: Optional[str] = None, fuzzy: bool = False) -> List[Dict[str, Any]]:
+        """Query entities by name, type and indexed properties, best matches first.
+        
+        Uses the entity full-text index with Lucene relevance scoring; falls
+        back to a CONTAINS scan (score None) while the index is missing or
+        when the query has no searchable words.
+        
+        Args:
+            query: Search text
+            limit: Maximum entities returned
+            entity_type: Only return entities of this type (case-insensitive)
+            fuzzy: Also match terms within a small edit distance (typos, plurals)
+        """
+        return self._run_entity_search(query, fuzzy, _ENTITY_RETURN, limit=limit, entity_type=entity_type)
+    
+    def search_entities_with_relationships(
+        self,
+        query: str,
+        limit: int = 10,
+        expand_top: Optional[int] = None,
+        relationships_per_entity: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        fuzzy: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Matched entities with their documents and strongest relationships, in one query.
+        
+        Same matching as query_entities. The first expand_top entities also
+        get a "relationships" list (as get_entity_relationships returns it)
+        capped at relationships_per_entity, so hubs cannot blow up the result.
+        """
+        entities = self._run_entity_search(
+            query, fuzzy, _EXPANDED_ENTITY_RETURN, limit=limit, entity_type=entity_type,
+            **self._expansion_params(expand_top, relationships_per_entity)
         )
+        return self._drop_unexpanded(entities)
     
-    def query_entities(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Query entities by name or type."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (e:Entity)
-                WHERE toLower(e.name) CONTAINS toLower($search_query) 
-                   OR toLower(e.type) CONTAINS toLower($search_query)
-                OPTIONAL MATCH (e)-[:MENTIONED_IN]->(d:Document)
-                RETURN e.id as id, e.name as name, e.type as type, 
-                       e.properties as properties, e.confidence as confidence,
-                       collect(d.title) as documents
-                ORDER BY e.confidence DESC
-                LIMIT $limit
-            """, search_query=query, limit=limit)
-            
-            return [dict(record) for record in result]
+    def batch_search_entities_with_relationships(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        expand_top: Optional[int] = None,
+        relationships_per_entity: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        fuzzy: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """search_entities_with_relationships for several queries in one UNWIND query.
+        
+        Returns one entity list per query, in the order of queries; limit and
+        the expansion caps apply to each query separately.
+        """
+        if not queries:
+            return []
+        params = {"limit": limit, "entity_type": entity_type, **self._expansion_params(expand_top, relationships_per_entity)}
+        fulltext, scan = self._batch_search_statements(queries, fuzzy, _BATCH_EXPANDED_ENTITY_RETURN, **params)
+        records = None
+        if fulltext:
+            try:
+                records = read_records(self.driver, fulltext[0], **fulltext[1])
+            except ClientError as e:
+                self._fulltext_failed(e)
+        if records is None:
+            records = read_records(self.driver, scan[0], **scan[1])
+        return self._group_by_query(records, len(queries))
     
     def get_entity_relationships(self, entity_id: str) -> List[Dict[str, Any]]:
         """Get relationships for a specific entity."""
+        return read_records(self.driver, _ENTITY_RELATIONSHIPS, entity_id=entity_id)
+    
+    def get_subgraph(
+        self,
+        seed_ids: List[str],
+        depth: int = 2,
+        max_fanout: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        min_confidence: float = 0.0,
+        include_context: bool = False
+    ) -> Dict[str, Any]:
+        """Bounded k-hop neighbourhood of the seed entities over RELATED edges.
+        
+        Each node expands at most max_fanout of its strongest relationships
+        with confidence >= min_confidence; expansion stops at depth hops or
+        when the node or edge budget is spent ("truncated" is then True).
+        
+        Returns:
+            Deduplicated "nodes" (id, name, type, depth) and "edges"
+            (source, target, type, confidence[, context])
+        """
+        options = self._subgraph_options(seed_ids, depth, max_fanout, max_nodes, max_edges, min_confidence, include_context)
         with self.driver.session() as session:
-            result = session.run("""
-                MATCH (e:Entity {id: $entity_id})-[r:RELATED]-(other:Entity)
-                RETURN other.id as id, other.name as name, other.type as type,
-                       r.type as relationship_type, r.confidence as confidence,
-                       r.context as context
-                ORDER BY r.confidence DESC
-            """, entity_id=entity_id)
-            
-            return [dict(record) for record in result]
+            return session.execute_read(collect_subgraph, options)
     
     def close(self):
-        """Close Neo4j connection."""
-        if self.driver:
-            self.driver.close()
\ No newline at end of file
+        """Release this manager; the shared driver is closed by close_shared_neo4j_driver()."""
+        self.driver = None
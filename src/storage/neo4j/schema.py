@@ -0,0 +1,92 @@
+"""Neo4j constraints and indexes used by the storage and query managers."""
+from typing import Any, Dict, List
+from neo4j.exceptions import Neo4jError
+from .driver import read_records
+
+# name -> idempotent DDL; names are fixed so status can be checked by name
+SCHEMA_CONSTRAINTS = {
+    "entity_id_unique": "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
+    "document_id_unique": "CREATE CONSTRAINT document_id_unique IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
+}
+
+# Full-text index used by Neo4jQuery.query_entities; extracted properties
+# commonly carrying searchable text are indexed alongside name and type
+ENTITY_FULLTEXT_INDEX = "entity_search"
+ENTITY_FULLTEXT_PROPERTIES = ["name", "type", "description", "aliases", "domain", "affiliation"]
+
+SCHEMA_INDEXES = {
+    "entity_type_index": "CREATE INDEX entity_type_index IF NOT EXISTS FOR (e:Entity) ON (e.type)",
+    "entity_name_index": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:Entity) ON (e.name)",
+    ENTITY_FULLTEXT_INDEX: (
+        f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS FOR (e:Entity) "
+        f"ON EACH [{', '.join('e.' + prop for prop in ENTITY_FULLTEXT_PROPERTIES)}]"
+    ),
+}
+
+
+def _run_schema_statement(tx, statement: str):
+    """Transaction function returning the update counters of one DDL statement."""
+    return tx.run(statement).consume().counters
+
+
+def ensure_schema(driver) -> Dict[str, Any]:
+    """Create any missing constraints and indexes.
+
+    Each statement runs in its own managed transaction (schema changes
+    cannot share one with data writes). A failing statement, e.g. a
+    uniqueness constraint over existing duplicates, is reported rather than
+    raised so the remaining items are still created. Connection errors
+    propagate.
+    """
+    # Fail fast when the server is down instead of waiting out transaction retries
+    driver.verify_connectivity()
+
+    created: List[str] = []
+    failed: Dict[str, str] = {}
+    with driver.session() as session:
+        for name, statement in {**SCHEMA_CONSTRAINTS, **SCHEMA_INDEXES}.items():
+            try:
+                counters = session.execute_write(_run_schema_statement, statement)
+                if counters.constraints_added or counters.indexes_added:
+                    created.append(name)
+            except Neo4jError as e:
+                failed[name] = e.message or str(e)
+
+    if failed:
+        print(f"⚠️ Neo4j schema incomplete: {', '.join(failed)}")
+    return {"created": created, "failed": failed}
+
+
+def get_schema_status(driver) -> Dict[str, Any]:
+    """Report which expected constraints and indexes exist and their state."""
+    constraints = {
+        record["name"]: record
+        for record in read_records(driver, "SHOW CONSTRAINTS YIELD name, type, labelsOrTypes, properties")
+    }
+    indexes = {
+        record["name"]: record
+        for record in read_records(
+            driver, "SHOW INDEXES YIELD name, type, labelsOrTypes, properties, state, populationPercent"
+        )
+    }
+
+    status = {"constraints": {}, "indexes": {}}
+    for name in SCHEMA_CONSTRAINTS:
+        record = constraints.get(name)
+        status["constraints"][name] = {
+            "present": record is not None,
+            "labels": record["labelsOrTypes"] if record else None,
+            "properties": record["properties"] if record else None
+        }
+    for name in SCHEMA_INDEXES:
+        record = indexes.get(name)
+        status["indexes"][name] = {
+            "present": record is not None,
+            "state": record["state"] if record else None,
+            "population_percent": record["populationPercent"] if record else None
+        }
+
+    status["complete"] = all(
+        item["present"] for group in ("constraints", "indexes") for item in status[group].values()
+    ) and all(item["state"] == "ONLINE" for item in status["indexes"].values())
+    return status
@@ -1,118 +1,270 @@
 """Neo4j storage manager for entities and relationships."""
-from typing import List, Dict, Any
-from neo4j import GraphDatabase
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import config
+from utils.result_cache import bump_result_generation
+from .driver import get_shared_neo4j_driver, read_records, write_records
+from .centrality import invalidate_centrality, update_centrality
+from .schema import ensure_schema, get_schema_status
+
+_DOCUMENT_MERGE = """
+    MERGE (d:Document {id: $doc_id})
+    SET d.title = $title,
+        d.created = datetime(),
+        d.path = coalesce($path, d.path),
+        d.type = coalesce($doc_type, d.type)
+"""
+
+_ENTITY_MERGE = """
+    UNWIND $rows AS row
+    MERGE (e:Entity {id: row.id})
+    SET e += row.props
+    WITH e
+    MATCH (d:Document {id: $doc_id})
+    MERGE (e)-[:MENTIONED_IN]->(d)
+"""
+
+_RELATIONSHIP_MERGE = """
+    UNWIND $rows AS row
+    MATCH (source:Entity {id: row.source_id})
+    MATCH (target:Entity {id: row.target_id})
+    MERGE (source)-[r:RELATED {type: row.rel_type}]->(target)
+    SET r.confidence = row.confidence,
+        r.context = row.context
+"""
+
+# Deletes run as repeated bounded transactions (each removes at most
+# $batch_size items and returns how many it removed) so no single
+# transaction has to hold a whole graph or a hub document in memory
+_DELETE_RELATIONSHIPS = """
+    MATCH ()-[r]->()
+    WITH r LIMIT $batch_size
+    DELETE r
+    RETURN count(*) AS deleted
+"""
+
+_DELETE_NODES = """
+    MATCH (n)
+    WITH n LIMIT $batch_size
+    DETACH DELETE n
+    RETURN count(*) AS deleted
+"""
+
+_DOCUMENT_MENTION_COUNT = """
+    MATCH (:Entity)-[r:MENTIONED_IN]->(:Document {id: $doc_id})
+    RETURN count(r) AS mentions
+"""
+
+# Entities left without mentions are deleted in the same transaction as
+# their last link, so an interrupted delete_document never strands them
+_DELETE_MENTIONS_AND_ORPHANS = """
+    MATCH (e:Entity)-[r:MENTIONED_IN]->(:Document {id: $doc_id})
+    WITH e, r LIMIT $batch_size
+    DELETE r
+    WITH collect(DISTINCT e) AS entities, count(*) AS deleted
+    CALL {
+        WITH entities
+        UNWIND entities AS e
+        WITH e WHERE NOT (e)-[:MENTIONED_IN]->(:Document)
+        DETACH DELETE e
+        RETURN count(*) AS orphaned
+    }
+    RETURN deleted, orphaned, size(entities) - orphaned AS kept
+"""
+
+_DELETE_DOCUMENT = """
+    MATCH (d:Document {id: $doc_id})
+    DETACH DELETE d
+    RETURN count(*) AS deleted
+"""
 
 class Neo4jStorage:
     """Handle entity and relationship storage operations in Neo4j."""
     
     def __init__(self):
-        """Initialize Neo4j connection."""
-        self.driver = GraphDatabase.driver(
-            config.NEO4J_URI,
-            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD)
-        )
+        """Initialize Neo4j connection using the shared driver."""
+        self.driver = get_shared_neo4j_driver()
     
     def store_entities(self, entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]], document_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Store entities and relationships with document provenance."""
+        """Store entities and relationships with document provenance.
+        
+        Everything is written in one managed write transaction. Entities and
+        relationships are sent as UNWIND parameter lists of at most
+        NEO4J_WRITE_BATCH_SIZE rows, so a paper costs a handful of round trips.
+        """
+        statements = self._write_statements(entities, relationships, document_info)
         with self.driver.session() as session:
-            # Create document node - handle optional fields safely
-            doc_params = {"doc_id": document_info.get("id"), "title": document_info.get("title")}
-            set_clauses = ["d.title = $title", "d.created = datetime()"]
-            
-            # Add optional fields only if they exist and are not None
-            if document_info.get("path") is not None:
-                doc_params["path"] = document_info.get("path")
-                set_clauses.append("d.path = $path")
-            if document_info.get("type") is not None:
-                doc_params["doc_type"] = document_info.get("type")
-                set_clauses.append("d.type = $doc_type")
-            
-            set_clause = ", ".join(set_clauses)
-            
-            session.run(f"""
-                MERGE (d:Document {{id: $doc_id}})
-                SET {set_clause}
-            """, **doc_params)
-            
-            entities_created = 0
-            relationships_created = 0
-            
-            # Store entities first
-            for entity in entities:
-                # Create entity node with flattened properties
-                properties = entity.get("properties", {})
-                
-                # Build the SET clause dynamically for flattened properties
-                set_clauses = ["e.name = $name", "e.type = $type", "e.confidence = $confidence"]
-                params = {
-                    "entity_id": entity.get("id"),
-                    "name": entity.get("name"),
-                    "type": entity.get("type"),
-                    "confidence": entity.get("confidence", 1.0),
-                    "doc_id": document_info.get("id")
-                }
-                
-                # Flatten properties - convert complex types to strings
-                for key, value in properties.items():
-                    # Sanitize property key (Neo4j property names can't have special chars)
-                    safe_key = key.replace("-", "_").replace(" ", "_").replace(".", "_")
-                    param_key = f"prop_{safe_key}"
-                    
-                    if isinstance(value, (list, dict)):
-                        # Convert complex types to JSON strings
-                        import json
-                        params[param_key] = json.dumps(value)
-                    elif isinstance(value, (str, int, float, bool)):
-                        # Keep primitive types as-is
-                        params[param_key] = value
-                    else:
-                        # Convert other types to strings
-                        params[param_key] = str(value)
-                    
-                    set_clauses.append(f"e.{safe_key} = ${param_key}")
-                
-                set_clause = ", ".join(set_clauses)
-                
-                session.run(f"""
-                    MERGE (e:Entity {{id: $entity_id}})
-                    SET {set_clause}
-                    WITH e
-                    MATCH (d:Document {{id: $doc_id}})
-                    MERGE (e)-[:MENTIONED_IN]->(d)
-                """, **params)
-                entities_created += 1
+            session.execute_write(self._run_statements, statements)
+        bump_result_generation()
+        return self._write_summary(entities, relationships, document_info)
+    
+    @staticmethod
+    def _batches(rows: List[Any]) -> Iterator[List[Any]]:
+        """Split parameter rows into UNWIND batches."""
+        batch_size = max(1, config.NEO4J_WRITE_BATCH_SIZE)
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+    
+    @staticmethod
+    def _flatten_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten properties - convert complex types to strings."""
+        flattened = {}
+        for key, value in properties.items():
+            # Sanitize property key (Neo4j property names can't have special chars)
+            safe_key = key.replace("-", "_").replace(" ", "_").replace(".", "_")
+            if safe_key == "id":
+                # The MERGE key is never overwritten by extracted properties
+                continue
             
-            # Store relationships after entities
-            for rel in relationships:
-                session.run("""
-                    MATCH (source:Entity {id: $source_id})
-                    MATCH (target:Entity {id: $target_id})
-                    MERGE (source)-[r:RELATED {type: $rel_type}]->(target)
-                    SET r.confidence = $confidence,
-                        r.context = $context
-                """,
-                    source_id=rel.get("source"),
-                    target_id=rel.get("target"),
-                    rel_type=rel.get("type", "RELATED"),
-                    confidence=rel.get("confidence", 1.0),
-                    context=rel.get("context", "")
-                )
-                relationships_created += 1
+            if isinstance(value, (list, dict)):
+                # Convert complex types to JSON strings
+                flattened[safe_key] = json.dumps(value)
+            elif isinstance(value, (str, int, float, bool)):
+                # Keep primitive types as-is
+                flattened[safe_key] = value
+            else:
+                # Convert other types to strings
+                flattened[safe_key] = str(value)
+        return flattened
+    
+    @classmethod
+    def _entity_rows(cls, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """UNWIND rows with each entity's full property map, flattened client-side."""
+        rows = []
+        for entity in entities:
+            props = {
+                "name": entity.get("name"),
+                "type": entity.get("type"),
+                "confidence": entity.get("confidence", 1.0)
+            }
+            # Extracted properties keep their previous precedence over the core fields
+            props.update(cls._flatten_properties(entity.get("properties", {})))
+            rows.append({"id": entity.get("id"), "props": props})
+        return rows
+    
+    @classmethod
+    def _write_statements(cls, entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]], document_info: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """(query, parameters) pairs that store_entities runs in one transaction."""
+        doc_id = document_info.get("id")
+        
+        # Create document node - optional fields keep their stored value when missing
+        statements = [(_DOCUMENT_MERGE, {
+            "doc_id": doc_id,
+            "title": document_info.get("title"),
+            "path": document_info.get("path"),
+            "doc_type": document_info.get("type")
+        })]
+        
+        # One fixed statement for every entity, so Neo4j reuses its cached plan
+        for batch in cls._batches(cls._entity_rows(entities)):
+            statements.append((_ENTITY_MERGE, {"rows": batch, "doc_id": doc_id}))
         
+        # Store relationships after entities
+        rel_rows = [
+            {
+                "source_id": rel.get("source"),
+                "target_id": rel.get("target"),
+                "rel_type": rel.get("type", "RELATED"),
+                "confidence": rel.get("confidence", 1.0),
+                "context": rel.get("context", "")
+            }
+            for rel in relationships
+        ]
+        for batch in cls._batches(rel_rows):
+            statements.append((_RELATIONSHIP_MERGE, {"rows": batch}))
+        
+        return statements
+    
+    @staticmethod
+    def _write_summary(entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]], document_info: Dict[str, Any]) -> Dict[str, Any]:
+        """store_entities return value."""
         return {
-            "entities_created": entities_created,
-            "relationships_created": relationships_created,
+            "entities_created": len(entities),
+            "relationships_created": len(relationships),
             "document_id": document_info.get("id")
         }
     
-    def clear_database(self):
-        """Clear all data from the Neo4j database."""
-        with self.driver.session() as session:
-            # Delete all nodes and relationships
-            session.run('MATCH (n) DETACH DELETE n')
+    @staticmethod
+    def _run_statements(tx, statements: List[Tuple[str, Dict[str, Any]]]):
+        """Transaction function for store_entities (may be retried by the driver)."""
+        for query, params in statements:
+            tx.run(query, params).consume()
+    
+    def ensure_schema(self) -> Dict[str, Any]:
+        """Idempotently create the Entity/Document constraints and indexes."""
+        return ensure_schema(self.driver)
+    
+    def get_schema_status(self) -> Dict[str, Any]:
+        """Report which expected constraints and indexes exist."""
+        return get_schema_status(self.driver)
+    
+    def update_centrality(self, full: bool = False) -> Dict[str, Any]:
+        """Recompute degree and PageRank scores used for entity ranking."""
+        return update_centrality(self.driver, full)
+    
+    def _delete_in_batches(self, query: str, label: str, total: Optional[int] = None, **params) -> int:
+        """Run a bounded delete statement until it removes nothing, reporting progress."""
+        batch_size = max(1, config.NEO4J_DELETE_BATCH_SIZE)
+        deleted = 0
+        while True:
+            count = write_records(self.driver, query, batch_size=batch_size, **params)[0]["deleted"]
+            if count == 0:
+                return deleted
+            deleted += count
+            print(f"🗑️ Deleted {deleted}{f'/{total}' if total is not None else ''} {label}")
+    
+    def clear_database(self) -> Dict[str, int]:
+        """Clear all data from the Neo4j database in bounded batches.
+        
+        Relationships go first so each node batch detaches cheaply, even
+        for hub entities.
+        """
+        try:
+            relationships = self._delete_in_batches(_DELETE_RELATIONSHIPS, "relationships")
+            nodes = self._delete_in_batches(_DELETE_NODES, "nodes")
+        finally:
+            # Also after a partial clear
+            bump_result_generation()
+        return {"nodes_deleted": nodes, "relationships_deleted": relationships}
+    
+    def delete_document(self, doc_id: str) -> Dict[str, Any]:
+        """Remove a document, its MENTIONED_IN links and entities it alone mentioned.
+        
+        Entities also mentioned by other documents are kept, along with their
+        RELATED relationships. The removal is not atomic: each batch of links
+        is deleted together with the entities it orphans, and the Document
+        node goes last, so an interrupted call leaves a consistent partial
+        state and can simply be repeated.
+        """
+        total = read_records(self.driver, _DOCUMENT_MENTION_COUNT, doc_id=doc_id)[0]["mentions"]
+        batch_size = max(1, config.NEO4J_DELETE_BATCH_SIZE)
+        mentions = orphaned = kept = 0
+        try:
+            while True:
+                counts = write_records(
+                    self.driver, _DELETE_MENTIONS_AND_ORPHANS, doc_id=doc_id, batch_size=batch_size
+                )[0]
+                if counts["deleted"] == 0:
+                    break
+                mentions += counts["deleted"]
+                orphaned += counts["orphaned"]
+                kept += counts["kept"]
+                print(f"🗑️ Deleted {mentions}/{total} entity links of {doc_id} ({orphaned} orphaned entities)")
+            
+            found = write_records(self.driver, _DELETE_DOCUMENT, doc_id=doc_id)[0]["deleted"] > 0
+        finally:
+            bump_result_generation()
+        if found:
+            # Removed nodes change everyone's scores; the next run recomputes
+            invalidate_centrality(self.driver)
+        return {
+            "document_id": doc_id,
+            "document_found": found,
+            "mentions_deleted": mentions,
+            "entities_deleted": orphaned,
+            "entities_kept": kept
+        }
     
     def close(self):
-        """Close Neo4j connection."""
-        if self.driver:
-            self.driver.close()
\ No newline at end of file
+        """Release this manager; the shared driver is closed by close_shared_neo4j_driver()."""
+        self.driver = None
\ No newline at end of file
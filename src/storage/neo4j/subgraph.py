@@ -0,0 +1,157 @@
+"""Bounded k-hop neighbourhood expansion around seed entities."""
+from typing import Any, Dict, List, Optional, Tuple
+
+_SEED_NODES = """
+    MATCH (e:Entity)
+    WHERE e.id IN $ids
+    RETURN e.id AS id, e.name AS name, e.type AS type
+"""
+
+# Strongest qualifying relationships of each frontier node, at most $max_fanout each
+_HOP = """
+    UNWIND $frontier AS node_id
+    MATCH (n:Entity {id: node_id})
+    CALL {
+        WITH n
+        MATCH (n)-[r:RELATED]-(other:Entity)
+        WHERE coalesce(r.confidence, 1.0) >= $min_confidence
+        RETURN r, other
+        ORDER BY r.confidence DESC
+        LIMIT $max_fanout
+    }
+    RETURN startNode(r).id AS source, endNode(r).id AS target,
+           r.type AS type, r.confidence AS confidence, r.context AS context,
+           other.id AS id, other.name AS name, other.type AS entity_type
+"""
+
+
+class SubgraphBuilder:
+    """Breadth-first expansion state shared by the sync and async query managers.
+
+    The caller runs seed_statement(), then next_hop_statement() until it
+    returns None, feeding each result back in, all inside one read
+    transaction so the subgraph is a consistent snapshot. Each hop is one
+    query over the whole frontier, so a depth-k expansion costs k + 1 queries.
+    """
+
+    def __init__(
+        self,
+        seed_ids: List[str],
+        depth: int,
+        max_fanout: int,
+        max_nodes: int,
+        max_edges: int,
+        min_confidence: float,
+        include_context: bool = False
+    ):
+        """Record the expansion budgets."""
+        self.seed_ids = list(dict.fromkeys(seed_ids))
+        self.depth = max(0, depth)
+        self.max_fanout = max(1, max_fanout)
+        self.max_nodes = max(1, max_nodes)
+        self.max_edges = max(0, max_edges)
+        self.min_confidence = min_confidence
+        self.include_context = include_context
+
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}
+        self.frontier: List[str] = []
+        self.hops_done = 0
+        self.truncated = False
+
+    def seed_statement(self) -> Tuple[str, Dict[str, Any]]:
+        """Statement loading the seed entities."""
+        return _SEED_NODES, {"ids": self.seed_ids[:self.max_nodes]}
+
+    def add_seeds(self, records: List[Dict[str, Any]]):
+        """Add the seed entities that exist as depth-0 nodes."""
+        for record in records:
+            self.nodes[record["id"]] = {"id": record["id"], "name": record["name"], "type": record["type"], "depth": 0}
+        self.frontier = list(self.nodes)
+        if len(self.seed_ids) > self.max_nodes:
+            self.truncated = True
+
+    def next_hop_statement(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Statement expanding the current frontier, or None when expansion is done."""
+        if self.hops_done >= self.depth or not self.frontier or self._budget_exhausted():
+            return None
+        return _HOP, {
+            "frontier": self.frontier,
+            "max_fanout": self.max_fanout,
+            "min_confidence": self.min_confidence
+        }
+
+    def add_hop(self, records: List[Dict[str, Any]]):
+        """Merge one hop's relationships, strongest first, within the budgets."""
+        self.hops_done += 1
+        next_frontier = []
+        for record in sorted(records, key=lambda r: r["confidence"] if r["confidence"] is not None else 1.0, reverse=True):
+            key = (record["source"], record["target"], record["type"])
+            if key in self.edges:
+                continue
+            if len(self.edges) >= self.max_edges:
+                self.truncated = True
+                break
+
+            if record["id"] not in self.nodes:
+                if len(self.nodes) >= self.max_nodes:
+                    # Edges are only kept between nodes inside the budget
+                    self.truncated = True
+                    continue
+                self.nodes[record["id"]] = {
+                    "id": record["id"], "name": record["name"], "type": record["entity_type"], "depth": self.hops_done
+                }
+                next_frontier.append(record["id"])
+
+            edge = {
+                "source": record["source"],
+                "target": record["target"],
+                "type": record["type"],
+                "confidence": record["confidence"]
+            }
+            if self.include_context:
+                edge["context"] = record["context"]
+            self.edges[key] = edge
+        self.frontier = next_frontier
+
+    def _budget_exhausted(self) -> bool:
+        return len(self.nodes) >= self.max_nodes or len(self.edges) >= self.max_edges
+
+    def result(self) -> Dict[str, Any]:
+        """Compact, deduplicated node and edge lists."""
+        if self.frontier and self.hops_done < self.depth and self._budget_exhausted():
+            self.truncated = True
+        return {
+            "seeds": [seed for seed in self.seed_ids if seed in self.nodes],
+            "missing_seeds": [seed for seed in self.seed_ids if seed not in self.nodes],
+            "nodes": list(self.nodes.values()),
+            "edges": list(self.edges.values()),
+            "depth_reached": self.hops_done,
+            "truncated": self.truncated
+        }
+
+
+def collect_subgraph(tx, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Read transaction function; a fresh builder per attempt keeps driver retries clean."""
+    builder = SubgraphBuilder(**options)
+    query, params = builder.seed_statement()
+    builder.add_seeds([dict(record) for record in tx.run(query, params)])
+    statement = builder.next_hop_statement()
+    while statement is not None:
+        builder.add_hop([dict(record) for record in tx.run(*statement)])
+        statement = builder.next_hop_statement()
+    return builder.result()
+
+
+async def async_collect_subgraph(tx, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Async counterpart of collect_subgraph."""
+    builder = SubgraphBuilder(**options)
+    query, params = builder.seed_statement()
+    result = await tx.run(query, params)
+    builder.add_seeds([dict(record) async for record in result])
+    statement = builder.next_hop_statement()
+    while statement is not None:
+        result = await tx.run(*statement)
+        builder.add_hop([dict(record) async for record in result])
+        statement = builder.next_hop_statement()
+    return builder.result()
@@ -1,33 +1,65 @@
 """Knowledge search tool for MCP knowledge graph."""
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional
 from fastmcp import FastMCP
 
-from storage.neo4j import Neo4jQuery
-from storage.chroma import ChromaDBQuery
+from storage.neo4j import AsyncNeo4jQuery
+from storage.chroma import ChromaDBQuery, metadata_filter
+from utils.result_cache import cached_tool_call
+from utils.stage_timing import stage
 
-def register_search_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_query: ChromaDBQuery):
+# Upper bound on queries per batch_query_knowledge_graph call
+MAX_BATCH_QUERIES = 50
+
+def register_search_tools(mcp: FastMCP, neo4j_query: AsyncNeo4jQuery, chromadb_query: ChromaDBQuery):
     """Register knowledge search tools with the MCP server."""
     
     @mcp.tool()
-    def query_knowledge_graph(
+    async def query_knowledge_graph(
         query: str,
         include_entities: bool = True,
         include_text: bool = True,
-        limit: int = 10
+        limit: int = 10,
+        document_id: Optional[str] = None,
+        section: Optional[str] = None,
+        content_type: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Search Neo4j and ChromaDB for matching content.
         
+        Text passages can be scoped with the filter arguments; they are
+        combined (AND) and applied inside ChromaDB before the similarity search.
+        
         Args:
             query: Search query
             include_entities: Whether to search entities in Neo4j (default: True)
-            include_text: Whether to search text content (default: True)
+            include_text: Whether to return text passages; citations are returned either way (default: True)
             limit: Maximum results per category (default: 10)
+            document_id: Only passages from this document
+            section: Only passages from this section (e.g. methods, results)
+            content_type: Only this content type (main_text, figure_caption, table_content, equation)
+            year_from: Only passages from documents published in or after this year
+            year_to: Only passages from documents published in or before this year
+            where: Raw ChromaDB metadata filter, e.g. {"journal": "Nature"}
+            where_document: Raw ChromaDB text filter, e.g. {"$contains": "transformer"}
             
         Returns:
             Combined results with entities, text passages, and citations
         """
         try:
+            # Identical searches since the last write are answered from the result cache
+            cached, store_result = cached_tool_call(
+                "query_knowledge_graph", query=query, include_entities=include_entities, include_text=include_text, limit=limit,
+                document_id=document_id, section=section, content_type=content_type,
+                year_from=year_from, year_to=year_to, where=where, where_document=where_document
+            )
+            if cached is not None:
+                return cached
+            
             # Get fresh collection reference for debug info
             from storage.chroma.client import get_shared_chromadb_client
             fresh_client, fresh_collection = get_shared_chromadb_client()
@@ -45,30 +77,42 @@ def register_search_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_query:
             }
             
             # Search entities in Neo4j
+            # Neo4j is awaited on the async driver and blocking ChromaDB calls
+            # run on worker threads, so concurrent requests share the event loop
             if include_entities:
-                entities = neo4j_query.query_entities(query, limit)
+                # Entities, their documents and the top entities' relationships in one round trip
+                with stage("neo4j_entity_match"):
+                    entities = await neo4j_query.search_entities_with_relationships(query, limit)
                 results["entities"] = entities
-                
-                # Get relationships for top entities
-                for entity in entities[:3]:  # Top 3 entities
-                    relationships = neo4j_query.get_entity_relationships(entity["id"])
-                    entity["relationships"] = relationships
             
-            # Search text content in ChromaDB
+            # Search text content in ChromaDB (citations are drawn from the same results)
             if include_text:
                 # Debug: Show collection info at start of query
                 print(f"🔍 query_knowledge_graph using collection ID: {chromadb_query.collection.id}")
                 print(f"🔍 Collection name: {chromadb_query.collection.name}")
-                
-                text_results = chromadb_query.query_similar_text(query, limit)
-                results["text_results"] = text_results
             
-            # Get relevant citations
-            citations = chromadb_query.get_citations_for_topic(query, limit)
-            results["citations"] = citations
+            with stage("embedding"):
+                query_embedding = await chromadb_query.aembed_query(query)
+            text_filter = metadata_filter(where, document_id, section, content_type, year_from, year_to)
+            with stage("chroma_search"):
+                text_results = await asyncio.to_thread(
+                    chromadb_query.query_similar_text, query, limit, True, query_embedding,
+                    text_filter, where_document
+                )
             
-            results["message"] = f"Found {len(results['entities'])} entities, {len(results['text_results'])} text matches, {len(citations)} citations"
+            with stage("formatting"):
+                if text_filter or where_document:
+                    results["filters"] = {"where": text_filter, "where_document": where_document}
+                if include_text:
+                    results["text_results"] = text_results
+                
+                # Get relevant citations
+                citations = chromadb_query.get_citations_for_topic(query, limit, results=text_results)
+                results["citations"] = citations
+                
+                results["message"] = f"Found {len(results['entities'])} entities, {len(results['text_results'])} text matches, {len(citations)} citations"
             
+            store_result(results)
             return results
             
         except Exception as e:
@@ -76,4 +120,159 @@ def register_search_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_query:
                 "success": False,
                 "error": str(e),
                 "message": "Failed to query knowledge graph"
-            }
\ No newline at end of file
+            }
+    
+    @mcp.tool()
+    async def batch_query_knowledge_graph(
+        queries: List[str],
+        include_entities: bool = True,
+        include_text: bool = True,
+        limit: int = 10,
+        document_id: Optional[str] = None,
+        section: Optional[str] = None,
+        content_type: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run several knowledge graph searches in one call.
+        
+        Equivalent to calling query_knowledge_graph once per query, but all
+        queries are embedded in one batch, searched with one ChromaDB query
+        and matched against Neo4j in one Cypher query. The filter arguments
+        apply to every query's text passages.
+        
+        Args:
+            queries: Search queries (whitespace is normalized; duplicates are searched once)
+            include_entities: Whether to search entities in Neo4j (default: True)
+            include_text: Whether to return text passages; citations are returned either way (default: True)
+            limit: Maximum results per category and query (default: 10)
+            document_id: Only passages from this document
+            section: Only passages from this section (e.g. methods, results)
+            content_type: Only this content type (main_text, figure_caption, table_content, equation)
+            year_from: Only passages from documents published in or after this year
+            year_to: Only passages from documents published in or before this year
+            where: Raw ChromaDB metadata filter, e.g. {"journal": "Nature"}
+            where_document: Raw ChromaDB text filter, e.g. {"$contains": "transformer"}
+            
+        Returns:
+            Entities, text passages and citations keyed by query
+        """
+        try:
+            # Results are keyed by the whitespace-normalized query
+            queries = list(dict.fromkeys(" ".join(query.split()) for query in queries if query and query.strip()))
+            if not queries:
+                return {"success": False, "error": "No queries provided", "message": "Query list is empty"}
+            if len(queries) > MAX_BATCH_QUERIES:
+                return {
+                    "success": False,
+                    "error": f"Too many queries: {len(queries)} (maximum {MAX_BATCH_QUERIES})",
+                    "message": "Split the queries into smaller batches"
+                }
+            
+            cached, store_result = cached_tool_call(
+                "batch_query_knowledge_graph", queries=queries, include_entities=include_entities, include_text=include_text, limit=limit,
+                document_id=document_id, section=section, content_type=content_type,
+                year_from=year_from, year_to=year_to, where=where, where_document=where_document
+            )
+            if cached is not None:
+                return cached
+            
+            text_filter = metadata_filter(where, document_id, section, content_type, year_from, year_to)
+            
+            async def search_entities():
+                if not include_entities:
+                    return [[] for _ in queries]
+                with stage("neo4j_entity_match"):
+                    return await neo4j_query.batch_search_entities_with_relationships(queries, limit)
+            
+            # Citations are drawn from the text search, so it runs even without include_text
+            async def search_text():
+                with stage("embedding"):
+                    query_embeddings = await asyncio.to_thread(chromadb_query.embed_queries, queries)
+                with stage("chroma_search"):
+                    return await asyncio.to_thread(
+                        chromadb_query.batch_query_similar_text, queries, limit, True, query_embeddings,
+                        text_filter, where_document
+                    )
+            
+            # Neo4j and ChromaDB are independent, so both searches run concurrently
+            entities, text_results = await asyncio.gather(search_entities(), search_text())
+            
+            with stage("formatting"):
+                results = {}
+                for query, query_entities, query_text in zip(queries, entities, text_results):
+                    results[query] = {
+                        "entities": query_entities,
+                        "text_results": query_text if include_text else [],
+                        "citations": chromadb_query.get_citations_for_topic(query, limit, results=query_text)
+                    }
+                
+                response = {"success": True, "results": results}
+                if text_filter or where_document:
+                    response["filters"] = {"where": text_filter, "where_document": where_document}
+                response["message"] = (
+                    f"Searched {len(queries)} queries: "
+                    f"{sum(len(result['entities']) for result in results.values())} entities, "
+                    f"{sum(len(result['text_results']) for result in results.values())} text matches"
+                )
+            
+            store_result(response)
+            return response
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to batch query knowledge graph"
+            }
+    
+    @mcp.tool()
+    async def get_entity_neighborhood(
+        entity_ids: List[str],
+        depth: int = 2,
+        max_fanout: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        min_confidence: float = 0.0,
+        include_context: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Get the bounded k-hop subgraph around seed entities for graph context.
+        
+        Args:
+            entity_ids: Seed entity IDs (e.g. from query_knowledge_graph results)
+            depth: Maximum hops from the seeds (default: 2, capped by server config)
+            max_fanout: Strongest relationships followed per node (default: server config)
+            max_nodes: Total node budget (default: server config)
+            max_edges: Total edge budget (default: server config)
+            min_confidence: Ignore relationships below this confidence (default: 0.0)
+            include_context: Include each relationship's supporting text (default: False)
+            
+        Returns:
+            Deduplicated nodes (with hop depth) and edges, and whether a budget cut the expansion short
+        """
+        try:
+            if not entity_ids:
+                return {"success": False, "error": "No entity IDs provided", "message": "Seed entity list is empty"}
+            
+            subgraph = await neo4j_query.get_subgraph(
+                entity_ids, depth, max_fanout, max_nodes, max_edges, min_confidence, include_context
+            )
+            
+            return {
+                "success": True,
+                **subgraph,
+                "message": f"Found {len(subgraph['nodes'])} nodes and {len(subgraph['edges'])} edges "
+                           f"within {subgraph['depth_reached']} hop(s)"
+                           + (" (truncated by budget)" if subgraph["truncated"] else "")
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to get entity neighborhood"
+            }
@@ -1,30 +1,50 @@
 """Literature review generation tool for MCP knowledge graph."""
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from datetime import datetime
 from fastmcp import FastMCP
 
-from storage.neo4j import Neo4jQuery
-from storage.chroma import ChromaDBQuery
+from storage.neo4j import AsyncNeo4jQuery
+from storage.chroma import ChromaDBQuery, metadata_filter
+from utils.result_cache import cached_tool_call
+from utils.stage_timing import stage
 import config
 
-def register_literature_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_query: ChromaDBQuery):
+def register_literature_tools(mcp: FastMCP, neo4j_query: AsyncNeo4jQuery, chromadb_query: ChromaDBQuery):
     """Register literature generation tools with the MCP server."""
     
     @mcp.tool()
-    def generate_literature_review(
+    async def generate_literature_review(
         topic: str,
         citation_style: str = "APA",
         max_sources: int = 20,
-        include_summary: bool = True
+        include_summary: bool = True,
+        document_id: Optional[str] = None,
+        section: Optional[str] = None,
+        content_type: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate formatted output by querying stored data.
         
+        Text passages and citations can be scoped with the same filters as
+        query_knowledge_graph (combined with AND, applied inside ChromaDB).
+        
         Args:
             topic: Topic to search for
             citation_style: Citation format (APA, IEEE, Nature, MLA) 
             max_sources: Maximum number of sources to include (default: 20)
             include_summary: Whether to include summary statistics (default: True)
+            document_id: Only passages from this document
+            section: Only passages from this section (e.g. methods, results)
+            content_type: Only this content type (main_text, figure_caption, table_content, equation)
+            year_from: Only passages from documents published in or after this year
+            year_to: Only passages from documents published in or before this year
+            where: Raw ChromaDB metadata filter, e.g. {"journal": "Nature"}
+            where_document: Raw ChromaDB text filter, e.g. {"$contains": "transformer"}
             
         Returns:
             Structured output with organized entities, text, and citations
@@ -33,6 +53,15 @@ def register_literature_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_qu
             if citation_style not in config.CITATION_STYLES:
                 citation_style = "APA"
             
+            cached, store_result = cached_tool_call(
+                "generate_literature_review", topic=topic, citation_style=citation_style, max_sources=max_sources,
+                include_summary=include_summary,
+                document_id=document_id, section=section, content_type=content_type,
+                year_from=year_from, year_to=year_to, where=where, where_document=where_document
+            )
+            if cached is not None:
+                return cached
+            
             # Query knowledge graph for relevant content
             # Note: This would normally call the query_knowledge_graph tool,
             # but for modularity we'll implement the search directly here
@@ -43,66 +72,75 @@ def register_literature_tools(mcp: FastMCP, neo4j_query: Neo4jQuery, chromadb_qu
                 "success": True
             }
             
-            # Search entities in Neo4j
-            entities = neo4j_query.query_entities(topic, max_sources)
+            # Search entities in Neo4j: entities, their documents and the top
+            # entities' relationships in one round trip
+            with stage("neo4j_entity_match"):
+                entities = await neo4j_query.search_entities_with_relationships(topic, max_sources)
             results["entities"] = entities
             
-            # Get relationships for top entities
-            for entity in entities[:3]:  # Top 3 entities
-                relationships = neo4j_query.get_entity_relationships(entity["id"])
-                entity["relationships"] = relationships
-            
             # Search text content in ChromaDB
-            text_results = chromadb_query.query_similar_text(topic, max_sources)
+            with stage("embedding"):
+                query_embedding = await chromadb_query.aembed_query(topic)
+            text_filter = metadata_filter(where, document_id, section, content_type, year_from, year_to)
+            with stage("chroma_search"):
+                text_results = await asyncio.to_thread(
+                    chromadb_query.query_similar_text, topic, max_sources, True, query_embedding,
+                    text_filter, where_document
+                )
             results["text_results"] = text_results
             
-            # Get relevant citations
-            citations = chromadb_query.get_citations_for_topic(topic, max_sources)
-            results["citations"] = citations
-            
-            if not results.get("success"):
-                return results
-            
-            # Organize results by themes
-            entities = results.get("entities", [])
-            text_results = results.get("text_results", [])
-            citations = results.get("citations", [])
-            
-            # Group entities by type for organization
-            entity_types = {}
-            for entity in entities:
-                entity_type = entity.get("type", "unknown")
-                if entity_type not in entity_types:
-                    entity_types[entity_type] = []
-                entity_types[entity_type].append(entity)
-            
-            # Format literature review
-            review_sections = {
-                "topic": topic,
-                "citation_style": citation_style,
-                "entity_themes": entity_types,
-                "key_concepts": [e for e in entities if e.get("type") == "concept"],
-                "key_researchers": [e for e in entities if e.get("type") == "person"],
-                "technologies": [e for e in entities if e.get("type") == "technology"],
-                "relevant_text": text_results[:10],  # Top 10 most relevant passages
-                "citations": citations[:max_sources],
-                "generated_at": datetime.now().isoformat()
-            }
-            
-            # Add summary if requested
-            if include_summary:
-                review_sections["summary"] = {
-                    "total_entities": len(entities),
-                    "total_citations": len(citations),
-                    "main_themes": list(entity_types.keys()),
-                    "coverage": f"Review covers {len(citations)} sources with {len(entities)} key entities"
+            with stage("formatting"):
+                # Get relevant citations from the same search results
+                citations = chromadb_query.get_citations_for_topic(topic, max_sources, results=text_results)
+                results["citations"] = citations
+                
+                if not results.get("success"):
+                    return results
+                
+                # Organize results by themes
+                entities = results.get("entities", [])
+                text_results = results.get("text_results", [])
+                citations = results.get("citations", [])
+                
+                # Group entities by type for organization
+                entity_types = {}
+                for entity in entities:
+                    entity_type = entity.get("type", "unknown")
+                    if entity_type not in entity_types:
+                        entity_types[entity_type] = []
+                    entity_types[entity_type].append(entity)
+                
+                # Format literature review
+                review_sections = {
+                    "topic": topic,
+                    "citation_style": citation_style,
+                    "entity_themes": entity_types,
+                    "key_concepts": [e for e in entities if e.get("type") == "concept"],
+                    "key_researchers": [e for e in entities if e.get("type") == "person"],
+                    "technologies": [e for e in entities if e.get("type") == "technology"],
+                    "relevant_text": text_results[:10],  # Top 10 most relevant passages
+                    "citations": citations[:max_sources],
+                    "generated_at": datetime.now().isoformat()
                 }
+                if text_filter or where_document:
+                    review_sections["filters"] = {"where": text_filter, "where_document": where_document}
+                
+                # Add summary if requested
+                if include_summary:
+                    review_sections["summary"] = {
+                        "total_entities": len(entities),
+                        "total_citations": len(citations),
+                        "main_themes": list(entity_types.keys()),
+                        "coverage": f"Review covers {len(citations)} sources with {len(entities)} key entities"
+                    }
             
-            return {
+            result = {
                 "success": True,
                 "literature_review": review_sections,
                 "message": f"Generated literature review for '{topic}' with {len(citations)} sources"
             }
+            store_result(result)
+            return result
             
         except Exception as e:
             return {
@@ -1,10 +1,18 @@
 """Database management tools for MCP knowledge graph."""
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fastmcp import FastMCP
 
+import config
 from storage.neo4j import Neo4jStorage
+from storage.neo4j.centrality import schedule_centrality_update
 from storage.chroma import ChromaDBStorage
+from storage.embedding import (
+    get_embedding_registry_stats,
+    get_shared_embedding_cache,
+    get_encoding_throughput_stats,
+)
+from utils.result_cache import get_shared_result_cache
 
 def register_management_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage, chromadb_storage: ChromaDBStorage):
     """Register database management tools with the MCP server."""
@@ -23,13 +31,14 @@ def register_management_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage, chromad
             # Clear ChromaDB
             chromadb_storage.clear_collection()
             
-            # Clear Neo4j
-            neo4j_storage.clear_database()
+            # Clear Neo4j in bounded batches
+            deleted = neo4j_storage.clear_database()
             
             return {
                 "success": True,
                 "message": "Knowledge graph cleared successfully (Neo4j + ChromaDB)",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                **deleted
             }
             
         except Exception as e:
@@ -37,4 +46,243 @@ def register_management_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage, chromad
                 "success": False,
                 "error": str(e),
                 "message": "Failed to clear knowledge graph"
+            }
+    
+    @mcp.tool()
+    def delete_document(document_id: str) -> Dict[str, Any]:
+        """
+        Delete one document from both databases.
+        
+        Removes the document's vectors, its graph node and MENTIONED_IN links,
+        and entities no other document mentions. Entities shared with other
+        documents are kept. Cannot be undone.
+        
+        Args:
+            document_id: ID returned by store_entities / store_vectors
+            
+        Returns:
+            Counts of deleted vectors, links and entities
+        """
+        try:
+            vectors_deleted = chromadb_storage.delete_document(document_id)
+            result = neo4j_storage.delete_document(document_id)
+            if not result["document_found"] and vectors_deleted == 0:
+                return {
+                    "success": False,
+                    "error": f"Document not found: {document_id}",
+                    "message": "Nothing to delete"
+                }
+            
+            if result["document_found"] and config.NEO4J_CENTRALITY_AUTO_UPDATE:
+                schedule_centrality_update(neo4j_storage.driver)
+            
+            return {
+                "success": True,
+                "vectors_deleted": vectors_deleted,
+                **result,
+                "message": f"Deleted document {document_id}: {vectors_deleted} vectors, "
+                           f"{result['entities_deleted']} entities ({result['entities_kept']} shared entities kept)"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to delete document"
+            }
+    
+    @mcp.tool()
+    def get_graph_schema_status(ensure: bool = False) -> Dict[str, Any]:
+        """
+        Report Neo4j constraints and indexes used for entity and document lookups.
+        
+        Args:
+            ensure: Create any missing constraints and indexes first (default: False)
+            
+        Returns:
+            Presence of each expected constraint, index state and population progress
+        """
+        try:
+            ensured = neo4j_storage.ensure_schema() if ensure else None
+            status = neo4j_storage.get_schema_status()
+            missing = [
+                name for group in ("constraints", "indexes")
+                for name, item in status[group].items() if not item["present"]
+            ]
+            result = {
+                "success": True,
+                **status,
+                "message": "Neo4j schema complete" if status["complete"]
+                           else f"Neo4j schema incomplete: {', '.join(missing) or 'indexes still populating'}"
+            }
+            if ensured is not None:
+                result["ensure"] = ensured
+            return result
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to get Neo4j schema status"
+            }
+    
+    @mcp.tool()
+    def compute_graph_centrality(full: bool = False) -> Dict[str, Any]:
+        """
+        Compute degree and PageRank centrality used to rank entity search results.
+        
+        Args:
+            full: Recompute even if no documents were stored since the last run (default: False)
+        
+        Returns:
+            Node and edge counts, PageRank iterations and duration, or that scores are up to date
+        """
+        try:
+            result = neo4j_storage.update_centrality(full=full)
+            return {"success": True, **result}
+        
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to compute graph centrality"
+            }
+    
+    @mcp.tool()
+    def get_embedding_model_status() -> Dict[str, Any]:
+        """
+        Report embedding models loaded in this server process and cache statistics.
+        
+        Returns:
+            Loaded models keyed by name/device/precision with memory usage,
+            embedding cache hit/miss counters and encode throughput per batching mode
+        """
+        try:
+            stats = get_embedding_registry_stats()
+            cache = get_shared_embedding_cache()
+            return {
+                "success": True,
+                **stats,
+                "embedding_cache": cache.get_stats() if cache else {"enabled": False},
+                "encode_throughput": get_encoding_throughput_stats(),
+                "message": f"{stats['models_loaded']} embedding model(s) loaded, "
+                           f"{stats['total_memory_bytes'] / 1024 / 1024:.1f} MB"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to get embedding model status"
+            }
+    
+    @mcp.tool()
+    def get_query_cache_status(clear: bool = False) -> Dict[str, Any]:
+        """
+        Report hit rates of the query result cache.
+        
+        query_knowledge_graph, batch_query_knowledge_graph and
+        generate_literature_review answer repeated identical calls from this
+        cache until the next write or RESULT_CACHE_TTL seconds.
+        
+        Args:
+            clear: Drop all cached results and reset the counters after reporting (default: False)
+            
+        Returns:
+            Entry count, hits, misses and hit rate overall and per tool
+        """
+        try:
+            cache = get_shared_result_cache()
+            if cache is None:
+                return {"success": True, "enabled": False, "message": "Result cache is disabled (RESULT_CACHE_ENABLED=false)"}
+            
+            stats = cache.get_stats()
+            if clear:
+                cache.clear()
+            return {
+                "success": True,
+                **stats,
+                "cleared": clear,
+                "message": f"{stats['hits']} hits / {stats['hits'] + stats['misses']} lookups "
+                           f"({stats['hit_rate']:.0%}), {stats['entries']} cached results"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to get query cache status"
+            }
+    
+    @mcp.tool()
+    def evaluate_vector_projection(
+        target_dims: Optional[List[int]] = None,
+        sample_size: int = 2000,
+        k: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Measure how well reduced-dimension vectors preserve search results.
+        
+        Fits PCA on part of a sample of stored chunks for each candidate
+        dimension and reports recall@k against full-dimension search on the
+        held-out rest of the sample.
+        
+        Args:
+            target_dims: Candidate projected dimensions (default: 64, 128, 192, 256)
+            sample_size: Number of stored chunks to sample (default: 2000)
+            k: Neighbours compared per query (default: 10)
+            
+        Returns:
+            Recall@k, explained variance and size ratio per candidate dimension
+        """
+        try:
+            if target_dims is None:
+                target_dims = [64, 128, 192, 256]
+            report = chromadb_storage.evaluate_projection(target_dims, sample_size, k)
+            return {
+                "success": True,
+                **report,
+                "message": f"Evaluated {len(report['candidates'])} projection sizes on {report['sample_size']} vectors"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to evaluate vector projection"
+            }
+    
+    @mcp.tool()
+    def apply_vector_projection(
+        target_dim: Optional[int] = None,
+        sample_size: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Fit a new PCA projection and rebuild the vector collection with it.
+        
+        All stored chunks are re-embedded (from the embedding cache) and stored
+        at target_dim; future stores and queries use the same projection.
+        Pass no target_dim to go back to full-dimension vectors.
+        
+        Args:
+            target_dim: Projected dimension, or None to remove the projection
+            sample_size: Number of stored chunks used to fit PCA (default: 5000)
+            
+        Returns:
+            Projection version, explained variance and number of rebuilt vectors
+        """
+        try:
+            result = chromadb_storage.apply_projection(target_dim, sample_size)
+            return {
+                "success": True,
+                **result,
+                "message": (f"Rebuilt {result['vectors_rebuilt']} vectors with projection {result['projection_version']}"
+                            if target_dim else f"Rebuilt {result['vectors_rebuilt']} vectors at full dimension")
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to apply vector projection"
             }
\ No newline at end of file
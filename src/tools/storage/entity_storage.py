@@ -1,12 +1,14 @@
 """Entity storage tool for MCP knowledge graph."""
 from typing import List, Dict, Any
-import uuid
 from fastmcp import FastMCP
 from pydantic import BaseModel
 
-from storage.neo4j import Neo4jStorage
+from storage.neo4j import AsyncNeo4jStorage, get_shared_neo4j_driver
+from storage.neo4j.centrality import schedule_centrality_update
 from typing import Optional
+import config
 from utils.citation_quality import CitationQualityScorer
+from utils.document_ids import document_id_for
 
 # Data models
 class EntityData(BaseModel):
@@ -50,11 +52,12 @@ class DocumentInfo(BaseModel):
     """
     title: str  # Document title or filename
     type: str = "document"  # Document type: research_paper, book, article, etc.
-    id: Optional[str] = None  # Optional unique document ID (auto-generated if not provided)
+    id: Optional[str] = None  # Optional unique document ID (derived from doi/path, or title with authors/journal/year, if not provided)
     path: Optional[str] = None  # Optional file path or URL
     doi: Optional[str] = None  # Digital Object Identifier for academic papers
     journal: Optional[str] = None  # Journal name for academic papers
     year: Optional[int] = None  # Publication year
+    authors: Optional[List[str]] = None  # Author names
     citation_preview: Optional[str] = None  # Formatted citation preview
 
 def validate_citation_completeness(entities: List[EntityData]) -> Dict[str, Any]:
@@ -109,11 +112,11 @@ def validate_citation_completeness(entities: List[EntityData]) -> Dict[str, Any]
         "research_integrity_status": "excellent" if avg_quality >= 0.9 else "good" if avg_quality >= 0.75 else "needs_improvement"
     }
 
-def register_entity_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage):
+def register_entity_tools(mcp: FastMCP, neo4j_storage: AsyncNeo4jStorage):
     """Register entity storage tools with the MCP server."""
     
     @mcp.tool()
-    def store_entities(
+    async def store_entities(
         entities: List[Dict[str, Any]],  # Accept raw dicts from Claude Desktop
         relationships: List[Dict[str, Any]],  # Accept raw dicts from Claude Desktop
         document_info: Dict[str, Any]  # Accept raw dict from Claude Desktop
@@ -170,11 +173,11 @@ def register_entity_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage):
                     }
                     validated_relationships.append(validated_rel)
             
-            # Validate document info and generate ID if needed
+            # Validate document info; the ID matches the one store_vectors derives
             validated_document = {
                 'title': document_info.get('title', 'Untitled Document'),
                 'type': document_info.get('type', 'document'),
-                'id': document_info.get('id') or str(uuid.uuid4())
+                'id': document_id_for(document_info)
             }
             
             # Add optional fields if they exist
@@ -187,13 +190,17 @@ def register_entity_tools(mcp: FastMCP, neo4j_storage: Neo4jStorage):
             pydantic_entities = [EntityData(**entity) for entity in validated_entities]
             citation_validation = validate_citation_completeness(pydantic_entities)
             
-            # Store in Neo4j
-            result = neo4j_storage.store_entities(
+            # Store in Neo4j without blocking other requests
+            result = await neo4j_storage.store_entities(
                 validated_entities,
                 validated_relationships,
                 validated_document
             )
             
+            # Refresh ranking scores once this burst of ingestion settles
+            if config.NEO4J_CENTRALITY_AUTO_UPDATE:
+                schedule_centrality_update(get_shared_neo4j_driver())
+            
             return {
                 "success": True,
                 "message": f"Stored {result['entities_created']} entities and {result['relationships_created']} relationships",
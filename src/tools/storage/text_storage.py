@@ -1,11 +1,11 @@
 """Text storage tool for MCP knowledge graph."""
 from typing import List, Dict, Any
-import uuid
-from datetime import datetime
 from fastmcp import FastMCP
 from pydantic import BaseModel
 
 from storage.chroma import ChromaDBStorage
+from storage.chroma.storage import vector_metadata
+from utils.document_ids import document_id_for
 # from utils.coverage_validation import check_coverage_before_storage
 
 # Data models
@@ -19,11 +19,12 @@ class DocumentInfo(BaseModel):
     """
     title: str  # Document title or filename
     type: str = "document"  # Document type: research_paper, book, article, etc.
-    id: str = None  # Optional unique document ID (auto-generated if not provided)
+    id: str = None  # Optional unique document ID (derived from doi/path, or title with authors/journal/year, if not provided)
     path: str = None  # Optional file path or URL
     doi: str = None  # Digital Object Identifier for academic papers
     journal: str = None  # Journal name for academic papers
     year: int = None  # Publication year
+    authors: List[str] = None  # Author names
     citation_preview: str = None  # Formatted citation preview
 
 class VectorData(BaseModel):
@@ -46,17 +47,26 @@ def register_text_tools(mcp: FastMCP, chromadb_storage: ChromaDBStorage):
     @mcp.tool()
     def store_vectors(
         vectors: List[Dict[str, Any]],
-        document_info: Dict[str, Any]
+        document_info: Dict[str, Any],
+        replace: bool = True
     ) -> Dict[str, Any]:
         """
         Store any type of content as vectors in ChromaDB.
         
+        Vectors are upserted under IDs scoped to the document, so calling this
+        again for the same document is safe: vectors whose content and
+        metadata are unchanged are skipped, changed ones replace the stored
+        vector, and the document's stored vectors missing from this call are
+        deleted.
+        
         Args:
             vectors: List of content items to embed and store
             document_info: Document metadata for provenance tracking
+            replace: vectors are the document's complete set (default: True);
+                pass False when storing one document across several calls
         
         Returns:
-            Success status and counts of stored vectors
+            Success status, counts of stored, skipped and deleted vectors, per-batch counts
         """
         try:
             # Debug: Show collection info at start of storage
@@ -67,8 +77,8 @@ def register_text_tools(mcp: FastMCP, chromadb_storage: ChromaDBStorage):
             if not vectors:
                 return {"success": False, "error": "No vectors provided", "message": "Vector list is empty"}
             
-            # Generate document ID if not provided
-            doc_id = document_info.get('id') or str(uuid.uuid4())
+            # Stable document ID, so storing the document again updates its vectors
+            doc_id = document_id_for(document_info)
             
             # Validate and prepare content for embedding
             contents = []
@@ -87,38 +97,25 @@ def register_text_tools(mcp: FastMCP, chromadb_storage: ChromaDBStorage):
                     return {"success": False, "error": f"Vector {i} missing 'content' field: {vector}", "message": "Vector content required"}
                 
                 contents.append(vector['content'])
-                vector_ids.append(f"{doc_id}_{vector['id']}")
-                
-                # Prepare metadata with enhanced citation info
-                metadata = {
-                    "document_id": doc_id,
-                    "document_title": document_info.get('title', 'Untitled Document'),
-                    "document_type": document_info.get('type', 'document'),
-                    "vector_type": vector.get('type', 'unknown'),
-                    "vector_id": vector['id'],
-                    "stored_at": datetime.now().isoformat(),
-                    **vector.get('properties', {})
-                }
+                vector_ids.append(vector['id'])
                 
-                # Add citation metadata if available
-                for field in ['doi', 'journal', 'year', 'citation_preview']:
-                    if field in document_info and document_info[field] is not None:
-                        metadata[field] = document_info[field]
-                    
-                metadatas.append(metadata)
+                # Provenance and citation metadata
+                metadatas.append(vector_metadata(vector, document_info, doc_id))
             
-            # Store in ChromaDB with embeddings
+            # Upsert in ChromaDB; vectors with unchanged content are skipped
             result = chromadb_storage.store_vectors(
                 contents,
                 vector_ids,
-                metadatas
+                metadatas,
+                replace=replace
             )
             
             # Prepare response
             vector_types = set(v.get('type', 'unknown') for v in vectors)
             response = {
                 "success": True,
-                "message": f"Stored {result['vectors_stored']} vectors of types: {vector_types}",
+                "message": f"Stored {result['vectors_stored']} vectors of types: {vector_types}"
+                           f" ({result['vectors_skipped']} unchanged, skipped; {result['vectors_deleted']} stale, deleted)",
                 "document_id": result["document_id"],
                 "debug_info": {
                     "collection_id": chromadb_storage.collection.id,
@@ -0,0 +1,47 @@
+"""Deterministic document IDs shared by the storage tools."""
+import hashlib
+import uuid
+from typing import Any, Dict
+
+# Fields that, with the title, identify one document
+_TITLE_QUALIFIERS = ("type", "authors", "journal", "year")
+
+
+def _normalize(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        value = "; ".join(str(item) for item in value)
+    return " ".join(str(value).lower().split())
+
+
+def _hashed_id(key: str) -> str:
+    return "doc_" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def document_id_for(document_info: Dict[str, Any]) -> str:
+    """The document's own id, else one derived from its DOI, path or title.
+
+    Derived IDs are stable, so storing the same document again updates it
+    instead of creating a copy, and store_entities / store_vectors calls for
+    one document agree on its ID without the caller passing one. Titles
+    alone are too common to identify a document, so a title is only used
+    together with its authors, journal or year (and type); otherwise a
+    random ID is returned with a warning.
+    """
+    if document_info.get("id"):
+        return str(document_info["id"])
+    for field in ("doi", "path"):
+        value = document_info.get(field)
+        if value:
+            return _hashed_id(f"{field}:{_normalize(value)}")
+
+    title = document_info.get("title")
+    if title and any(document_info.get(field) for field in ("authors", "journal", "year")):
+        parts = [f"title:{_normalize(title)}"] + [
+            f"{field}:{_normalize(document_info[field])}"
+            for field in _TITLE_QUALIFIERS if document_info.get(field)
+        ]
+        return _hashed_id("|".join(parts))
+    if title:
+        print(f"⚠️ Document '{title}' has no id, doi, path, authors, journal or year; using a random ID, "
+              f"so storing it again creates a copy")
+    return str(uuid.uuid4())
@@ -0,0 +1,175 @@
+"""In-memory TTL/LRU cache for query tool results.
+
+Storage managers call bump_result_generation() after every write to Neo4j
+or ChromaDB, which drops all entries and advances a generation counter;
+results computed before the bump are not stored, so a cached answer is
+never older than the last write made by this process. Writes by other
+processes (e.g. scripts) are only picked up when entries expire.
+"""
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+
+
+def _normalize(value: Any) -> Any:
+    """Collapse whitespace in strings (recursively) so trivially different arguments share a key."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class ResultCache:
+    """Bounded LRU of tool results with a time-to-live and write-generation invalidation."""
+
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """Create an empty cache; sizes default to the RESULT_CACHE_* settings."""
+        self.max_items = config.RESULT_CACHE_SIZE if max_items is None else max_items
+        self.ttl_seconds = config.RESULT_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (stored_at, result)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.evictions = 0
+        self._by_tool: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(tool: str, arguments: Dict[str, Any]) -> str:
+        """Cache key for a tool call: the tool name and its normalized arguments."""
+        return json.dumps([tool, _normalize(arguments)], sort_keys=True, default=str)
+
+    def _count(self, tool: str, outcome: str):
+        counts = self._by_tool.setdefault(tool, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def get(self, tool: str, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for key, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if time.monotonic() - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expired += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._count(tool, "hits")
+                    # Callers may modify the result they get back
+                    return copy.deepcopy(result)
+            self.misses += 1
+            self._count(tool, "misses")
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], generation: int):
+        """Store a result computed from data as of generation.
+
+        Pass the generation read before the result was computed: if a write
+        happened meanwhile the result may predate it and is not stored.
+        """
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def bump_generation(self):
+        """Invalidate every cached result (called after writes)."""
+        with self._lock:
+            self.generation += 1
+            self.invalidated += len(self._entries)
+            self._entries.clear()
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expired = self.invalidated = self.evictions = 0
+            self._by_tool = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters overall and per tool."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "invalidated": self.invalidated,
+                "evictions": self.evictions,
+                "by_tool": {
+                    tool: {
+                        **counts,
+                        "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)
+                    }
+                    for tool, counts in self._by_tool.items()
+                }
+            }
+
+
+# Global shared cache instance
+_shared_result_cache: Optional[ResultCache] = None
+_shared_result_cache_lock = threading.Lock()
+
+def get_shared_result_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache, or None when RESULT_CACHE_ENABLED is off."""
+    global _shared_result_cache
+
+    if not config.RESULT_CACHE_ENABLED:
+        return None
+    with _shared_result_cache_lock:
+        if _shared_result_cache is None:
+            _shared_result_cache = ResultCache()
+        return _shared_result_cache
+
+def cached_tool_call(tool: str, **arguments) -> Tuple[Optional[Dict[str, Any]], Callable[[Dict[str, Any]], None]]:
+    """Look up a tool call in the shared result cache.
+
+    Returns (cached result or None, store). A cached result carries
+    ``"cached": true`` and the ``cached_at`` time it was computed. On a miss,
+    call store(result) with the fresh result; it is dropped if a write
+    happened meanwhile, and store is a no-op when caching is disabled.
+    """
+    cache = get_shared_result_cache()
+    if cache is None:
+        return None, lambda result: None
+
+    key = cache.make_key(tool, arguments)
+    cached = cache.get(tool, key)
+    if cached is not None:
+        return {**cached, "cached": True}, lambda result: None
+    generation = cache.generation
+
+    def store(result: Dict[str, Any]):
+        cache.put(key, {**result, "cached_at": datetime.now().isoformat()}, generation)
+    return None, store
+
+def bump_result_generation():
+    """Invalidate cached tool results after a write to either database."""
+    cache = get_shared_result_cache()
+    if cache is not None:
+        cache.bump_generation()
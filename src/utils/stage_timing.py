@@ -0,0 +1,37 @@
+"""Optional per-stage latency recording for tool handlers."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Active recorder for the current request; None means timing is off
+_current_stages: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("current_stages", default=None)
+
+@contextmanager
+def record_stages():
+    """Collect stage timings for everything run inside this block.
+
+    Yields a dict mapping stage name to a list of durations in seconds.
+    The context is copied into asyncio.to_thread workers, so stages timed
+    there are recorded too.
+    """
+    stages: Dict[str, List[float]] = {}
+    token = _current_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _current_stages.reset(token)
+
+@contextmanager
+def stage(name: str):
+    """Time a block as the named stage when a recorder is active; no-op otherwise."""
+    stages = _current_stages.get()
+    if stages is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.setdefault(name, []).append(time.perf_counter() - start)
@@ -0,0 +1,31 @@
+"""Shared fixtures."""
+import hashlib
+
+import numpy as np
+import pytest
+
+import config
+from storage.chroma import client as chroma_client
+from storage.embedding.service import EmbeddingService
+
+STUB_DIM = 8
+
+
+def stub_encode_texts(self, texts):
+    """Deterministic stand-in for the embedding model: a hash of each text."""
+    return np.array([
+        np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest()[:STUB_DIM], dtype=np.uint8) / 255.0
+        for text in texts
+    ], dtype=np.float32)
+
+
+@pytest.fixture
+def chroma(tmp_path, monkeypatch):
+    """A ChromaDB collection in tmp_path, embedded by a stub model."""
+    monkeypatch.setattr(config, "CHROMADB_PATH", str(tmp_path / "chroma"))
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(EmbeddingService, "encode_texts", stub_encode_texts)
+    chroma_client.reset_shared_client()
+    yield
+    chroma_client.reset_shared_client()
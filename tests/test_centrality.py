@@ -0,0 +1,53 @@
+"""Tests for the client-side PageRank computation."""
+import numpy as np
+
+from storage.neo4j.centrality import pagerank
+
+
+def edges(pairs):
+    return np.array([a for a, _ in pairs], dtype=np.int64), np.array([b for _, b in pairs], dtype=np.int64)
+
+
+def test_scores_sum_to_one():
+    scores, iterations = pagerank(4, *edges([(0, 1), (1, 2), (2, 3)]))
+
+    assert np.isclose(scores.sum(), 1.0)
+    assert 0 < iterations < 100
+
+
+def test_star_hub_ranks_highest():
+    scores, _ = pagerank(5, *edges([(0, 1), (0, 2), (0, 3), (0, 4)]))
+
+    assert scores.argmax() == 0
+    assert np.allclose(scores[1:], scores[1])
+
+
+def test_edges_are_undirected():
+    forward, _ = pagerank(3, *edges([(0, 1), (1, 2)]))
+    backward, _ = pagerank(3, *edges([(1, 0), (2, 1)]))
+
+    assert np.allclose(forward, backward)
+
+
+def test_isolated_nodes_keep_a_share():
+    scores, _ = pagerank(3, *edges([(0, 1)]))
+
+    assert np.isclose(scores.sum(), 1.0)
+    assert 0 < scores[2] < scores[0]
+
+
+def test_warm_start_converges_faster():
+    pairs = [(i, (i * 7 + 3) % 50) for i in range(50)] + [(0, i) for i in range(1, 10)]
+    cold, cold_iterations = pagerank(50, *edges(pairs))
+
+    warm, warm_iterations = pagerank(50, *edges(pairs), initial=cold * 3)
+
+    assert np.allclose(warm, cold, atol=1e-5)
+    assert warm_iterations < cold_iterations
+
+
+def test_empty_graph():
+    scores, iterations = pagerank(0, *edges([]))
+
+    assert scores.size == 0
+    assert iterations == 0
@@ -0,0 +1,82 @@
+"""Tests for ChromaDB storage and retrieval, using a stub embedding model."""
+from storage.chroma import ChromaDBQuery, ChromaDBStorage
+
+
+def test_citations_round_trip(chroma):
+    storage = ChromaDBStorage()
+    citations = [{"title": "Attention Is All You Need", "year": 2017}]
+    storage.store_vectors(
+        ["The transformer relies on self-attention."],
+        ["chunk_1"],
+        [{"document_id": "doc_a", "citations": citations}]
+    )
+
+    query = ChromaDBQuery()
+    results = query.query_similar_text("self-attention", n_results=1)
+    found = query.get_citations_for_topic("self-attention", results=results)
+
+    assert [{k: c[k] for k in ("title", "year")} for c in found] == citations
+    assert "relevance_score" in found[0]
+
+
+def test_citations_are_deduplicated(chroma):
+    storage = ChromaDBStorage()
+    citation = {"title": "Shared Source"}
+    storage.store_vectors(
+        ["first chunk", "second chunk"],
+        ["chunk_1", "chunk_2"],
+        [{"document_id": "doc_a", "citations": [citation]}] * 2
+    )
+
+    query = ChromaDBQuery()
+    found = query.get_citations_for_topic("chunk", results=query.query_similar_text("chunk", n_results=2))
+
+    assert len(found) == 1
+
+
+def stored_metadata(storage, vector_id):
+    return storage.collection.get(ids=[vector_id], include=["metadatas"])["metadatas"][0]
+
+
+def test_metadata_change_is_rewritten(chroma):
+    storage = ChromaDBStorage()
+    store = lambda year: storage.store_vectors(["same text"], ["chunk_1"], [{"document_id": "doc_a", "year": year}])
+
+    assert store("2017")["vectors_stored"] == 1
+    assert store("2017")["vectors_skipped"] == 1
+
+    # A corrected year is written even though the text is unchanged
+    assert store(2017)["vectors_stored"] == 1
+    assert stored_metadata(storage, "doc_a_chunk_1")["year"] == 2017
+
+
+def test_stored_at_does_not_make_vectors_stale(chroma):
+    storage = ChromaDBStorage()
+    storage.store_vectors(["text"], ["chunk_1"], [{"document_id": "doc_a", "stored_at": "2024-01-01"}])
+
+    result = storage.store_vectors(["text"], ["chunk_1"], [{"document_id": "doc_a", "stored_at": "2024-02-01"}])
+
+    assert result["vectors_skipped"] == 1
+
+
+def test_restore_deletes_dropped_chunks(chroma):
+    storage = ChromaDBStorage()
+    metadata = {"document_id": "doc_a"}
+    storage.store_vectors(["one", "two", "three"], ["c1", "c2", "c3"], [metadata] * 3)
+    storage.store_vectors(["other"], ["c1"], [{"document_id": "doc_b"}])
+
+    result = storage.store_vectors(["one", "two"], ["c1", "c2"], [metadata] * 2)
+
+    assert result["vectors_deleted"] == 1
+    assert sorted(storage.collection.get(include=[])["ids"]) == ["doc_a_c1", "doc_a_c2", "doc_b_c1"]
+
+
+def test_partial_store_keeps_other_chunks(chroma):
+    storage = ChromaDBStorage()
+    metadata = {"document_id": "doc_a"}
+    storage.store_vectors(["one", "two"], ["c1", "c2"], [metadata] * 2)
+
+    result = storage.store_vectors(["three"], ["c3"], [metadata], replace=False)
+
+    assert result["vectors_deleted"] == 0
+    assert storage.collection.count() == 3
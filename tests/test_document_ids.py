@@ -0,0 +1,52 @@
+"""Tests for derived document IDs."""
+import uuid
+
+from utils.document_ids import document_id_for
+
+
+def is_random_id(document_id):
+    try:
+        uuid.UUID(document_id)
+        return True
+    except ValueError:
+        return False
+
+
+def test_explicit_id_wins():
+    assert document_id_for({"id": "paper-1", "doi": "10.1/x", "title": "T"}) == "paper-1"
+
+
+def test_doi_before_path_and_title():
+    by_doi = document_id_for({"doi": "10.1/X", "path": "/a.pdf", "title": "T", "year": 2020})
+
+    assert by_doi == document_id_for({"doi": " 10.1/x ", "title": "Other"})
+    assert by_doi != document_id_for({"path": "/a.pdf", "title": "T", "year": 2020})
+
+
+def test_path_before_title():
+    by_path = document_id_for({"path": "/papers/a.pdf", "title": "T", "year": 2020})
+
+    assert by_path == document_id_for({"path": "/papers/a.pdf", "title": "Renamed"})
+    assert by_path.startswith("doc_")
+
+
+def test_title_with_qualifiers_is_stable_and_distinct():
+    info = {"title": "Introduction", "type": "book", "authors": ["Smith, J."], "year": 2020}
+
+    assert document_id_for(info) == document_id_for({**info, "title": "  introduction "})
+    assert document_id_for(info) != document_id_for({**info, "authors": ["Jones, K."]})
+    assert document_id_for(info) != document_id_for({**info, "year": 2021})
+    assert document_id_for(info) != document_id_for({**info, "type": "article"})
+
+
+def test_bare_title_gets_random_id(capsys):
+    first = document_id_for({"title": "Introduction", "type": "document"})
+    second = document_id_for({"title": "Introduction", "type": "document"})
+
+    assert is_random_id(first) and is_random_id(second)
+    assert first != second
+    assert "random ID" in capsys.readouterr().out
+
+
+def test_no_fields_gets_random_id():
+    assert is_random_id(document_id_for({}))
@@ -0,0 +1,77 @@
+"""Tests for the two-tier embedding cache."""
+import numpy as np
+import pytest
+
+from storage.embedding.cache import EmbeddingCache
+
+MODEL = "test-model"
+DIM = 4
+
+
+def vectors_for(*values):
+    return np.array([[value] * DIM for value in values], dtype=np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path), max_memory_items=2, max_disk_items=3)
+    yield cache
+    cache.close()
+
+
+def test_miss_then_memory_hit(cache):
+    assert cache.get_many(MODEL, ["alpha"]) == [None]
+
+    cache.put_many(MODEL, ["alpha"], vectors_for(1.0))
+    found = cache.get_many(MODEL, ["alpha", "beta"])
+
+    np.testing.assert_array_equal(found[0], vectors_for(1.0)[0])
+    assert found[1] is None
+    stats = cache.get_stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 0, 2)
+
+
+def test_keys_ignore_whitespace_but_not_model(cache):
+    cache.put_many(MODEL, ["two  words\n"], vectors_for(1.0))
+
+    assert cache.get_many(MODEL, ["two words"])[0] is not None
+    assert cache.get_many("other-model", ["two words"]) == [None]
+
+
+def test_memory_eviction_falls_back_to_disk(cache):
+    cache.put_many(MODEL, ["a", "b", "c"], vectors_for(1.0, 2.0, 3.0))
+    assert cache.get_stats()["memory_items"] == 2
+
+    # "a" was evicted from memory (max 2) but is still on disk
+    np.testing.assert_array_equal(cache.get_many(MODEL, ["a"])[0], vectors_for(1.0)[0])
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_disk_ring_overwrites_oldest(cache):
+    cache.put_many(MODEL, ["a", "b", "c", "d"], vectors_for(1.0, 2.0, 3.0, 4.0))
+    cache._memory.clear()
+
+    found = cache.get_many(MODEL, ["a", "b", "c", "d"])
+    assert found[0] is None
+    for vector, value in zip(found[1:], (2.0, 3.0, 4.0)):
+        np.testing.assert_array_equal(vector, vectors_for(value)[0])
+    assert cache.get_stats()["disk_items"] == 3
+
+
+def test_entries_persist_across_instances(cache, tmp_path):
+    cache.put_many(MODEL, ["alpha"], vectors_for(5.0))
+
+    reopened = EmbeddingCache(path=str(tmp_path), max_memory_items=2, max_disk_items=100)
+    try:
+        np.testing.assert_array_equal(reopened.get_many(MODEL, ["alpha"])[0], vectors_for(5.0)[0])
+        # The ring keeps the capacity it was created with
+        assert reopened.max_disk_items == 3
+    finally:
+        reopened.close()
+
+
+def test_dimension_mismatch_is_rejected(cache):
+    cache.put_many(MODEL, ["alpha"], vectors_for(1.0))
+
+    with pytest.raises(ValueError):
+        cache.put_many(MODEL, ["beta"], np.zeros((1, DIM + 1), dtype=np.float32))
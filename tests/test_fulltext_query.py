@@ -0,0 +1,23 @@
+"""Tests for the Lucene query built for entity full-text search."""
+from storage.neo4j.query import build_fulltext_query
+
+
+def test_terms_match_exactly_or_as_prefix():
+    assert build_fulltext_query("Neural Networks") == "(neural^2 OR neural*) OR (networks^2 OR networks*)"
+
+
+def test_fuzzy_adds_edit_distance_option():
+    assert build_fulltext_query("bert", fuzzy=True) == "(bert^2 OR bert* OR bert~)"
+
+
+def test_lucene_syntax_is_escaped():
+    query = build_fulltext_query('title:"deep" AND (x OR y)~ -z* [1 TO 2] \\ / ! ^ && ||')
+
+    for special in ':"[]\\/!&|-':
+        assert special not in query
+    assert query.startswith("(title^2 OR title*) OR (deep^2 OR deep*) OR (and^2 OR and*)")
+
+
+def test_no_terms():
+    assert build_fulltext_query("") == ""
+    assert build_fulltext_query("?! -- ()") == ""
@@ -0,0 +1,75 @@
+"""Tests for the streaming ingestion pipeline."""
+import time
+
+from storage.chroma import ChromaDBStorage, IngestionPipeline
+
+
+class StubChunker:
+    """One chunk per paragraph; text containing "unparseable" fails."""
+
+    def chunk_complete_paper(self, text, title):
+        if "unparseable" in text:
+            raise ValueError("cannot parse")
+        return [
+            {"id": f"chunk_{i}", "type": "chunk", "content": paragraph}
+            for i, paragraph in enumerate(text.split("\n\n"))
+        ]
+
+
+class SlowStorage(ChromaDBStorage):
+    """Storage whose writes are slower than chunking and embedding."""
+
+    def _upsert_vectors(self, ids, items, embeddings):
+        time.sleep(0.02)
+        super()._upsert_vectors(ids, items, embeddings)
+
+
+def document(document_id, text):
+    return {"text": text, "document_info": {"id": document_id, "title": document_id}}
+
+
+def test_failing_document_does_not_stop_the_run(chroma):
+    pipeline = IngestionPipeline(chunker=StubChunker(), batch_size=2)
+
+    result = pipeline.run([
+        document("doc_a", "one\n\ntwo\n\nthree"),
+        document("doc_bad", "unparseable"),
+        document("doc_b", "four")
+    ])
+
+    assert result["documents"]["doc_bad"]["error"] == "chunk: cannot parse"
+    assert result["documents"]["doc_a"]["stored"] == 3
+    assert result["documents"]["doc_b"]["stored"] == 1
+    assert result["vectors_stored"] == 4
+    assert pipeline.storage.collection.count() == 4
+
+
+def test_store_error_is_recorded_per_document(chroma):
+    class FailingStorage(ChromaDBStorage):
+        def _upsert_vectors(self, ids, items, embeddings):
+            if any(items[i][1]["document_id"] == "doc_bad" for i in ids):
+                raise RuntimeError("disk full")
+            super()._upsert_vectors(ids, items, embeddings)
+
+    result = IngestionPipeline(storage=FailingStorage(), chunker=StubChunker()).run([
+        document("doc_bad", "one"),
+        document("doc_a", "two")
+    ])
+
+    assert result["documents"]["doc_bad"]["error"] == "store: disk full"
+    assert result["documents"]["doc_a"]["stored"] == 1
+
+
+def test_queues_stay_bounded_behind_a_slow_stage(chroma):
+    pipeline = IngestionPipeline(storage=SlowStorage(), chunker=StubChunker(), queue_size=2, batch_size=1)
+    documents = [document(f"doc_{i}", "\n\n".join(f"doc {i} part {j}" for j in range(4))) for i in range(5)]
+
+    result = pipeline.run(documents)
+
+    assert result["vectors_stored"] == 20
+    for stats in result["queues"].values():
+        assert stats["capacity"] == 2
+        assert stats["max_depth"] <= 2
+    # The slow store stage held the producers back
+    assert result["queues"]["store"]["max_depth"] == 2
+    assert result["stages"]["embed"]["waiting_seconds"] > 0
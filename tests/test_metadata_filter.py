@@ -0,0 +1,47 @@
+"""Tests for metadata-filtered semantic search."""
+from storage.chroma import ChromaDBQuery, ChromaDBStorage, metadata_filter
+from storage.chroma.storage import vector_metadata
+
+
+def test_no_filter():
+    assert metadata_filter() is None
+    assert metadata_filter(where={}) is None
+
+
+def test_single_condition_is_not_wrapped():
+    assert metadata_filter(document_id="doc_a") == {"document_id": "doc_a"}
+    assert metadata_filter(where={"vector_type": "chunk"}) == {"vector_type": "chunk"}
+
+
+def test_conditions_are_combined_with_and():
+    where = metadata_filter(where={"vector_type": "chunk"}, section="Methods", year_from="2015", year_to=2020)
+
+    assert where == {"$and": [
+        {"vector_type": "chunk"},
+        {"section": "Methods"},
+        {"year": {"$gte": 2015}},
+        {"year": {"$lte": 2020}}
+    ]}
+
+
+def test_string_year_is_stored_as_int():
+    vector = {"id": "chunk_1", "type": "chunk"}
+
+    assert vector_metadata(vector, {"year": " 2017 "}, "doc_a")["year"] == 2017
+    assert vector_metadata(vector, {"year": "n.d."}, "doc_a")["year"] == "n.d."
+
+
+def test_year_range_applies_to_stored_vectors(chroma):
+    storage = ChromaDBStorage()
+    storage.store_vectors(
+        ["older result", "newer result"],
+        ["chunk_1", "chunk_1"],
+        [
+            vector_metadata({"id": "chunk_1"}, {"year": "2012"}, "doc_old"),
+            vector_metadata({"id": "chunk_1"}, {"year": "2019"}, "doc_new")
+        ]
+    )
+
+    results = ChromaDBQuery().query_similar_text("result", n_results=2, where=metadata_filter(year_from=2015))
+
+    assert [r["metadata"]["document_id"] for r in results] == ["doc_new"]
@@ -0,0 +1,89 @@
+"""Tests for the query tool result cache."""
+import pytest
+
+import config
+from utils import result_cache
+from utils.result_cache import ResultCache, bump_result_generation, cached_tool_call
+
+
+def test_key_normalizes_whitespace():
+    assert ResultCache.make_key("tool", {"query": "deep   learning\n"}) == \
+        ResultCache.make_key("tool", {"query": "deep learning"})
+    assert ResultCache.make_key("tool", {"query": "a"}) != ResultCache.make_key("other", {"query": "a"})
+
+
+def test_hit_returns_a_copy():
+    cache = ResultCache(max_items=4, ttl_seconds=60)
+    key = cache.make_key("tool", {"query": "a"})
+    cache.put(key, {"items": [1]}, cache.generation)
+
+    first = cache.get("tool", key)
+    first["items"].append(2)
+
+    assert cache.get("tool", key) == {"items": [1]}
+
+
+def test_bump_generation_invalidates_entries():
+    cache = ResultCache(max_items=4, ttl_seconds=60)
+    key = cache.make_key("tool", {"query": "a"})
+    cache.put(key, {"value": 1}, cache.generation)
+
+    cache.bump_generation()
+
+    assert cache.get("tool", key) is None
+    assert cache.get_stats()["invalidated"] == 1
+
+
+def test_result_computed_before_a_write_is_not_stored():
+    cache = ResultCache(max_items=4, ttl_seconds=60)
+    key = cache.make_key("tool", {"query": "a"})
+    generation = cache.generation
+
+    cache.bump_generation()  # A write lands while the result is computed
+    cache.put(key, {"value": 1}, generation)
+
+    assert cache.get("tool", key) is None
+
+
+def test_expired_and_evicted_entries():
+    cache = ResultCache(max_items=2, ttl_seconds=-1)
+    cache.put("a", {"value": 1}, cache.generation)
+    assert cache.get("tool", "a") is None
+    assert cache.get_stats()["expired"] == 1
+
+    cache = ResultCache(max_items=2, ttl_seconds=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"value": key}, cache.generation)
+    assert cache.get("tool", "a") is None
+    assert cache.get("tool", "c") == {"value": "c"}
+    assert cache.get_stats()["evictions"] == 1
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    monkeypatch.setattr(config, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(result_cache, "_shared_result_cache", ResultCache(max_items=4, ttl_seconds=60))
+    return result_cache._shared_result_cache
+
+
+def test_cached_tool_call_round_trip(shared_cache):
+    cached, store = cached_tool_call("tool", query="a", limit=5)
+    assert cached is None
+    store({"success": True})
+
+    cached, _ = cached_tool_call("tool", query=" a ", limit=5)
+    assert cached["success"] and cached["cached"]
+    assert "cached_at" in cached
+
+    bump_result_generation()
+    assert cached_tool_call("tool", query="a", limit=5)[0] is None
+
+
+def test_cached_tool_call_disabled(monkeypatch):
+    monkeypatch.setattr(config, "RESULT_CACHE_ENABLED", False)
+
+    cached, store = cached_tool_call("tool", query="a")
+    store({"success": True})
+
+    assert cached is None
+    assert cached_tool_call("tool", query="a")[0] is None
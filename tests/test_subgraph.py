@@ -0,0 +1,95 @@
+"""Tests for bounded subgraph expansion."""
+from storage.neo4j.subgraph import SubgraphBuilder
+
+
+def builder(**overrides):
+    options = {
+        "seed_ids": ["a"],
+        "depth": 2,
+        "max_fanout": 10,
+        "max_nodes": 10,
+        "max_edges": 10,
+        "min_confidence": 0.0
+    }
+    return SubgraphBuilder(**{**options, **overrides})
+
+
+def seed(record_id):
+    return {"id": record_id, "name": record_id.upper(), "type": "concept"}
+
+
+def hop(source, target, confidence=0.9, other=None):
+    other = other or target
+    return {
+        "source": source, "target": target, "type": "related_to", "confidence": confidence,
+        "context": f"{source}-{target}", "id": other, "name": other.upper(), "entity_type": "concept"
+    }
+
+
+def test_expands_until_depth():
+    sub = builder(depth=2)
+    sub.add_seeds([seed("a")])
+    sub.add_hop([hop("a", "b")])
+    assert sub.next_hop_statement() is not None
+    sub.add_hop([hop("b", "c")])
+
+    assert sub.next_hop_statement() is None
+    result = sub.result()
+    assert {node["id"]: node["depth"] for node in result["nodes"]} == {"a": 0, "b": 1, "c": 2}
+    assert result["depth_reached"] == 2
+    assert not result["truncated"]
+
+
+def test_missing_and_duplicate_seeds():
+    sub = builder(seed_ids=["a", "x", "a"])
+    sub.add_seeds([seed("a")])
+
+    result = sub.result()
+    assert result["seeds"] == ["a"]
+    assert result["missing_seeds"] == ["x"]
+
+
+def test_node_budget_keeps_strongest_edges():
+    sub = builder(max_nodes=2)
+    sub.add_seeds([seed("a")])
+    sub.add_hop([hop("a", "weak", 0.2), hop("a", "strong", 0.8)])
+
+    result = sub.result()
+    assert [node["id"] for node in result["nodes"]] == ["a", "strong"]
+    # No edge points outside the kept nodes
+    assert [edge["target"] for edge in result["edges"]] == ["strong"]
+    assert result["truncated"]
+    assert sub.next_hop_statement() is None
+
+
+def test_edge_budget_truncates():
+    sub = builder(max_edges=1)
+    sub.add_seeds([seed("a")])
+    sub.add_hop([hop("a", "b", 0.5), hop("a", "c", 0.7)])
+
+    result = sub.result()
+    assert [edge["target"] for edge in result["edges"]] == ["c"]
+    assert result["truncated"]
+
+
+def test_edges_are_deduplicated_and_context_is_optional():
+    sub = builder(depth=1)
+    sub.add_seeds([seed("a"), seed("b")])
+    sub.add_hop([hop("a", "b", other="b"), hop("a", "b", other="a")])
+
+    result = sub.result()
+    assert len(result["edges"]) == 1
+    assert "context" not in result["edges"][0]
+
+    sub = builder(depth=1, include_context=True)
+    sub.add_seeds([seed("a")])
+    sub.add_hop([hop("a", "b")])
+    assert sub.result()["edges"][0]["context"] == "a-b"
+
+
+def test_seed_overflow_is_truncated():
+    sub = builder(seed_ids=["a", "b", "c"], max_nodes=2)
+
+    assert sub.seed_statement()[1]["ids"] == ["a", "b"]
+    sub.add_seeds([seed("a"), seed("b")])
+    assert sub.result()["truncated"]
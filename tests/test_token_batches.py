@@ -0,0 +1,41 @@
+"""Tests for token-budget batch planning."""
+from storage.embedding.service import plan_token_batches
+
+
+def padded_cost(lengths, batch):
+    return max(lengths[i] for i in batch) * len(batch)
+
+
+def test_batches_cover_every_index_once():
+    lengths = [5, 120, 30, 30, 7, 64, 1, 200]
+
+    batches = plan_token_batches(lengths, token_budget=256)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+
+def test_batches_fit_the_budget_longest_first():
+    lengths = [10, 50, 20, 40, 30, 60, 5]
+
+    batches = plan_token_batches(lengths, token_budget=100)
+
+    assert all(padded_cost(lengths, batch) <= 100 for batch in batches)
+    order = [i for batch in batches for i in batch]
+    assert [lengths[i] for i in order] == sorted(lengths, reverse=True)
+    assert batches == [[5], [1, 3], [4, 2, 0], [6]]
+
+
+def test_item_over_budget_gets_its_own_batch():
+    lengths = [300, 10, 10]
+
+    batches = plan_token_batches(lengths, token_budget=100)
+
+    assert batches == [[0], [1, 2]]
+
+
+def test_short_texts_share_one_batch():
+    assert plan_token_batches([4] * 10, token_budget=64) == [list(range(10))]
+
+
+def test_empty_input():
+    assert plan_token_batches([], token_budget=64) == []